@@ -0,0 +1,154 @@
+from datetime import datetime, timezone
+from flask import jsonify, request, Response
+from flask.views import MethodView
+import gbmodel
+from operations import current_user, search_postings, MANAGE_PAGE_SIZE
+
+API_MAX_PAGE_SIZE = 100     #The most bookmarks a single API page may hold.
+SEARCH_MAX_AGE = 60         #Seconds clients and proxies may reuse a search response without asking again.
+
+#The fields of a bookmark, in the order of the rows returned by the model.
+BOOKMARK_FIELDS = gbmodel.Bookmark._fields
+REQUIRED_FIELDS = ('internship_title', 'organization', 'date_posted', 'location', 'internship_url')
+
+def to_json(record):
+    """
+    Converts a Bookmark or Posting record into a dictionary.
+    """
+    return record._asdict()
+
+def has_text_values(body: dict, fields):
+    """
+    :return: True if every one of the fields the body sets is a string or null, the only values the model stores.
+    """
+    return all(body[field] is None or isinstance(body[field], str) for field in fields if field in body)
+
+def error(message: str, status: int):
+    response = jsonify(error=message)
+    response.status_code = status
+    return response
+
+def bookmarks_validators():
+    """
+    Builds the HTTP validators of the visitor's bookmarks from their change counter in the model,
+    so checking whether a client's copy is still current costs a single lookup.
+
+    :return: A tuple (etag, last modified datetime).
+    """
+    version, modified = gbmodel.get_model().get_version(current_user())
+    return f"bookmarks-{version}", datetime.fromtimestamp(modified, tz=timezone.utc)
+
+def is_fresh(etag: str, last_modified: datetime):
+    """
+    :return: True if the validators sent by the client show its copy is still current.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+def with_validators(response, etag: str, last_modified: datetime):
+    #no-cache lets clients keep the payload but makes them revalidate it on every use. The payload
+    #depends on whose session cookie was sent, so shared caches must not store it.
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    response.cache_control.private = True
+    response.vary.add('Cookie')
+    return response
+
+class BookmarksAPI(MethodView):
+    def get(self):
+        """
+        Lists the visitor's bookmarked internships, one page at a time. Accepts the same 'q', 'status',
+        'sort' and 'cursor' parameters as the manage page, plus 'limit'. Answers 304 without
+        touching the bookmarks when the client's ETag or Last-Modified is still current.
+        """
+        etag, last_modified = bookmarks_validators()
+        if is_fresh(etag, last_modified):
+            return with_validators(Response(status=304), etag, last_modified)
+
+        model = gbmodel.get_model()
+        user_id = current_user()
+        query = request.args.get('q', "").strip()
+        status = request.args.get('status', "")
+        filters = {'application_status': status} if status else {}
+        limit = max(1, min(request.args.get('limit', MANAGE_PAGE_SIZE, type=int), API_MAX_PAGE_SIZE))
+
+        if query:
+            rows, next_cursor = model.search(query, limit, user_id), None
+        else:
+            try:
+                rows, next_cursor = model.select_page(filters, request.args.get('sort', "-date_posted"), request.args.get('cursor') or None, limit, user_id)
+            except ValueError:
+                return error("Unsupported sort order or cursor.", 400)
+
+        response = jsonify(bookmarks=[to_json(row) for row in rows], next_cursor=next_cursor)
+        return with_validators(response, etag, last_modified)
+
+    def post(self):
+        """
+        Bookmarks an internship posting given as a JSON object.
+        Answers 201 when added and 409 when the url is already bookmarked.
+        """
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict) or not all(body.get(field) for field in REQUIRED_FIELDS):
+            return error("A JSON object with " + ", ".join(REQUIRED_FIELDS) + " is required.", 400)
+        if not has_text_values(body, BOOKMARK_FIELDS):
+            return error("Bookmark fields must be strings or null.", 400)
+
+        new_entry = {field: body.get(field) for field in BOOKMARK_FIELDS}
+        if not gbmodel.get_model().insert(new_entry, current_user()):
+            return error("This posting has already been bookmarked.", 409)
+
+        response = jsonify(bookmark=new_entry)
+        response.status_code = 201
+        return response
+
+class BookmarkAPI(MethodView):
+    """Operations on the single bookmark whose url is given in the 'url' query parameter."""
+    def patch(self):
+        """
+        Updates 'date_applied' and/or 'application_status' of a bookmark from a JSON object.
+        """
+        url = request.args.get('url', "")
+        body = request.get_json(silent=True)
+        if not url or not isinstance(body, dict):
+            return error("A 'url' parameter and a JSON object are required.", 400)
+        if not has_text_values(body, body):
+            return error("Bookmark fields must be strings or null.", 400)
+
+        try:
+            was_updated = gbmodel.get_model().update_fields(url, body, current_user())
+        except ValueError as e:
+            return error(str(e), 400)
+
+        if not was_updated:
+            return error("No bookmark with that url.", 404)
+        return jsonify(internship_url=url, **body)
+
+    def delete(self):
+        """
+        Removes a bookmark. Answers 204 when removed and 404 when there was nothing to remove.
+        """
+        url = request.args.get('url', "")
+        if not url or not gbmodel.get_model().delete(url, current_user()):
+            return error("No bookmark with that url.", 404)
+        return Response(status=204)
+
+class SearchAPI(MethodView):
+    def get(self):
+        """
+        Searches internship postings with the 'title', 'organization' and 'location' parameters,
+        live or from the local index ('source=local'). The ETag is derived from the payload, so
+        a client repeating a search only downloads the results again when they changed.
+        """
+        filters = (request.args.get('title', ""), request.args.get('organization', ""), request.args.get('location', ""))
+        postings = search_postings(filters, request.args.get('source', 'live'))
+
+        response = jsonify(postings=[to_json(posting) for posting in postings])
+        response.add_etag(weak=True)
+        response.cache_control.public = True
+        response.cache_control.max_age = SEARCH_MAX_AGE
+        return response.make_conditional(request)
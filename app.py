@@ -2,11 +2,47 @@ import flask
 from flask.views import MethodView
 import os
 from flask import Flask
+import click
+import gbmodel
 
-from operations import Index, Search, Display, ManualAdd, Manage
+from operations import Index, Search, Display, ManualAdd, Manage, Stats
+from api import BookmarksAPI, BookmarkAPI, SearchAPI
+from transfer import Import, Export
+from internapi import start_prefetch
+import metrics
+from metrics import Metrics
+
+SECRET_KEY_FILE = os.environ.get('SECRET_KEY_FILE', 'secret_key')
+
+def load_secret_key(path: str = SECRET_KEY_FILE):
+    """
+    Reads the key signing the session cookies from a file, creating the file with a random key
+    on first start. Every visitor's bookmark list is found through the id in their session, so
+    the key must outlive restarts and be the same in every worker.
+
+    :param path (str, optional): The file holding the key.
+
+    :return: The key, as bytes.
+    """
+    if not os.path.exists(path):
+        #Writes the key aside and links it into place, so a process starting at the same time
+        #either sees no file or the whole key, and only one key is ever kept.
+        temporary = f"{path}.{os.getpid()}"
+        with open(os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as file:
+            file.write(os.urandom(32))
+        try:
+            os.link(temporary, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(temporary)
+
+    with open(path, 'rb') as file:
+        return file.read()
 
 app = flask.Flask(__name__)     #Initializes the Flask application.
-app.secret_key = os.urandom(24) #Sets a random secret key for session security.
+#Sets the secret key for session security: SECRET_KEY if set, otherwise the key kept in SECRET_KEY_FILE.
+app.secret_key = os.environ.get('SECRET_KEY') or load_secret_key()
 
 app.add_url_rule('/',
                  view_func=Index.as_view('index'),
@@ -28,5 +64,62 @@ app.add_url_rule('/manage',
                  view_func=Manage.as_view('manage'),
                  methods=['GET', 'POST'])
 
+app.add_url_rule('/stats',
+                 view_func=Stats.as_view('stats'),
+                 methods=['GET'])
+
+#Versioned JSON API.
+app.add_url_rule('/api/v1/bookmarks',
+                 view_func=BookmarksAPI.as_view('api-bookmarks'),
+                 methods=['GET', 'POST'])
+
+app.add_url_rule('/api/v1/bookmark',
+                 view_func=BookmarkAPI.as_view('api-bookmark'),
+                 methods=['PATCH', 'DELETE'])
+
+app.add_url_rule('/api/v1/search',
+                 view_func=SearchAPI.as_view('api-search'),
+                 methods=['GET'])
+
+#Bulk import and export of the visitor's bookmarks as CSV or JSON Lines.
+app.add_url_rule('/import',
+                 view_func=Import.as_view('import'),
+                 methods=['POST'])
+
+app.add_url_rule('/export',
+                 view_func=Export.as_view('export'),
+                 methods=['GET'])
+
+#Prometheus metrics; also times every request and template render.
+app.add_url_rule('/metrics',
+                 view_func=Metrics.as_view('metrics'),
+                 methods=['GET'])
+metrics.init_app(app)
+
+@app.before_request
+def start_background_work():
+    """
+    Starts refreshing the most popular searches in the background (only if INTERNSHIP_PREFETCH=1).
+    Started by the first request rather than on import, so the thread runs in the worker serving
+    requests even when gunicorn imports the app before forking (preload_app).
+    """
+    start_prefetch()
+
+@app.cli.command('claim-bookmarks')
+@click.argument('user_id')
+def claim_bookmarks(user_id: str):
+    """
+    Moves the bookmarks made before lists were per user into the list of USER_ID, shown on the
+    manage page of the browser claiming them.
+    """
+    click.echo(f"Moved {gbmodel.claim_bookmarks(user_id)} bookmarks.")
+
+def load_templates():
+    """
+    Compiles every template ahead of the first request, which would otherwise pay for it.
+    """
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
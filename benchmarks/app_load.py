@@ -0,0 +1,126 @@
+"""
+Drives the Flask app with concurrent simulated users, offline: the 'Internship API' is replaced
+by the local stub from benchmarks/stub_api.py. Every user searches once, then keeps viewing the
+display page, viewing the manage page and bookmarking postings. The run is repeated for both
+gbmodel backends (the Datastore backend runs against the in-memory FakeClient) and reports the
+throughput and the p50/p95/p99 latency of every route.
+
+Run from the repository root:
+
+    python -m benchmarks.app_load [--users 8] [--requests 50] [--bookmarks 200] [--latency 50] [--error-rate 0]
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+
+from benchmarks import stub_api
+from benchmarks.common import make_entry, percentile
+
+#Share of each operation in the workload of a simulated user.
+WORKLOAD = {"GET /display": 4, "GET /manage": 4, "POST /display": 2}
+SEARCHES = [(title, "", "") for title in stub_api.TITLES] + [("Intern", organization, "") for organization in stub_api.ORGANIZATIONS]
+
+def bookmark(i: int):
+    """
+    :return: The i-th bookmark, of a posting like those the stub serves.
+    """
+    return make_entry(i, internship_title=f"{stub_api.TITLES[i % len(stub_api.TITLES)]} Intern",
+                      organization=stub_api.ORGANIZATIONS[i % len(stub_api.ORGANIZATIONS)],
+                      location=stub_api.LOCATIONS[i % len(stub_api.LOCATIONS)],
+                      internship_url=f"https://jobs.example.com/bookmarked/{i}")
+
+def make_model(backend: str, directory: str):
+    """
+    :return: A fresh model of the given backend.
+    """
+    if backend == 'sqlite3':
+        from gbmodel import model_sqlite3
+        return model_sqlite3.model(os.path.join(directory, f"load-{uuid.uuid4().hex}.db"))
+
+    from gbmodel import model_datastore
+    from gbmodel.datastore_fake import FakeClient
+    return model_datastore.model(FakeClient())
+
+def simulate_user(app, model, seed: int, requests: int, bookmarks: int):
+    """
+    Runs the requests of one simulated user with its own session.
+
+    :return: A list of (operation, latency in seconds, failed) tuples.
+    """
+    rng = random.Random(seed)
+    client = app.test_client()
+    user_id = uuid.uuid4().hex
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+    model.insert_many([bookmark(i) for i in range(bookmarks)], user_id)
+
+    title, organization, location = rng.choice(SEARCHES)
+    client.post('/search', data={'title_filter': title, 'organization_filter': organization, 'location_filter': location})
+
+    operations = list(WORKLOAD)
+    weights = list(WORKLOAD.values())
+    samples = []
+    for i in range(requests):
+        operation = rng.choices(operations, weights)[0]
+        start = time.perf_counter()
+        if operation == "GET /display":
+            response = client.get('/display')
+        elif operation == "GET /manage":
+            response = client.get('/manage')
+        else:
+            entry = bookmark(bookmarks + seed * requests + i)
+            response = client.post('/display', data={field: entry[field] for field in
+                                                     ('internship_title', 'organization', 'date_posted', 'location', 'internship_url')})
+        samples.append((operation, time.perf_counter() - start, response.status_code >= 400))
+    return samples
+
+def report(backend: str, samples: list, elapsed: float):
+    print(f"\n{backend}: {len(samples)} requests in {elapsed:.2f} s = {len(samples) / elapsed:.1f} req/s")
+    print(f"{'route':>14} | {'requests':>8} {'errors':>6} | {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for operation in WORKLOAD:
+        latencies = [latency * 1000 for name, latency, _ in samples if name == operation]
+        if not latencies:
+            continue
+        errors = sum(failed for name, _, failed in samples if name == operation)
+        print(f"{operation:>14} | {len(latencies):8d} {errors:6d} | {percentile(latencies, 0.5):8.2f} "
+              f"{percentile(latencies, 0.95):8.2f} {percentile(latencies, 0.99):8.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=8, help="Concurrent simulated users.")
+    parser.add_argument('--requests', type=int, default=50, help="Requests per user.")
+    parser.add_argument('--bookmarks', type=int, default=200, help="Bookmarks every user starts with.")
+    parser.add_argument('--latency', type=float, default=50, help="Mean latency of the stub API in milliseconds.")
+    parser.add_argument('--error-rate', type=float, default=0, help="Fraction of stub API requests that fail.")
+    parser.add_argument('--fixtures', help="Directory of recorded postings for the stub API.")
+    parser.add_argument('--backends', nargs='+', choices=['sqlite3', 'datastore'], default=['sqlite3', 'datastore'])
+    args = parser.parse_args()
+
+    stub = stub_api.start(fixtures=args.fixtures, latency=args.latency, error_rate=args.error_rate)
+    os.environ['INTERNSHIP_API_BASE_URL'] = stub.base_url
+
+    with tempfile.TemporaryDirectory() as directory:
+        #The app creates its databases in the working directory on import; keeps them out of the repository.
+        os.chdir(directory)
+        from app import app
+        import gbmodel
+
+        for backend in args.backends:
+            model = make_model(backend, directory)
+            gbmodel.appmodel = model
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.users) as executor:
+                runs = executor.map(simulate_user, [app] * args.users, [model] * args.users, range(args.users),
+                                    [args.requests] * args.users, [args.bookmarks] * args.users)
+                samples = [sample for run in runs for sample in run]
+            report(backend, samples, time.perf_counter() - start)
+
+    print(f"\nStub API: {stub.api.requests} requests, {stub.api.errors} failed.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Compares searching a user's bookmarks through the SQLite FTS5 index (model.search) against the
+naive approach of filtering the rows returned by model.select() in Python.
+
+Run from the repository root:
+
+    python -m benchmarks.bookmark_search [--rows 100000] [--queries 50]
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from benchmarks.common import TITLES, CITIES, make_entry, timed
+from gbmodel import model_sqlite3
+
+def naive_search(db, query: str, limit: int):
+    """
+    Keeps the rows whose title, organization or location contain every word of the query.
+    """
+    words = query.lower().split()
+    matches = []
+    for row in db.select():
+        text = f"{row[0]} {row[1]} {row[3]}".lower()
+        if all(word in text for word in words):
+            matches.append(row)
+            if len(matches) == limit:
+                break
+    return matches
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(0)
+    queries = [f"{random.choice(TITLES).split()[0]} {random.choice(CITIES).split(',')[0]}" for _ in range(args.queries)]
+    queries += [f"Organization{random.randrange(5000)}" for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = model_sqlite3.model(os.path.join(directory, "search.db"))
+        with db.transaction() as cursor:
+            cursor.executemany(model_sqlite3.INSERT, (model_sqlite3.to_params(make_entry(i, 5000)) for i in range(args.rows)))
+
+        indexed = timed(lambda query: db.search(query, 25), queries)
+        naive = timed(lambda query: naive_search(db, query, 25), queries)
+
+    print(f"rows: {args.rows}, queries: {len(queries)}")
+    print(f"model.search:         {indexed:10.3f} ms/query")
+    print(f"Python-side filter:   {naive:10.3f} ms/query")
+
+if __name__ == '__main__':
+    main()
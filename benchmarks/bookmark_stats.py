@@ -0,0 +1,81 @@
+"""
+Compares reading a user's application stats from the aggregates the models keep up to date
+(model.stats()) against counting them from model.select() on every view, as the number of
+bookmarks grows. For the Datastore backend, run against the in-memory FakeClient, it also
+counts the round-trips of a stats read and of a single insert, which now also updates the
+counters.
+
+Run from the repository root:
+
+    python -m benchmarks.bookmark_stats [--sizes 1000 10000 100000] [--reads 20]
+
+The FakeClient scans every entity in its store for each page of a query, so its timings grow with
+the store even for the single query reading the counters; the round-trips are the better guide to
+the real service. select() is only timed against it up to 10k bookmarks.
+"""
+from collections import Counter
+import argparse
+import os
+import tempfile
+
+from benchmarks.common import STATUSES, make_entry, timed
+
+FAKE_SCAN_LIMIT = 10000     #The most bookmarks select() is timed for against the FakeClient.
+
+def bookmark(i: int):
+    return make_entry(i, date_applied=f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}" if i % 3 else None,
+                      application_status=STATUSES[i % len(STATUSES)])
+
+def count_from_select(db, user_id: str):
+    """
+    Counts the bookmarks by status and by week applied from every row, as a stats page without
+    aggregates would.
+    """
+    from gbmodel.model_datastore import week_of
+
+    statuses, weeks = Counter(), Counter()
+    for row in db.select(user_id):
+        statuses[row.application_status or ''] += 1
+        week = week_of(row.date_applied)
+        if week is not None:
+            weeks[week] += 1
+    return {'application_status': dict(statuses), 'date_applied': dict(weeks)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--reads', type=int, default=20, help="Reads timed per size.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        #Importing the app's modules creates its databases in the working directory; keeps them out of the repository.
+        os.chdir(directory)
+        from gbmodel import model_sqlite3, model_datastore
+        from gbmodel.datastore_fake import FakeClient
+
+        print(f"{'backend':>9} {'bookmarks':>9} | {'stats() ms':>10} {'select() ms':>11} | {'RPCs':>4} {'insert RPCs':>11}")
+        for size in args.sizes:
+            client = FakeClient()
+            for name, db in (("sqlite3", model_sqlite3.model(os.path.join(directory, f"stats-{size}.db"))),
+                             ("datastore", model_datastore.model(client))):
+                db.insert_many((bookmark(i) for i in range(size)), 'benchmark')
+                aggregate = timed(lambda _: db.stats('benchmark'), range(args.reads))
+
+                scan = "-"
+                if name == "sqlite3" or size <= FAKE_SCAN_LIMIT:
+                    if db.stats('benchmark') != count_from_select(db, 'benchmark'):
+                        raise AssertionError(f"The {name} aggregates disagree with the bookmarks.")
+                    scan = f"{timed(lambda _: count_from_select(db, 'benchmark'), range(args.reads if name == 'sqlite3' else 1)):11.2f}"
+
+                rpcs = insert_rpcs = ""
+                if name == "datastore":
+                    before = client.rpc_count
+                    db.stats('benchmark')
+                    rpcs = client.rpc_count - before
+                    before = client.rpc_count
+                    db.insert(bookmark(size), 'benchmark')
+                    insert_rpcs = client.rpc_count - before
+                print(f"{name:>9} {size:9d} | {aggregate:10.2f} {scan:>11} | {rpcs:>4} {insert_rpcs:>11}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Moves a user's bookmarks from the sqlite3 backend to the Datastore backend (against the in-memory
+FakeClient) and back, through the streaming CSV export and the batched import behind /export and
+/import, and compares it with copying the same bookmarks with one insert() per bookmark. The peak
+memory of a transfer between two sqlite3 databases is traced to check it stays bounded; the
+FakeClient keeps every entity in memory, so transfers involving it are only timed. The FakeClient
+answers instantly and scans every entity per query page, so the Datastore round-trips it counts
+are the better guide to how long a transfer takes against the real service.
+
+Run from the repository root:
+
+    python -m benchmarks.bookmark_transfer [--bookmarks 100000] [--single 2000]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import make_entry
+
+def transfer(source, destination, path: str, trace: bool = False):
+    """
+    Exports every bookmark of the source to a CSV file, then imports the file into the destination.
+
+    :return: A tuple (export seconds, import seconds, peak traced memory in bytes or None, import counts).
+    """
+    from transfer import export_pages, write_csv, read_csv, import_records
+
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with open(path, "w", newline="") as file:
+        for chunk in write_csv(export_pages(source, 'benchmark')):
+            file.write(chunk)
+    exported = time.perf_counter()
+
+    with open(path, newline="") as file:
+        counts = import_records(destination, read_csv(file), 'benchmark')
+    imported = time.perf_counter()
+
+    peak = None
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return exported - start, imported - exported, peak, counts
+
+def single_inserts(source, destination, count: int):
+    """
+    :return: The seconds taken to copy the first count bookmarks of the source with one insert() each.
+    """
+    rows, _ = source.select_page(limit=count, user_id='benchmark')
+    start = time.perf_counter()
+    for row in rows:
+        destination.insert(dict(zip(('internship_title', 'organization', 'date_posted', 'location', 'internship_url',
+                                     'date_applied', 'application_status'), row)), 'benchmark')
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bookmarks', type=int, default=100000)
+    parser.add_argument('--single', type=int, default=2000, help="Bookmarks copied one insert() at a time for comparison.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        #Importing the app's modules creates its databases in the working directory; keeps them out of the repository.
+        os.chdir(directory)
+        from gbmodel import model_sqlite3, model_datastore
+        from gbmodel.datastore_fake import FakeClient
+
+        sqlite = model_sqlite3.model(os.path.join(directory, "source.db"))
+        sqlite.insert_many((make_entry(i) for i in range(args.bookmarks)), 'benchmark')
+        client = FakeClient()
+        datastore = model_datastore.model(client)
+        copy = model_sqlite3.model(os.path.join(directory, "copy.db"))
+
+        print(f"{'transfer':>22} | {'export s':>8} {'import s':>8} {'RPCs':>7} | imported")
+        for name, source, destination in (("sqlite3 -> datastore", sqlite, datastore), ("datastore -> sqlite3", datastore, copy)):
+            rpcs = client.rpc_count
+            exported, imported, _, counts = transfer(source, destination, os.path.join(directory, "bookmarks.csv"))
+            print(f"{name:>22} | {exported:8.2f} {imported:8.2f} {client.rpc_count - rpcs:7d} | {counts['imported']} of {counts['read']}")
+
+        _, _, peak, _ = transfer(sqlite, model_sqlite3.model(os.path.join(directory, "traced.db")), os.path.join(directory, "traced.csv"), trace=True)
+        print(f"\nPeak memory of sqlite3 -> sqlite3 under tracemalloc: {peak / 1024**2:.2f} MB")
+
+        print(f"\nOne insert() per bookmark, extrapolated from {args.single} bookmarks to {args.bookmarks}:")
+        single_client = FakeClient()
+        seconds = single_inserts(sqlite, model_datastore.model(single_client), args.single)
+        print(f"{'sqlite3 -> datastore':>22} | {seconds * args.bookmarks / args.single:8.1f} s "
+              f"{single_client.rpc_count * args.bookmarks // args.single:9d} RPCs")
+        seconds = single_inserts(datastore, model_sqlite3.model(os.path.join(directory, "single.db")), args.single)
+        print(f"{'datastore -> sqlite3':>22} | {seconds * args.bookmarks / args.single:8.1f} s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Measures how long a fresh worker process takes to import the app and answer its first request,
+as a scale-to-zero container does on every cold start. Every run starts a new interpreter and
+reports, as the median of the runs:
+
+- import: importing app.py, which no longer builds the model;
+- model: the first get_model(), i.e. importing the backend module and building the model
+  (the SQLite schema check, or the Datastore client and with it google.cloud);
+- first request: the first GET /manage, without and with the warm-up of gunicorn.conf.py
+  beforehand (load_templates() and gbmodel.warm_up(), counted under model);
+- total: the whole process, from starting the interpreter to exiting.
+
+The Datastore backend is pointed at an emulator address nothing listens on, so its client is
+created offline but no request is sent to it.
+
+Run from the repository root:
+
+    python -m benchmarks.cold_start [--runs 10] [--backends sqlite3 datastore]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def child(backend: str, warm: bool, request: bool):
+    """
+    Runs in the measured process: imports the app, builds the model and serves one request.
+    Prints the seconds taken by each phase as JSON.
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    from app import app, load_templates
+    import gbmodel
+    timings['import'] = time.perf_counter() - start
+    timings['google.cloud loaded'] = 'google.cloud.datastore' in sys.modules
+
+    start = time.perf_counter()
+    if warm:
+        load_templates()
+        gbmodel.warm_up()
+    else:
+        gbmodel.get_model()
+    timings['model'] = time.perf_counter() - start
+
+    if request:
+        with app.test_client() as client:
+            start = time.perf_counter()
+            client.get('/manage')
+            timings['first request'] = time.perf_counter() - start
+
+    print(json.dumps(timings))
+
+def run(backend: str, warm: bool, request: bool, directory: str):
+    """
+    :return: The phase timings of one fresh process, with its total wall time.
+    """
+    env = dict(os.environ, GBMODEL_BACKEND=backend, PYTHONPATH=ROOT, DATASTORE_EMULATOR_HOST="127.0.0.1:9",
+               INTERNSHIP_PREFETCH="0")
+    start = time.perf_counter()
+    #Runs in a scratch directory so the databases the app creates stay out of the repository.
+    output = subprocess.run([sys.executable, "-m", "benchmarks.cold_start", "--child", backend]
+                            + (["--warm"] if warm else []) + (["--request"] if request else []),
+                            cwd=directory, env=env, capture_output=True, text=True, check=True).stdout
+    timings = json.loads(output.splitlines()[-1])
+    timings['total'] = time.perf_counter() - start
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--backends', nargs='+', choices=['sqlite3', 'datastore'], default=['sqlite3', 'datastore'])
+    parser.add_argument('--child', choices=['sqlite3', 'datastore'], help=argparse.SUPPRESS)
+    parser.add_argument('--warm', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--request', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args.child, args.warm, args.request)
+
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+    print(f"Bare interpreter start: {(time.perf_counter() - start) / args.runs * 1000:.0f} ms\n")
+
+    print(f"{'backend':>9} {'warm_up':>7} | {'import':>8} {'model':>8} {'request':>8} {'total':>8} | google.cloud after import")
+    for backend in args.backends:
+        #Only the SQLite backend can answer a request offline.
+        request = backend == 'sqlite3'
+        for warm in ((False, True) if request else (False,)):
+            with tempfile.TemporaryDirectory() as directory:
+                runs = [run(backend, warm, request, directory) for _ in range(args.runs)]
+
+            def median(phase):
+                if phase not in runs[0]:
+                    return f"{'-':>8}"
+                return f"{statistics.median(timings[phase] for timings in runs) * 1000:6.1f}ms"
+
+            print(f"{backend:>9} {'yes' if warm else 'no':>7} | {median('import')} {median('model')} {median('first request')} "
+                  f"{median('total')} | {'yes' if runs[0]['google.cloud loaded'] else 'no'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Helpers shared by the benchmarks: generated bookmarks and latency arithmetic.
+"""
+import time
+
+TITLES = ["Software Engineering", "Data Science", "Machine Learning", "Product Management", "Marketing",
+          "Mechanical Engineering", "Finance", "Cybersecurity", "UX Design", "Hardware"]
+CITIES = ["Portland, OR", "Seattle, WA", "San Francisco, CA", "New York, NY", "Austin, TX", "Remote"]
+STATUSES = [None, 'Not Yet Applied', 'Pending', 'Accepted', 'Rejected']
+
+def make_entry(i: int, organizations: int = 300, **fields):
+    """
+    Generates the i-th bookmark of a benchmark, in the format of Model.insert.
+
+    :param i (int): The number of the bookmark; its url is unique to it.
+    :param organizations (int, optional): The number of distinct organizations the bookmarks cycle through.
+    :param fields (optional): Values replacing the generated ones.
+
+    :return: A dictionary with the internship attributes.
+    """
+    entry = {
+        'internship_title': f"{TITLES[i % len(TITLES)]} Intern {i % 97}",
+        'organization': f"Organization{i % organizations}",
+        'date_posted': f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+        'location': CITIES[i % len(CITIES)],
+        'internship_url': f"https://example.com/jobs/{i}",
+        'date_applied': None,
+        'application_status': None
+    }
+    entry.update(fields)
+    return entry
+
+def timed(function, arguments):
+    """
+    Calls function once with each of the arguments.
+
+    :return: The mean milliseconds of a call.
+    """
+    arguments = list(arguments)
+    start = time.perf_counter()
+    for argument in arguments:
+        function(argument)
+    return (time.perf_counter() - start) * 1000 / len(arguments)
+
+def percentile(samples: list, q: float):
+    """
+    :return: The q-th quantile (0 to 1) of the samples, by the nearest-rank method.
+    """
+    return sorted(samples)[min(len(samples) - 1, int(q * len(samples)))]
@@ -0,0 +1,115 @@
+"""
+Load test of per-user bookmark lists in the sqlite3 backend: fills the table with 1k users of
+500 bookmarks each and checks that the latency of a user's reads and writes stays flat as
+other users' bookmarks pile up, i.e. that every query is O(user rows) rather than O(all rows).
+
+Latencies are measured after each stage of users has been loaded, then a mixed workload is
+run from several threads at once over the full table.
+
+Run from the repository root:
+
+    python -m benchmarks.multitenant [--stages 10 100 1000] [--bookmarks 500] [--ops 200] [--threads 8]
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+from benchmarks.common import TITLES, STATUSES, make_entry, percentile
+from gbmodel import model_sqlite3
+
+def bookmark(i: int):
+    return make_entry(i, application_status=STATUSES[i % len(STATUSES)])
+
+def operations(db, bookmarks: int):
+    """
+    :return: The per-user operations to measure, as (name, function of a random user id) pairs.
+    """
+    def page(user_id):
+        rows, cursor = db.select_page(limit=25, user_id=user_id)
+        db.select_page(cursor=cursor, limit=25, user_id=user_id)
+
+    def write(user_id):
+        entry = bookmark(bookmarks + random.randrange(10**6))
+        db.insert(entry, user_id)
+        db.delete(entry['internship_url'], user_id)
+
+    return [
+        ("select_page x2", page),
+        ("select_page status", lambda user_id: db.select_page({'application_status': "Pending"}, limit=25, user_id=user_id)),
+        ("search", lambda user_id: db.search(f"{random.choice(TITLES).split()[0]} intern", 25, user_id)),
+        ("get_version", db.get_version),
+        ("update_fields", lambda user_id: db.update_fields(f"https://example.com/jobs/{random.randrange(bookmarks)}",
+                                                           {'application_status': random.choice(STATUSES[1:])}, user_id)),
+        ("insert + delete", write),
+    ]
+
+def measure(db, users: list, bookmarks: int, ops: int):
+    """
+    :return: Maps every operation to its (p50, p95) latency in milliseconds over ops random users.
+    """
+    results = {}
+    for name, function in operations(db, bookmarks):
+        samples = []
+        for _ in range(ops):
+            user_id = random.choice(users)
+            start = time.perf_counter()
+            function(user_id)
+            samples.append((time.perf_counter() - start) * 1000)
+        results[name] = (statistics.median(samples), percentile(samples, 0.95))
+    return results
+
+def run_concurrent(db, users: list, bookmarks: int, ops: int, threads: int):
+    """
+    Runs ops random operations for random users from several threads at once.
+
+    :return: The throughput in operations per second.
+    """
+    functions = [function for _, function in operations(db, bookmarks)]
+
+    def work(_):
+        random.choice(functions)(random.choice(users))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(work, range(ops)))
+    return ops / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stages', type=int, nargs='+', default=[10, 100, 1000], help="Numbers of users to measure at.")
+    parser.add_argument('--bookmarks', type=int, default=500, help="Bookmarks per user.")
+    parser.add_argument('--ops', type=int, default=200, help="Operations measured per operation type and stage.")
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    random.seed(0)
+    entries = [bookmark(i) for i in range(args.bookmarks)]
+    users = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = model_sqlite3.model(os.path.join(directory, "multitenant.db"))
+
+        for stage in sorted(args.stages):
+            start = time.perf_counter()
+            while len(users) < stage:
+                user_id = uuid.uuid4().hex
+                db.insert_many(entries, user_id)
+                users.append(user_id)
+            loaded = time.perf_counter() - start
+
+            print(f"\n{len(users)} users x {args.bookmarks} bookmarks = {len(users) * args.bookmarks} rows "
+                  f"(loaded in {loaded:.1f} s)")
+            print(f"{'operation':>20} | {'p50 ms':>8} {'p95 ms':>8}")
+            for name, (p50, p95) in measure(db, users, args.bookmarks, args.ops).items():
+                print(f"{name:>20} | {p50:8.3f} {p95:8.3f}")
+
+        throughput = run_concurrent(db, users, args.bookmarks, args.ops * 10, args.threads)
+        print(f"\nMixed workload, {args.threads} threads: {throughput:.0f} ops/s")
+
+if __name__ == '__main__':
+    main()
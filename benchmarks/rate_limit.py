@@ -0,0 +1,125 @@
+"""
+Checks the upstream request scheduler against the local stub of the 'Internship API', with the
+result cache turned off so every page request reaches the scheduler:
+
+1. Coalescing: a burst of identical page requests from many threads, against the same number of
+   distinct requests, counting the calls that reach the stub.
+2. Shared token bucket: several worker processes request pages as fast as they can through one
+   SQLite rate limiter; together they should stay within rate + burst requests per second.
+3. Quota: the stub reports a small request quota in the RapidAPI headers; once it is used up the
+   workers should stop calling the API instead of collecting 429 responses.
+
+Run from the repository root:
+
+    python -m benchmarks.rate_limit [--threads 50] [--processes 4] [--rate 20] [--burst 5] [--seconds 3] [--quota 30]
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from benchmarks import stub_api
+
+def configure(base_url: str, db_file: str, rate: float, burst: float):
+    """
+    Points the internapi package at the stub and the shared limiter; must run before it is imported.
+    """
+    os.environ['INTERNSHIP_API_BASE_URL'] = base_url
+    os.environ['INTERNSHIP_CACHE_BACKEND'] = 'none'
+    os.environ['INTERNSHIP_RATE_LIMIT_BACKEND'] = 'sqlite'
+    os.environ['INTERNSHIP_RATE_LIMIT_DB'] = db_file
+    os.environ['INTERNSHIP_RATE_LIMIT'] = str(rate)
+    os.environ['INTERNSHIP_RATE_LIMIT_BURST'] = str(burst)
+
+def burst(threads: int, identical: bool):
+    """
+    Sends one page request from every thread at once.
+
+    :return: The number of requests that came back with data.
+    """
+    from internapi.fetch import ATS_ENDPOINT, fetch_page
+
+    def request(i):
+        offset = 0 if identical else i * stub_api.BATCH_SIZE
+        return fetch_page(None, ATS_ENDPOINT, offset, "Intern")
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return sum(1 for data in executor.map(request, range(threads)) if data)
+
+def worker(base_url: str, db_file: str, rate: float, burst: float, seconds: float, offset: int):
+    """
+    Requests distinct pages one after the other for the given number of seconds, in a process of its own.
+
+    :return: A tuple (pages fetched, requests refused by the scheduler, start time, end time).
+    """
+    configure(base_url, db_file, rate, burst)
+    from internapi.fetch import JB_ENDPOINT, fetch_page
+
+    fetched = refused = 0
+    started = time.time()
+    deadline = time.monotonic() + seconds
+    #Keeps the client's error messages for refused requests out of the report.
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        while time.monotonic() < deadline:
+            if fetch_page(None, JB_ENDPOINT, (offset + fetched + refused) * stub_api.BATCH_SIZE % 400) is None:
+                refused += 1
+                time.sleep(0.1)
+            else:
+                fetched += 1
+    return fetched, refused, started, time.time()
+
+def run_workers(processes: int, base_url: str, db_file: str, rate: float, burst: float, seconds: float):
+    """
+    :return: A tuple (pages fetched, requests refused, seconds from the first worker starting to the last one finishing).
+    """
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(processes) as pool:
+        results = pool.starmap(worker, [(base_url, db_file, rate, burst, seconds, p * 1000) for p in range(processes)])
+    return (sum(result[0] for result in results), sum(result[1] for result in results),
+            max(result[3] for result in results) - min(result[2] for result in results))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=50, help="Concurrent page requests in the coalescing burst.")
+    parser.add_argument('--processes', type=int, default=4, help="Worker processes sharing the token bucket.")
+    parser.add_argument('--rate', type=float, default=20, help="Requests per second allowed by the token bucket.")
+    parser.add_argument('--burst', type=float, default=5, help="Size of the token bucket.")
+    parser.add_argument('--seconds', type=float, default=3, help="How long the worker processes run.")
+    parser.add_argument('--quota', type=int, default=30, help="Requests per minute allowed by the stub in the quota run.")
+    parser.add_argument('--latency', type=float, default=50, help="Mean latency of the stub API in milliseconds.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        stub = stub_api.start(latency=args.latency)
+        #A generous bucket, so only the coalescing is measured in the first run.
+        configure(stub.base_url, os.path.join(directory, "burst.db"), 10**6, 10**6)
+        os.chdir(directory)
+
+        print(f"{args.threads} concurrent page requests:")
+        for identical in (True, False):
+            before = stub.api.requests
+            start = time.perf_counter()
+            pages = burst(args.threads, identical)
+            print(f"  {'identical' if identical else 'distinct':>9}: {stub.api.requests - before:4d} upstream calls, "
+                  f"{pages} pages returned in {time.perf_counter() - start:.2f} s")
+
+        before = stub.api.requests
+        fetched, refused, elapsed = run_workers(args.processes, stub.base_url, os.path.join(directory, "shared.db"),
+                                                args.rate, args.burst, args.seconds)
+        calls = stub.api.requests - before
+        print(f"\n{args.processes} processes for {args.seconds:.0f} s sharing {args.rate:.0f} requests/s (burst {args.burst:.0f}):")
+        print(f"  {calls} upstream calls in {elapsed:.2f} s = {calls / elapsed:.1f}/s (ceiling {args.rate + args.burst / elapsed:.1f}/s), "
+              f"{fetched} pages fetched, {refused} refused")
+
+        quota_stub = stub_api.start(latency=args.latency, quota=args.quota)
+        fetched, refused, _ = run_workers(args.processes, quota_stub.base_url, os.path.join(directory, "quota.db"),
+                                       args.rate, args.burst, args.seconds)
+        print(f"\nQuota of {args.quota} requests per minute, {args.processes} processes for {args.seconds:.0f} s:")
+        print(f"  {quota_stub.api.requests} upstream calls, {quota_stub.api.rejected} answered 429, "
+              f"{fetched} pages fetched, {refused} refused by the scheduler")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Measures the memory held by the postings and bookmarks the app keeps around, before and after
+they became Posting and Bookmark records:
+
+1. Postings: pages shaped like the upstream results (see stub_api), decoded into dictionaries
+   with every field as response.json() did, against parse_postings, which keeps only the fields
+   of Posting.
+2. Bookmarks: the rows of model.select() as plain tuples, as dictionaries as the manage page
+   used to build them, and as the Bookmark records it returns now.
+
+Memory is measured with tracemalloc: "held" is what the results keep allocated, "peak" the most
+allocated at any time while building them.
+
+Run from the repository root:
+
+    python -m benchmarks.record_memory [--postings 20000] [--bookmarks 100000]
+"""
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import stub_api
+
+def measure(build):
+    """
+    :return: A tuple (result, seconds, held bytes, peak bytes) of calling build().
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, held, peak
+
+def report(name: str, count: int, seconds: float, held: int, peak: int):
+    print(f"{name:>22} | {seconds:7.2f} {held / 1024**2:9.1f} {peak / 1024**2:9.1f} {held / count:10.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--postings', type=int, default=20000)
+    parser.add_argument('--bookmarks', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        #Importing the app's modules creates its databases in the working directory; keeps them out of the repository.
+        os.chdir(directory)
+        from internapi.records import parse_postings
+        from gbmodel import model_sqlite3
+
+        postings = stub_api.generate_postings(stub_api.ENDPOINTS[0], args.postings)
+        pages = [json.dumps(postings[i:i + stub_api.BATCH_SIZE]).encode() for i in range(0, len(postings), stub_api.BATCH_SIZE)]
+        del postings
+
+        print(f"{args.postings} postings in pages of {stub_api.BATCH_SIZE}:")
+        print(f"{'':>22} | {'seconds':>7} {'held MB':>9} {'peak MB':>9} {'bytes each':>10}")
+        for name, parse in (("dictionaries", json.loads), ("Posting records", parse_postings)):
+            result, seconds, held, peak = measure(lambda: [posting for page in pages for posting in parse(page)])
+            report(name, len(result), seconds, held, peak)
+            del result
+
+        db = model_sqlite3.model(os.path.join(directory, "bookmarks.db"))
+        db.insert_many(({
+            'internship_title': f"Software Engineering Intern {i}",
+            'organization': f"Organization{i % 300}",
+            'date_posted': f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            'location': "Portland, OR",
+            'internship_url': f"https://example.com/jobs/{i}",
+            'date_applied': None,
+            'application_status': None
+        } for i in range(args.bookmarks)), 'benchmark')
+
+        def tuples():
+            with db.connection() as connection:
+                return connection.execute(model_sqlite3.SELECT_ALL, ('benchmark',)).fetchall()
+
+        def dictionaries():
+            return [dict(zip(model_sqlite3.COLUMNS.split(", "), row)) for row in tuples()]
+
+        print(f"\n{args.bookmarks} bookmarks from select():")
+        print(f"{'':>22} | {'seconds':>7} {'held MB':>9} {'peak MB':>9} {'bytes each':>10}")
+        for name, select in (("tuples", tuples), ("dictionaries", dictionaries), ("Bookmark records", lambda: db.select('benchmark'))):
+            result, seconds, held, peak = measure(select)
+            report(name, len(result), seconds, held, peak)
+            del result
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Measures how single-bookmark insert and delete latency of the sqlite3 backend scales with
+the size of the "bookmarked_internships" table, with and without the schema indexes.
+
+Run from the repository root:
+
+    python -m benchmarks.sqlite_writes [--sizes 1000 10000 100000 1000000] [--ops 100]
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from benchmarks.common import make_entry
+from gbmodel import model_sqlite3
+
+#The statements of the original schema, before bookmarks were indexed or kept per user.
+LEGACY_INSERT = ("insert into bookmarked_internships (internship_title, organization, date_posted, location, internship_url, date_applied, application_status) "
+                 "VALUES (:internship_title, :organization, :date_posted, :location, :internship_url, :date_applied, :application_status)")
+LEGACY_DELETE = "delete from bookmarked_internships where internship_url=?"
+
+def populate(connection, rows: int):
+    connection.executemany(model_sqlite3.INSERT, (model_sqlite3.to_params(make_entry(i, 5000)) for i in range(rows)))
+    connection.commit()
+
+def time_ops(insert, delete, start: int, ops: int):
+    """
+    :return: The mean insert and delete latency in milliseconds over ops operations.
+    """
+    t0 = time.perf_counter()
+    for i in range(start, start + ops):
+        insert(make_entry(i, 5000))
+    t1 = time.perf_counter()
+    for i in range(start, start + ops):
+        delete(f"https://example.com/jobs/{i}")
+    t2 = time.perf_counter()
+    return (t1 - t0) * 1000 / ops, (t2 - t1) * 1000 / ops
+
+def bench_indexed(directory: str, rows: int, ops: int):
+    db = model_sqlite3.model(os.path.join(directory, f"indexed-{rows}.db"))
+    with db.connection() as connection:
+        populate(connection, rows)
+    return time_ops(db.insert, db.delete, rows, ops)
+
+def bench_unindexed(directory: str, rows: int, ops: int):
+    """
+    Replays the pre-migration access pattern: no indexes, an existence check before every insert.
+    """
+    connection = sqlite3.connect(os.path.join(directory, f"unindexed-{rows}.db"))
+    connection.execute(model_sqlite3.MIGRATIONS[0][0])
+    connection.executemany(LEGACY_INSERT, (make_entry(i, 5000) for i in range(rows)))
+    connection.commit()
+
+    def insert(entry):
+        if connection.execute("select exists(select 1 from bookmarked_internships where internship_url = ?)", (entry['internship_url'],)).fetchone()[0] == 0:
+            connection.execute(LEGACY_INSERT, entry)
+        connection.commit()
+
+    def delete(url):
+        connection.execute(LEGACY_DELETE, (url,))
+        connection.commit()
+
+    return time_ops(insert, delete, rows, ops)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10**3, 10**4, 10**5, 10**6])
+    parser.add_argument('--ops', type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} | {'insert ms (old)':>15} {'insert ms (new)':>15} | {'delete ms (old)':>15} {'delete ms (new)':>15}")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.sizes:
+            old_insert, old_delete = bench_unindexed(directory, rows, args.ops)
+            new_insert, new_delete = bench_indexed(directory, rows, args.ops)
+            print(f"{rows:>10} | {old_insert:>15.3f} {new_insert:>15.3f} | {old_delete:>15.3f} {new_delete:>15.3f}")
+
+if __name__ == '__main__':
+    main()
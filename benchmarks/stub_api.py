@@ -0,0 +1,239 @@
+"""
+Local stand-in for the 'Internship API'. It serves the same endpoints, paging and filter
+parameters from recorded JSON postings, or from generated postings when none were recorded,
+with a configurable latency, error rate and request quota, so the app can be run and benchmarked
+without network access:
+
+    python -m benchmarks.stub_api [--port 8765] [--latency 50] [--error-rate 0.01] [--quota 100] [--fixtures DIR]
+    INTERNSHIP_API_BASE_URL=http://127.0.0.1:8765 python app.py
+
+Fixtures are recorded from the real API (INTERNSHIP_API_KEY must be set) with:
+
+    python -m benchmarks.stub_api --record DIR [--pages 20]
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import argparse
+import json
+import os
+import random
+import threading
+import time
+
+from benchmarks.common import TITLES
+
+ENDPOINTS = ("active-ats-7d", "active-jb-7d")
+BATCH_SIZE = 10             #Postings per page, as upstream.
+GENERATED_POSTINGS = 500    #Postings generated per endpoint when no fixtures are given.
+
+ORGANIZATIONS = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises", "Cyberdyne"]
+LOCATIONS = ["Portland, Oregon, United States", "Seattle, Washington, United States", "San Francisco, California, United States",
+             "New York, New York, United States", "Austin, Texas, United States", "Remote"]
+
+def generate_postings(endpoint: str, count: int = GENERATED_POSTINGS, seed: int = 0):
+    """
+    Generates postings shaped like the upstream results, newest first. Every fifth posting is
+    listed on both endpoints, like postings found by both upstream crawlers.
+
+    :return: A list of dictionary objects.
+    """
+    rng = random.Random(f"{seed}-{endpoint}")
+    postings = []
+    for i in range(count):
+        shared = i % 5 == 0
+        day = 7 - i * 7 // count
+        postings.append({
+            'id': f"{'shared' if shared else endpoint}-{i}",
+            'date_posted': f"2025-04-{day:02d}T{rng.randrange(24):02d}:{rng.randrange(60):02d}:00",
+            'title': f"{rng.choice(TITLES)} Intern",
+            'organization': rng.choice(ORGANIZATIONS),
+            'url': f"https://jobs.example.com/{'shared' if shared else endpoint}/{i}",
+            'locations_derived': [rng.choice(LOCATIONS)],
+            'source': endpoint.split("-")[1],
+            'employment_type': ["INTERN"],
+            'remote_derived': rng.random() < 0.2,
+            #Upstream results carry long descriptions the app never shows.
+            'description_text': " ".join(rng.choice(TITLES) for _ in range(120)),
+        })
+    return postings
+
+def load_postings(fixtures: str = None):
+    """
+    :return: Maps every endpoint name to its postings, read from fixtures/<endpoint>.json when available.
+    """
+    postings = {}
+    for endpoint in ENDPOINTS:
+        path = os.path.join(fixtures, endpoint + ".json") if fixtures else None
+        if path and os.path.exists(path):
+            with open(path) as file:
+                postings[endpoint] = json.load(file)
+        else:
+            postings[endpoint] = generate_postings(endpoint)
+    return postings
+
+def matches(posting: dict, title_filter: str, organization_filter: str, location_filter: str):
+    """
+    :return: True if the posting contains every filter keyword, ignoring case.
+    """
+    if title_filter and title_filter.lower() not in (posting.get('title') or "").lower():
+        return False
+    if organization_filter and organization_filter.lower() not in (posting.get('organization') or "").lower():
+        return False
+    if location_filter and not any(location_filter.lower() in location.lower() for location in posting.get('locations_derived') or []):
+        return False
+    return True
+
+class StubAPI():
+    """
+    The state of a stub server: the postings it serves, how slow and unreliable it is and,
+    optionally, the request quota it reports in the RapidAPI rate-limit headers.
+    """
+    def __init__(self, postings: dict, latency: float = 0, jitter: float = 0.5, error_rate: float = 0, error_status: int = 503,
+                 quota: int = None, quota_period: float = 60, seed: int = 0):
+        self.postings = postings
+        self.latency = latency          #Mean response time in milliseconds.
+        self.jitter = jitter            #Response times vary uniformly by this fraction around the mean.
+        self.error_rate = error_rate    #Fraction of requests answered with error_status.
+        self.error_status = error_status
+        self.quota = quota              #Requests allowed per quota_period seconds; None for no quota.
+        self.quota_period = quota_period
+        self.quota_used = 0
+        self.quota_started = time.time()
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+
+    def respond(self, endpoint: str, query: dict):
+        """
+        :return: A tuple (status, body, headers) answering a request for one page.
+        """
+        headers = {}
+        with self.lock:
+            self.requests += 1
+            delay = self.latency * self.random.uniform(1 - self.jitter, 1 + self.jitter) / 1000
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+
+            if self.quota is not None:
+                now = time.time()
+                if now - self.quota_started >= self.quota_period:
+                    self.quota_started, self.quota_used = now, 0
+                exceeded = self.quota_used >= self.quota
+                if exceeded:
+                    self.rejected += 1
+                else:
+                    self.quota_used += 1
+                reset = self.quota_period - (now - self.quota_started)
+                headers = {'X-RateLimit-Requests-Limit': str(self.quota),
+                           'X-RateLimit-Requests-Remaining': str(self.quota - self.quota_used),
+                           'X-RateLimit-Requests-Reset': str(max(int(reset), 1))}
+                if exceeded:
+                    return 429, {'message': "You have exceeded the rate limit per minute for your plan"}, headers
+
+        time.sleep(delay)
+
+        if endpoint not in self.postings:
+            return 404, {'message': "Endpoint does not exist"}, headers
+        if failed:
+            return self.error_status, {'message': "Service unavailable"}, headers
+
+        offset = int(query.get('offset', 0) or 0)
+        results = [posting for posting in self.postings[endpoint]
+                   if matches(posting, query.get('title_filter'), query.get('organization_filter'), query.get('location_filter'))]
+        return 200, results[offset:offset + BATCH_SIZE], headers
+
+def make_handler(api: StubAPI):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   #Keeps connections alive like the real API.
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            query = {name: values[0] for name, values in parse_qs(url.query).items()}
+            status, body, headers = api.respond(url.path.strip("/"), query)
+
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def start(port: int = 0, fixtures: str = None, **options):
+    """
+    Starts a stub server on a background thread.
+
+    :param port (int, optional): The port to listen on; 0 picks a free one.
+    :param fixtures (str, optional): A directory of recorded <endpoint>.json postings.
+    :param options: Passed on to StubAPI (latency, jitter, error_rate, error_status, quota, quota_period, seed).
+
+    :return: The server. Its base_url attribute is the value for INTERNSHIP_API_BASE_URL and
+             its api attribute holds the request counters.
+    """
+    api = StubAPI(load_postings(fixtures), **options)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(api))
+    server.daemon_threads = True
+    server.api = api
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, name="stub-api", daemon=True).start()
+    return server
+
+def record(directory: str, pages: int):
+    """
+    Saves unfiltered pages of both real endpoints to directory/<endpoint>.json.
+    """
+    from internapi.client import get_client
+    from internapi.fetch import API_BASE_URL
+
+    os.makedirs(directory, exist_ok=True)
+    for endpoint in ENDPOINTS:
+        postings = []
+        for page in range(pages):
+            #Keeps every field of the results rather than only those of Posting, and bypasses the cache.
+            data = get_client().get_page(os.environ.get('INTERNSHIP_API_KEY'), f"{API_BASE_URL}/{endpoint}",
+                                         {"offset": page * BATCH_SIZE}, parse=json.loads)
+            if not data:
+                break
+            postings.extend(data)
+
+        with open(os.path.join(directory, endpoint + ".json"), "w") as file:
+            json.dump(postings, file)
+        print(f"Recorded {len(postings)} postings of {endpoint}.")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures', help="Directory of recorded <endpoint>.json postings (default: generated postings).")
+    parser.add_argument('--latency', type=float, default=50, help="Mean response time in milliseconds.")
+    parser.add_argument('--jitter', type=float, default=0.5)
+    parser.add_argument('--error-rate', type=float, default=0, help="Fraction of requests that fail.")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--quota', type=int, help="Requests allowed per --quota-period seconds, reported in the RapidAPI rate-limit headers.")
+    parser.add_argument('--quota-period', type=float, default=60)
+    parser.add_argument('--record', metavar='DIR', help="Record fixtures from the real API into DIR and exit.")
+    parser.add_argument('--pages', type=int, default=20, help="Pages recorded per endpoint.")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.pages)
+        return
+
+    server = start(args.port, args.fixtures, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, error_status=args.error_status,
+                   quota=args.quota, quota_period=args.quota_period)
+    print(f"Serving the stub Internship API at {server.base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
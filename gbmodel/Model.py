@@ -1,34 +1,88 @@
+from typing import NamedTuple
+
+class Bookmark(NamedTuple):
+    """
+    A bookmarked internship, as returned by every method reading bookmarks. Being a tuple it holds
+    no per-row dictionary, and rows can still be unpacked or indexed in column order.
+    """
+    internship_title: str
+    organization: str
+    date_posted: str
+    location: str
+    internship_url: str
+    date_applied: str
+    application_status: str
+
+#Every user has their own list of bookmarks. Methods called without a user_id work on the
+#list of the default user, which also holds the bookmarks made before lists were per user.
+DEFAULT_USER = ''
+
+#How insert_many treats an entry whose internship url the user has already bookmarked: keep the
+#existing bookmark ('skip') or overwrite it with the entry ('replace').
+CONFLICT_MODES = ("skip", "replace")
+
+#The attributes stats() counts bookmarks by: the application status, and the week of the date
+#applied, named by the date of its Monday.
+STATS_DIMENSIONS = ("application_status", "date_applied")
+
 class Model():
-    def select(self):
+    def select(self, user_id: str = DEFAULT_USER):
         """
-        Gets all rows from the "Bookmarked Internships" database.
+        Gets all rows of a user from the "Bookmarked Internships" database.
         Each row contains: internship_title, organization, date_posted, location, internship_url, date_applied, application_status
-        :return: List of lists containing all rows of database
+        :param user_id (str, optional): The user whose bookmarks to get (default: the default user).
+        :return: List of Bookmark records containing all rows of database
+        """
+        pass
+
+    def get_version(self, user_id: str = DEFAULT_USER):
+        """
+        Gets the change counter of a user's bookmarks in the "Bookmarked Internships" database. It goes
+        up on every insert, update and delete, so it can serve as a validator for HTTP caching.
+
+        :param user_id (str, optional): The user whose change counter to get (default: the default user).
+
+        :return: A tuple (version, modified) where modified is a Unix timestamp of the last change.
         """
         pass
 
-    def insert(self, new_entry: dict):
+    def stats(self, user_id: str = DEFAULT_USER):
+        """
+        Counts a user's bookmarks by application status and by the week they were applied to. The
+        counts are kept up to date by every write, so reading them does not depend on the number of bookmarks.
+
+        :param user_id (str, optional): The user whose bookmarks to count (default: the default user).
+
+        :return: A dictionary mapping each of STATS_DIMENSIONS to a dictionary of counts. Statuses are
+                 keyed by their value ('' for bookmarks without one); weeks by the date of their Monday
+                 ('YYYY-MM-DD'), counting only bookmarks with a date applied.
+        """
+        pass
+
+    def insert(self, new_entry: dict, user_id: str = DEFAULT_USER):
         """
         Inserts an entry into the "Bookmarked Internships" database.
 
         :new_entry (dict): A dictionary object containing information about the internship posting to be added.
+        :user_id (str, optional): The user bookmarking the posting (default: the default user).
 
-        :return: True if an entry was added to the database. False if there already exists a row in the database with the same internship url as the entry to be added.
+        :return: True if an entry was added to the database. False if the user already has a row in the database with the same internship url as the entry to be added.
         :raises: Database errors on connection and insertion
         """
         pass
 
-    def delete(self, internship_url: str):
+    def delete(self, internship_url: str, user_id: str = DEFAULT_USER):
         """
         Deletes an entry from the "Bookmarked Internships" database based on the provided internship url.
 
         :param internship_url (str): The url of the bookmarked internship posting to be removed.
+        :param user_id (str, optional): The user owning the bookmark (default: the default user).
 
         :return: True if a row was actually removed. False, otherwise.
         """
         pass
 
-    def update(self, internship_url: str, attribute: str, value):
+    def update(self, internship_url: str, attribute: str, value, user_id: str = DEFAULT_USER):
         """
         Updates a specific attribute of an entry from the "Bookmarked Internships" database.
         on the provided internship url.
@@ -36,8 +90,90 @@ class Model():
         :param internship_url (str): The url of the bookmarked internship posting to be updated.
         :param attribute (str): The name of the attribute(column) in the table to be updated.
         :param value (str): The new value 
+        :param user_id (str, optional): The user owning the bookmark (default: the default user).
 
         :return: True 
         """
         pass
 
+
+    def select_page(self, filters: dict = None, sort: str = "-date_posted", cursor: str = None, limit: int = 25, user_id: str = DEFAULT_USER):
+        """
+        Gets one page of a user's rows from the "Bookmarked Internships" database using keyset pagination,
+        so the cost of a page depends neither on how deep into the results it is nor on how many
+        bookmarks other users have.
+
+        :param filters (dict, optional): Maps 'application_status' and/or 'organization' to the value the rows must have.
+        :param sort (str, optional): 'date_posted' for oldest first or '-date_posted' for newest first (default).
+        :param cursor (str, optional): The cursor returned with the previous page; None for the first page.
+        :param limit (int, optional): The maximum number of rows in the page.
+        :param user_id (str, optional): The user whose bookmarks to get (default: the default user).
+
+        :return: A tuple (rows, next_cursor). rows is a list of Bookmark records; next_cursor is None on the last page.
+        :raises ValueError: If a filter or the sort order is not supported, or the cursor is invalid.
+        """
+        pass
+
+    def search(self, query: str, limit: int = 25, user_id: str = DEFAULT_USER):
+        """
+        Searches a user's bookmarked internships by title, organization and location.
+
+        :param query (str): The words to search for. Every word must match; the last word may be a prefix.
+        :param limit (int, optional): The maximum number of rows to return.
+        :param user_id (str, optional): The user whose bookmarks to search (default: the default user).
+
+        :return: List of Bookmark records, best matches first.
+        """
+        pass
+
+    def insert_many(self, new_entries: list, user_id: str = DEFAULT_USER, on_conflict: str = "skip"):
+        """
+        Inserts several entries into the "Bookmarked Internships" database in one batch.
+        Entries whose internship url is already bookmarked by the user are skipped, or overwrite
+        the existing bookmark with on_conflict='replace'.
+
+        :param new_entries (list): Dictionary objects in the same format as for insert().
+        :param user_id (str, optional): The user bookmarking the postings (default: the default user).
+        :param on_conflict (str, optional): 'skip' (default) or 'replace'.
+
+        :return: The number of entries actually added or replaced.
+        :raises ValueError: If on_conflict is not one of CONFLICT_MODES.
+        """
+        pass
+
+    def update_fields(self, internship_url: str, fields: dict, user_id: str = DEFAULT_USER):
+        """
+        Updates several attributes of an entry from the "Bookmarked Internships" database at once.
+
+        :param internship_url (str): The url of the bookmarked internship posting to be updated.
+        :param fields (dict): Maps 'date_applied' and/or 'application_status' to their new value.
+        :param user_id (str, optional): The user owning the bookmark (default: the default user).
+
+        :return: True if a row was actually changed. False, otherwise.
+        :raises ValueError: If one of the attributes cannot be updated.
+        """
+        pass
+
+    def update_many(self, internship_urls: list, fields: dict, user_id: str = DEFAULT_USER):
+        """
+        Sets the same attributes on several entries of the "Bookmarked Internships" database in one batch.
+
+        :param internship_urls (list): The urls of the bookmarked internship postings to be updated.
+        :param fields (dict): Maps 'date_applied' and/or 'application_status' to their new value.
+        :param user_id (str, optional): The user owning the bookmarks (default: the default user).
+
+        :return: The number of rows actually changed.
+        :raises ValueError: If one of the attributes cannot be updated.
+        """
+        pass
+
+    def delete_many(self, internship_urls: list, user_id: str = DEFAULT_USER):
+        """
+        Deletes several entries from the "Bookmarked Internships" database in one batch.
+
+        :param internship_urls (list): The urls of the bookmarked internship postings to be removed.
+        :param user_id (str, optional): The user owning the bookmarks (default: the default user).
+
+        :return: The number of rows removed.
+        """
+        pass
@@ -1,16 +1,75 @@
-model_backend = 'sqlite3'
-#model_backend = 'datastore'
+from .Model import Model, Bookmark, DEFAULT_USER, CONFLICT_MODES, STATS_DIMENSIONS
+from metrics import Instrumented, MODEL_SECONDS
+import importlib
+import os
+import threading
 
-if model_backend == 'sqlite3':
-    from .model_sqlite3 import model
+#The modules implementing each backend. They are only imported once the model is first needed,
+#so deployments using SQLite never load google.cloud.
+BACKENDS = {
+    'sqlite3': '.model_sqlite3',
+    'datastore': '.model_datastore'
+}
 
-elif model_backend == 'datastore':
-    from .model_datastore import model
+model_backend = os.environ.get('GBMODEL_BACKEND', 'sqlite3')
 
-else:
+if model_backend not in BACKENDS:
     raise ValueError("No appropriate backend database configured. ")
 
-appmodel = model()
+appmodel = None
+model_lock = threading.Lock()
+
+def load_backend(backend: str = model_backend):
+    """
+    Imports the module of a backend without building its model, e.g. in the gunicorn master
+    before it forks, so the workers share the imported code.
+
+    :return: The model class of the backend.
+    """
+    return importlib.import_module(BACKENDS[backend], __name__).model
 
 def get_model():
+    """
+    Builds the model of the configured backend on first use: the SQLite schema is checked or
+    the Datastore client created by the first request, not when the app is imported. Safe to
+    call from several threads at once; only one of them builds the model.
+
+    :return: The model, with every call of a Model method timed for the /metrics endpoint.
+    """
+    global appmodel
+
+    #Skips the lock once the model exists, which is every call but the first.
+    if appmodel is None:
+        with model_lock:
+            if appmodel is None:
+                appmodel = Instrumented(load_backend()(), MODEL_SECONDS, {name for name in vars(Model) if not name.startswith('_')})
     return appmodel
+
+def warm_up():
+    """
+    Builds the model and sends it one cheap query, so the first request does not pay for
+    opening the database or the connection to Datastore. Must run in the process that will use
+    the model, i.e. after gunicorn forks its workers, as connections do not survive a fork.
+    """
+    get_model().get_version()
+
+def claim_bookmarks(user_id: str, from_user: str = DEFAULT_USER):
+    """
+    Moves every bookmark of one user into the list of another, by default the bookmarks made
+    before lists were per user, which no visitor's session points at. Bookmarks of a url the
+    user already has are dropped, keeping the user's own.
+
+    :param user_id (str): The user receiving the bookmarks.
+    :param from_user (str, optional): The user whose bookmarks are moved (default: the default user).
+
+    :return: The number of bookmarks added to the user's list.
+    :raises ValueError: If both users are the same.
+    """
+    if user_id == from_user:
+        raise ValueError("Bookmarks can only be moved to another user.")
+
+    model = get_model()
+    rows = model.select(from_user)
+    added = model.insert_many((row._asdict() for row in rows), user_id)
+    model.delete_many([row.internship_url for row in rows], from_user)
+    return added
@@ -0,0 +1,231 @@
+"""
+In-memory stand-in for google.cloud.datastore.Client, so the Datastore backend can be
+exercised offline. It implements the subset of the client used by model_datastore and
+counts the round-trips the real client would make in rpc_count. Like Datastore, a
+transaction fails to commit with Aborted when an entity it read has been written since.
+
+    from gbmodel.datastore_fake import FakeClient
+    from gbmodel.model_datastore import model
+
+    client = FakeClient()
+    appmodel = model(client)
+"""
+import base64
+import threading
+from google.api_core.exceptions import Aborted, InvalidArgument
+from google.cloud import datastore
+
+class FakeIterator():
+    """
+    Mimics the page-based iterator returned by Query.fetch. Like Datastore, it may return fewer
+    results per batch than the limit (at most client.batch_size) and fetches the next batch,
+    one round-trip each, until the limit is reached or the results run out.
+    """
+    def __init__(self, client, results: list, start: int, limit: int):
+        self.client = client
+        self.results = results
+        self.start = start
+        self.limit = limit
+        self.next_page_token = None
+
+    @property
+    def pages(self):
+        end = len(self.results) if self.limit is None else min(len(self.results), self.start + self.limit)
+        position = self.start
+        while True:
+            self.client.rpc_count += 1
+            batch_end = end if self.client.batch_size is None else min(end, position + self.client.batch_size)
+
+            #Hands back a cursor pointing just after the last result returned, or none once every result has been.
+            self.next_page_token = base64.urlsafe_b64encode(str(batch_end).encode()) if batch_end < len(self.results) else None
+            yield iter(self.results[position:batch_end])
+
+            position = batch_end
+            if position >= end:
+                break
+
+    def __iter__(self):
+        for page in self.pages:
+            yield from page
+
+class FakeQuery():
+    """Supports namespaces, equality filters, ordering, projection and cursors."""
+    def __init__(self, client, kind: str = None, projection = (), ancestor = None, namespace: str = None):
+        self.client = client
+        self.kind = kind
+        self.namespace = namespace
+        self.projection = list(projection)
+        self.ancestor = ancestor
+        self.filters = []
+        self.order = []
+
+    def add_filter(self, property_name: str = None, operator: str = None, value = None, filter = None):
+        if filter is not None:
+            property_name, operator, value = filter.property_name, filter.operator, filter.value
+        if operator != '=':
+            raise NotImplementedError("FakeQuery only supports equality filters.")
+        self.filters.append((property_name, value))
+        return self
+
+    def matches(self, entity):
+        if self.ancestor is not None and entity.key.flat_path[:len(self.ancestor.flat_path)] != self.ancestor.flat_path:
+            return False
+        for name, value in self.filters:
+            stored = entity.get(name)
+            #List properties match when any of their values is equal, as in Datastore.
+            if not (value in stored if isinstance(stored, list) else stored == value):
+                return False
+        #Projection queries only return entities that have every projected property.
+        return all(name in entity for name in self.projection)
+
+    def fetch(self, limit: int = None, start_cursor = None, **kwargs):
+        #Selects the kind and namespace from the store keys; Key.kind copies the whole key path.
+        with self.client.lock:
+            entities = [entity for (namespace, path), entity in self.client.store.items()
+                        if namespace == self.namespace and path[-2] == self.kind]
+        results = [entity for entity in entities if self.matches(entity)]
+        results.sort(key=lambda entity: entity.key.flat_path)
+
+        #Applies the sort orders from the least to the most significant one.
+        for order in reversed(self.order):
+            name = order.lstrip('-')
+            results.sort(key=lambda entity: (entity.get(name) is not None, entity.get(name)), reverse=order.startswith('-'))
+
+        if self.projection:
+            projected = []
+            for entity in results:
+                copy = datastore.Entity(entity.key)
+                copy.update({name: entity[name] for name in self.projection})
+                projected.append(copy)
+            results = projected
+
+        #Like Datastore, a cursor that is not base64 fails to decode and any other foreign one is refused.
+        start = base64.urlsafe_b64decode(start_cursor) if start_cursor else b"0"
+        if not start.isdigit():
+            raise InvalidArgument("Invalid query cursor.")
+        return FakeIterator(self.client, results, int(start), limit)
+
+class FakeTransaction():
+    """
+    Buffers writes until the with block ends, then applies them as a single commit. The commit
+    is refused if an entity read in the transaction was written by another commit in between.
+    """
+    def __init__(self, client, begin_later: bool = False):
+        self.client = client
+        self.begin_later = begin_later
+        self.begun = False
+        self.puts = []
+        self.deletes = []
+        self.reads = {}     #(namespace, flat key path) -> version of the entity when first read
+
+    def touch(self):
+        #With begin_later the transaction starts with the first lookup instead of its own round-trip.
+        if not self.begun:
+            self.begun = True
+            if not self.begin_later:
+                self.client.rpc_count += 1
+
+    def __enter__(self):
+        self.client.transactions.append(self)
+        if not self.begin_later:
+            self.touch()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.client.transactions.pop()
+        if exc_type is None:
+            self.client.rpc_count += 1
+            with self.client.lock:
+                if any(self.client.versions.get(path, 0) != version for path, version in self.reads.items()):
+                    raise Aborted("Aborted due to cross-transaction contention.")
+                self.client.write(self.puts, self.deletes)
+        return False
+
+class FakeClient():
+    def __init__(self, project: str = 'fake-project', batch_size: int = None):
+        self.project = project
+        self.batch_size = batch_size    #The most results per query batch; None returns them all in one.
+        self.store = {}           #(namespace, flat key path) -> entity
+        self.versions = {}        #(namespace, flat key path) -> number of commits that wrote the entity
+        self.rpc_count = 0        #round-trips the real client would have made
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    @property
+    def transactions(self):
+        #Like the real client, every thread has its own stack of open transactions.
+        if not hasattr(self.local, 'transactions'):
+            self.local.transactions = []
+        return self.local.transactions
+
+    def key(self, *path_args, parent = None, namespace: str = None):
+        return datastore.Key(*path_args, project=self.project, parent=parent, namespace=namespace)
+
+    def query(self, kind: str = None, projection = (), ancestor = None, namespace: str = None, **kwargs):
+        return FakeQuery(self, kind, projection, ancestor, namespace)
+
+    def transaction(self, begin_later: bool = False, **kwargs):
+        return FakeTransaction(self, begin_later)
+
+    def current_transaction(self):
+        return self.transactions[-1] if self.transactions else None
+
+    def get(self, key):
+        entities = self.get_multi([key])
+        return entities[0] if entities else None
+
+    def write(self, entities: list = (), keys: list = ()):
+        """
+        Stores entities and removes keys, moving every one of them to a new version. Called with the lock held.
+        """
+        for entity in entities:
+            self.store[entity.key.namespace, entity.key.flat_path] = entity
+        for key in keys:
+            self.store.pop((key.namespace, key.flat_path), None)
+        for key in [entity.key for entity in entities] + list(keys):
+            path = (key.namespace, key.flat_path)
+            self.versions[path] = self.versions.get(path, 0) + 1
+
+    def get_multi(self, keys: list):
+        transaction = self.current_transaction()
+        if transaction is not None:
+            transaction.touch()
+        self.rpc_count += 1
+
+        #Returns copies so changes are only stored when the entity is put back.
+        found = []
+        with self.lock:
+            for key in keys:
+                path = (key.namespace, key.flat_path)
+                if transaction is not None:
+                    transaction.reads.setdefault(path, self.versions.get(path, 0))
+                entity = self.store.get(path)
+                if entity is not None:
+                    copy = datastore.Entity(entity.key)
+                    copy.update(entity)
+                    found.append(copy)
+        return found
+
+    def put(self, entity):
+        self.put_multi([entity])
+
+    def put_multi(self, entities: list):
+        transaction = self.current_transaction()
+        if transaction is not None:
+            transaction.puts.extend(entities)
+            return
+        self.rpc_count += 1
+        with self.lock:
+            self.write(entities=entities)
+
+    def delete(self, key):
+        self.delete_multi([key])
+
+    def delete_multi(self, keys: list):
+        transaction = self.current_transaction()
+        if transaction is not None:
+            transaction.deletes.extend(keys)
+            return
+        self.rpc_count += 1
+        with self.lock:
+            self.write(keys=keys)
@@ -1,17 +1,64 @@
-from .Model import Model
-from datetime import datetime
+from .Model import Model, Bookmark, DEFAULT_USER, CONFLICT_MODES, STATS_DIMENSIONS
+from collections import Counter
+from datetime import datetime, timedelta
+import hashlib
+import os
+import re
+import time
+from google.api_core.exceptions import InvalidArgument
 from google.cloud import datastore
+from google.cloud.datastore.query import PropertyFilter
+
+#Attributes that can be changed after an internship has been bookmarked.
+UPDATABLE = ("date_applied", "application_status")
+
+#The most entities a single Datastore lookup, commit or delete may carry.
+BATCH_LIMIT = 500
+
+#The properties select() projects; internship_url is the key name so it is read from the key.
+#The composite index serving this projection is declared in index.yaml.
+PROJECTION = ['internship_title', 'organization', 'date_posted', 'location', 'date_applied', 'application_status']
+STREAM_PAGE_SIZE = 300    #Entities fetched per round-trip when streaming all rows.
+
+#Attributes select_page can filter on, and the attribute it sorts by.
+FILTERABLE = ("application_status", "organization")
+SORTABLE = ("date_posted", "-date_posted")
+
+#Name of the entity marking a user's stats counters as counting every bookmark; see rebuild_stats.
+STATS_COMPLETE = 'complete'
+
+#A date applied counts towards the week of the date it starts with.
+DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+#User ids that can be used in a namespace name as they are; other ids are hashed first.
+NAMESPACE_SAFE = re.compile(r"[0-9A-Za-z._-]{1,90}")
+
+def namespace(user_id: str):
+    """
+    Maps a user to the Datastore namespace holding their bookmarks and change counter. Queries
+    never cross namespaces, so listing a user's bookmarks only reads that user's index entries.
+    The default user keeps the default namespace, where bookmarks were stored before lists were per user.
+
+    :param user_id (str): The id of the user.
+
+    :return: The namespace name, or None for the default namespace.
+    """
+    if user_id == DEFAULT_USER:
+        return None
+    if not NAMESPACE_SAFE.fullmatch(user_id):
+        user_id = hashlib.sha1(user_id.encode()).hexdigest()
+    return 'user-' + user_id
 
 def from_datastore(entity):
     """
-    Translates Datastore results into a dictionary format.
+    Translates Datastore results into a Bookmark record.
 
     :param entity: A datastore entity object.
 
     Datastore typically returns:
     [Entity{key: (kind, id), prop: val, ...}]
 
-    return: [ internship_title, organization, date_posted, location, internship_url ]
+    return: Bookmark( internship_title, organization, date_posted, location, internship_url, date_applied, application_status )
     where internship_title, organization, location, and internship_url are Python strings
     and where date_posted is a Python datetime
     """
@@ -22,15 +69,103 @@ def from_datastore(entity):
     if isinstance(entity, list):
         entity = entity.pop()   #Removes the last element in entity if it is a list.
 
-    return [entity['internship_title'],entity['organization'],entity['date_posted'],entity['location'],entity['internship_url'],entity['date_applied'],entity['application_status']]
+    return Bookmark(entity['internship_title'],entity['organization'],entity['date_posted'],entity['location'],entity['internship_url'],entity['date_applied'],entity['application_status'])
+
+def from_projection(entity):
+    """
+    Translates the result of a projection query on the displayed fields into the row format of select().
+
+    :param entity: A datastore entity holding only the PROJECTION properties.
+
+    return: Bookmark( internship_title, organization, date_posted, location, internship_url, date_applied, application_status )
+    """
+    return Bookmark(entity['internship_title'],entity['organization'],entity['date_posted'],entity['location'],entity.key.name,entity['date_applied'],entity['application_status'])
+
+def keywords(entry):
+    """
+    Builds the list of lowercase words of an entry's title, organization and location.
+    It is stored on every entity so search can be answered by the built-in property index.
+
+    :param entry: A dictionary or entity with the internship attributes.
+
+    :return: A sorted list of unique words.
+    """
+    text = " ".join(entry[attribute] or "" for attribute in ('internship_title', 'organization', 'location'))
+    return sorted(set(re.findall(r"\w+", text.lower())))
+
+def week_of(date_applied):
+    """
+    :return: The date of the Monday of the week of a date ('YYYY-MM-DD'), or None if the value is not a date.
+    """
+    match = DATE.match(str(date_applied or ""))
+    try:
+        day = datetime.strptime(match.group(), "%Y-%m-%d")
+    except (AttributeError, ValueError):
+        return None
+    return (day - timedelta(days=day.weekday())).strftime("%Y-%m-%d")
+
+def stats_counters(entry):
+    """
+    :param entry: A dictionary or entity with the internship attributes.
+
+    :return: The (dimension, value) counters of stats() the bookmark is counted in.
+    """
+    counters = [('application_status', entry['application_status'] or '')]
+    week = week_of(entry['date_applied'])
+    if week is not None:
+        counters.append(('date_applied', week))
+    return counters
+
+def stats_changes(removed = (), added = ()):
+    """
+    :return: A Counter of the changes to the stats counters when the removed bookmarks are replaced by the added ones.
+    """
+    changes = Counter()
+    for entry in removed:
+        changes.subtract(stats_counters(entry))
+    for entry in added:
+        changes.update(stats_counters(entry))
+    return changes
+
+def fitting(counters: list):
+    """
+    Finds how many bookmark writes fit in one commit together with the change counter and the
+    stats counters they add to.
+
+    :param counters (list): The stats counters touched by each write, in order.
+
+    :return: The number of writes, from the first, that fit.
+    """
+    touched = set()
+    for n, write in enumerate(counters):
+        touched.update(write)
+        if n + 2 + len(touched) > BATCH_LIMIT:
+            return n
+    return len(counters)
+
+def chunks(items: list, size: int = BATCH_LIMIT):
+    """
+    Splits a list into consecutive slices of at most size items.
+    """
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
 
 class model(Model):
-    def __init__(self):
-        self.client = datastore.Client('cloud-nguyen-huannguy')
+    def __init__(self, client = None):
+        #Any object with the datastore.Client interface can be passed in, e.g. the in-memory
+        #FakeClient from datastore_fake. The real client talks to the emulator when
+        #DATASTORE_EMULATOR_HOST is set.
+        self.client = client or datastore.Client(os.environ.get('DATASTORE_PROJECT', 'cloud-nguyen-huannguy'))
 
-    def select(self):
+    def bookmark_key(self, internship_url: str, user_id: str = DEFAULT_USER):
+        """
+        :return: The key of a user's bookmark of the given url, in the user's namespace.
         """
-        Fetches all rows from the "BookmarkedInternships" kind in the datastore.
+        return self.client.key('BookmarkedInternships', internship_url, namespace=namespace(user_id))
+
+    def select(self, user_id: str = DEFAULT_USER):
+        """
+        Fetches all rows of a user from the "BookmarkedInternships" kind in the datastore.
 
         Each row in the kind "BookmarkedInternships" contains: 
         - internship_title     (The title of the internship)
@@ -41,70 +176,370 @@ class model(Model):
         - date_applied         (The date the user applied for the internship position) 
         - application_status   (The current status of their application ('Not Yet Applied', 'Accepted', 'Pending', or 'Rejected')) 
 
-        :return: List of dictionaries, where each dictionary represents a row in the datastore.
+        :param user_id (str, optional): The user whose bookmarks to get (default: the default user).
+
+        :return: List of Bookmark records.
+        """
+        return list(self.iter_select(user_id=user_id))
+
+    def iter_select(self, page_size: int = STREAM_PAGE_SIZE, user_id: str = DEFAULT_USER):
+        """
+        Streams every row of a user from the "BookmarkedInternships" kind. A projection query reads only the
+        displayed fields from the index, and the results are fetched page by page with query
+        cursors so at most one page of entities is held at a time.
+
+        :param page_size (int, optional): The number of entities fetched per round-trip.
+        :param user_id (str, optional): The user whose bookmarks to get (default: the default user).
+
+        :yield: Rows in the same format as select().
+        """
+        cursor = None
+        while True:
+            #Cretes a projection query for the 'BookmarkedInternships' kind.
+            query = self.client.query(kind = 'BookmarkedInternships', projection = PROJECTION, namespace = namespace(user_id))
+
+            iterator = query.fetch(limit=page_size, start_cursor=cursor)
+            for batch in iterator.pages:
+                yield from map(from_projection, batch)
+
+            #A batch can be short while more results remain; only a missing cursor marks the end.
+            cursor = iterator.next_page_token
+            if not cursor:
+                break
+
+    def select_page(self, filters: dict = None, sort: str = "-date_posted", cursor: str = None, limit: int = 25, user_id: str = DEFAULT_USER):
+        """
+        Gets one page of a user's entities from the "BookmarkedInternships" kind using a native query cursor.
+        Filtered, sorted queries are served by the composite indexes declared in index.yaml.
+
+        :param filters (dict, optional): Maps 'application_status' and/or 'organization' to the value the rows must have.
+        :param sort (str, optional): 'date_posted' for oldest first or '-date_posted' for newest first (default).
+        :param cursor (str, optional): The cursor returned with the previous page; None for the first page.
+        :param limit (int, optional): The maximum number of rows in the page.
+        :param user_id (str, optional): The user whose bookmarks to get (default: the default user).
+
+        :return: A tuple (rows, next_cursor). next_cursor is None on the last page.
+        :raises ValueError: If a filter or the sort order is not supported, or the cursor is invalid.
+        """
+        filters = filters or {}
+        if sort not in SORTABLE or not set(filters) <= set(FILTERABLE):
+            raise ValueError("Unsupported filter or sort order.")
+
+        query = self.client.query(kind = 'BookmarkedInternships', namespace = namespace(user_id))
+        for attribute, value in filters.items():
+            query.add_filter(filter=PropertyFilter(attribute, '=', value))
+        query.order = [sort]
+
+        #Reads batches starting at the cursor until the limit is reached; Datastore may return
+        #fewer results per batch than asked for.
+        #The client decodes the cursor from base64 (binascii.Error is a ValueError) and Datastore
+        #refuses any cursor it did not hand out with InvalidArgument.
+        try:
+            iterator = query.fetch(limit=limit, start_cursor=cursor)
+            rows = [from_datastore(entity) for batch in iterator.pages for entity in batch]
+        except (ValueError, InvalidArgument):
+            raise ValueError("Invalid cursor.")
+
+        #Datastore hands back no cursor once there are no more results.
+        next_cursor = None
+        if iterator.next_page_token:
+            next_cursor = iterator.next_page_token.decode('ascii')
+
+        return rows, next_cursor
+
+    def search(self, query: str, limit: int = 25, user_id: str = DEFAULT_USER):
+        """
+        Searches a user's entities of the "BookmarkedInternships" kind by title, organization and location. Every word
+        of the query becomes an equality filter on the 'keywords' list property, which Datastore
+        answers by merging its built-in indexes. Datastore has no relevance ranking, so matches
+        come back in key order.
+
+        :param query (str): The words to search for. Every word must match.
+        :param limit (int, optional): The maximum number of rows to return.
+        :param user_id (str, optional): The user whose bookmarks to search (default: the default user).
+
+        :return: List of rows in the same format as select().
+        """
+        words = sorted(set(re.findall(r"\w+", query.lower())))
+        if not words:
+            return []
+
+        datastore_query = self.client.query(kind = 'BookmarkedInternships', namespace = namespace(user_id))
+        for word in words:
+            datastore_query.add_filter(filter=PropertyFilter('keywords', '=', word))
+
+        return list(map(from_datastore, datastore_query.fetch(limit=limit)))
+
+    def version_key(self, user_id: str = DEFAULT_USER):
+        """
+        :return: The key of the entity holding the change counter of a user's "BookmarkedInternships" entities.
+        """
+        return self.client.key('TableVersion', 'BookmarkedInternships', namespace=namespace(user_id))
+
+    def get_version(self, user_id: str = DEFAULT_USER):
+        """
+        Gets the change counter of a user's "BookmarkedInternships" entities. Every write bumps it in the
+        same transaction as the change itself.
+
+        :param user_id (str, optional): The user whose change counter to get (default: the default user).
+
+        :return: A tuple (version, modified) where modified is a Unix timestamp of the last change.
+        """
+        entity = self.client.get(self.version_key(user_id))
+        if entity is None:
+            return 0, 0.0
+        return entity['version'], entity['modified']
+
+    def lookup_with_version(self, keys: list, user_id: str = DEFAULT_USER, stats_keys: list = ()):
+        """
+        Looks up entities together with the user's change counter, and optionally some of the
+        user's stats counters, in a single round-trip.
+
+        :return: A tuple (entities found, change counter entity or None, counters). counters maps the
+                 name of every stats key looked up to its entity, or None if it does not exist yet.
         """
-        #Cretes a query for the 'BookmarkedInternships' kind.
-        query = self.client.query(kind = 'BookmarkedInternships')
+        entities = self.client.get_multi(keys + list(stats_keys) + [self.version_key(user_id)])
+        found = [entity for entity in entities if entity.key.kind == 'BookmarkedInternships']
+        version = next((entity for entity in entities if entity.key.kind == 'TableVersion'), None)
+        counters = {key.name: None for key in stats_keys}
+        counters.update((entity.key.name, entity) for entity in entities if entity.key.kind == 'BookmarkStats')
+        return found, version, counters
 
-        entities = list(map(from_datastore,query.fetch()))
-        return entities
+    def bumped_version(self, version, user_id: str = DEFAULT_USER):
+        """
+        :return: The change counter entity, incremented and stamped with the current time.
+        """
+        version = version or datastore.Entity(self.version_key(user_id))
+        version['version'] = (version.get('version') or 0) + 1
+        version['modified'] = time.time()
+        return version
+
+    def stats_key(self, counter: tuple, user_id: str = DEFAULT_USER):
+        """
+        A user's counters are not sharded: every write of the user's bookmarks already updates the
+        user's change counter in the same transaction, so the writes are serialized either way.
+
+        :return: The key of a user's (dimension, value) stats counter.
+        """
+        dimension, value = counter
+        return self.client.key('BookmarkStats', f"{dimension}/{value}", namespace=namespace(user_id))
 
-    def insert(self, new_entry: dict):
+    def bumped_stats(self, changes: Counter, user_id: str = DEFAULT_USER, counters: dict = None):
+        """
+        Adds changes to the user's stats counters. Counters that were not looked up with the rest
+        of the transaction are read first, costing one more round-trip.
+
+        :param changes (Counter): Maps (dimension, value) counters to the change of their count.
+        :param counters (dict, optional): Counters already looked up, as returned by lookup_with_version.
+
+        :return: The counter entities, incremented, to put with the commit.
+        """
+        counters = dict(counters or {})
+        keys = {counter: self.stats_key(counter, user_id) for counter, change in changes.items() if change}
+
+        missing = [key for key in keys.values() if key.name not in counters]
+        if missing:
+            counters.update((entity.key.name, entity) for entity in self.client.get_multi(missing))
+
+        bumped = []
+        for (dimension, value), key in keys.items():
+            entity = counters.get(key.name) or datastore.Entity(key)
+            entity.update({'dimension': dimension, 'value': value, 'count': (entity.get('count') or 0) + changes[dimension, value]})
+            bumped.append(entity)
+        return bumped
+
+    def stats(self, user_id: str = DEFAULT_USER):
+        """
+        Reads a user's stats counters, which every write keeps up to date in the same transaction
+        as the change itself. One query reads them all, however many bookmarks there are.
+
+        :param user_id (str, optional): The user whose bookmarks to count (default: the default user).
+
+        :return: A dictionary mapping each of STATS_DIMENSIONS to a dictionary of counts (see Model.stats).
+        """
+        query = self.client.query(kind = 'BookmarkStats', namespace = namespace(user_id))
+        counters = list(query.fetch())
+
+        #Bookmarks written before the counters existed are counted once, on the first read.
+        if not any(counter.key.name == STATS_COMPLETE for counter in counters) and self.rebuild_stats(user_id):
+            counters = list(query.fetch())
+
+        #Counts emptied by deletes and updates keep their entities, and are skipped here.
+        stats = {dimension: {} for dimension in STATS_DIMENSIONS}
+        for counter in counters:
+            if 'dimension' in counter and counter['count'] > 0:
+                stats[counter['dimension']][counter['value']] = counter['count']
+        return stats
+
+    def rebuild_stats(self, user_id: str = DEFAULT_USER):
+        """
+        Counts a user's bookmarks from scratch, for bookmarks written before the stats counters
+        existed, and marks the counters as complete. Every counter is set to the count, including
+        those of values no bookmark has any more. Gives up if the bookmarks change while they are counted.
+
+        :param user_id (str, optional): The user whose bookmarks to count (default: the default user).
+
+        :return: True if the counters were completed. False, otherwise.
+        """
+        #Read first, so any write made during the count shows up as a new version.
+        version = self.get_version(user_id)[0]
+        counts = Counter({(counter['dimension'], counter['value']): 0
+                          for counter in self.client.query(kind = 'BookmarkStats', namespace = namespace(user_id)).fetch() if 'dimension' in counter})
+        counts.update(stats_changes(added=(row._asdict() for row in self.iter_select(user_id=user_id))))
+
+        entities = []
+        for counter, count in counts.items():
+            entity = datastore.Entity(self.stats_key(counter, user_id))
+            entity.update({'dimension': counter[0], 'value': counter[1], 'count': count})
+            entities.append(entity)
+
+        #The marker is written last, so the counters only count as complete once every counter is.
+        complete = datastore.Entity(self.client.key('BookmarkStats', STATS_COMPLETE, namespace=namespace(user_id)))
+        complete['rebuilt'] = time.time()
+        entities.append(complete)
+
+        for batch in chunks(entities, BATCH_LIMIT):
+            with self.client.transaction(begin_later=True):
+                _, current, marker = self.lookup_with_version([], user_id, [complete.key])
+                if (current['version'] if current else 0) != version or any(marker.values()):
+                    return False
+                self.client.put_multi(batch)
+
+        return True
+
+    def insert(self, new_entry: dict, user_id: str = DEFAULT_USER):
         """
         Inserts an entry into the "bookmarked_internships" kind.
         :new_entry (dict): A dictionary object containing information about the internship posting to be added.
+        :user_id (str, optional): The user bookmarking the posting (default: the default user).
 
-        :return: True if an entry was added to the database. False if there already exists a row in the database with the same internship url as the entry to be added.
+        :return: True if an entry was added to the database. False if the user already has a row in the database with the same internship url as the entry to be added.
         :raises: Database errors on connection and insertion
         """
 
         #Tracks whether the insertion was successful.
         was_added = False
        
-        #Creates a new key for the 'Songbook' kind.
-        key = self.client.key('BookmarkedInternships', new_entry['internship_url'])
-
-        #Attempts to retrieve a row with the same internship url as the entry to be added, 
-        entity = self.client.get(key)
-
-        #If there are no rows with the same internship url...
-        if entity == None: 
-            #Creates a new entity and populates it with data.
-            new_entity = datastore.Entity(key)
-            new_entity.update({
-                'internship_title':new_entry['internship_title'], 
-                'organization':new_entry['organization'], 
-                'date_posted':new_entry['date_posted'], 
-                'location':new_entry['location'], 
-                'internship_url':new_entry['internship_url'], 
-                'date_applied':new_entry['date_applied'], 
-                'application_status':new_entry['application_status']
-            })
-
-            was_added = True
-            
-            #Saves the entity into the datastore.
-            self.client.put(new_entity)
+        #Creates a new key for the 'BookmarkedInternships' kind in the user's namespace.
+        key = self.bookmark_key(new_entry['internship_url'], user_id)
+
+        #The stats counters the entry adds to are known up front, so they are read with the lookup.
+        stats_keys = [self.stats_key(counter, user_id) for counter in stats_counters(new_entry)]
+
+        #The lookup and the write commit atomically; begin_later folds the start of the
+        #transaction into the lookup, so the whole insert costs two round-trips.
+        with self.client.transaction(begin_later=True):
+            #Attempts to retrieve a row with the same internship url as the entry to be added, 
+            entities, version, counters = self.lookup_with_version([key], user_id, stats_keys)
+
+            #If there are no rows with the same internship url...
+            if not entities: 
+                was_added = True
+                
+                #Saves the entity into the datastore when the transaction commits.
+                self.client.put_multi([self.to_entity(key, new_entry), self.bumped_version(version, user_id)]
+                                      + self.bumped_stats(stats_changes(added=[new_entry]), user_id, counters))
 
         return was_added
 
-    def delete(self, internship_url: str):
+    def to_entity(self, key, new_entry: dict):
+        """
+        Creates a new entity for the given key and populates it with the data of an entry.
+        """
+        new_entity = datastore.Entity(key)
+        new_entity.update({
+            'internship_title':new_entry['internship_title'], 
+            'organization':new_entry['organization'], 
+            'date_posted':new_entry['date_posted'], 
+            'location':new_entry['location'], 
+            'internship_url':new_entry['internship_url'], 
+            'date_applied':new_entry['date_applied'], 
+            'application_status':new_entry['application_status'],
+            'keywords':keywords(new_entry)
+        })
+        return new_entity
+
+    def insert_many(self, new_entries: list, user_id: str = DEFAULT_USER, on_conflict: str = "skip"):
+        """
+        Inserts several entries into the "BookmarkedInternships" kind. Every batch of up to 500 entries
+        runs in one transaction: a get_multi lookup finds the urls that already exist, along with
+        the stats counters the new entries add to, and a put_multi of the new entities is sent with
+        the commit. With on_conflict='replace' every entity is written, and the replaced ones are
+        taken out of the stats. Batches are cut short when the stats counters they touch would not
+        fit in the commit.
+
+        :param new_entries (iterable): Dictionary objects in the same format as for insert().
+        :param user_id (str, optional): The user bookmarking the postings (default: the default user).
+        :param on_conflict (str, optional): 'skip' (default) or 'replace'.
+
+        :return: The number of entries actually added or replaced.
+        :raises ValueError: If on_conflict is not one of CONFLICT_MODES.
+        """
+        if on_conflict not in CONFLICT_MODES:
+            raise ValueError("on_conflict must be 'skip' or 'replace'.")
+
+        #Keeps one entry per url so a batch cannot collide with itself: the first one when skipping
+        #conflicts, the last one when replacing, as if the entries were inserted one at a time.
+        unique = {}
+        for entry in new_entries:
+            if on_conflict == "replace":
+                unique.pop(entry['internship_url'], None)
+            unique.setdefault(entry['internship_url'], entry)
+        was_added = 0
+
+        pending = list(unique.values())
+        while pending:
+            #One slot of every commit is taken by the change counter, others by the stats counters.
+            batch = pending[:BATCH_LIMIT - 1]
+            batch = batch[:fitting([stats_counters(entry) for entry in batch])]
+            keys = [self.bookmark_key(entry['internship_url'], user_id) for entry in batch]
+            stats_keys = [self.stats_key(counter, user_id) for counter in {counter for entry in batch for counter in stats_counters(entry)}]
+
+            with self.client.transaction(begin_later=True):
+                entities, version, counters = self.lookup_with_version(keys, user_id, stats_keys)
+                existing = {entity.key.name: entity for entity in entities}
+
+                if on_conflict == "replace":
+                    #The counters of the replaced bookmarks are touched too, which may leave room for fewer entries.
+                    batch = batch[:fitting([stats_counters(entry) + (stats_counters(existing[key.name]) if key.name in existing else [])
+                                            for key, entry in zip(keys, batch)])]
+                    writes = list(zip(keys, batch))
+                else:
+                    writes = [(key, entry) for key, entry in zip(keys, batch) if key.name not in existing]
+
+                new_entities = [self.to_entity(key, entry) for key, entry in writes]
+                if new_entities:
+                    changes = stats_changes([existing[key.name] for key, _ in writes if key.name in existing], [entry for _, entry in writes])
+                    self.client.put_multi(new_entities + [self.bumped_version(version, user_id)] + self.bumped_stats(changes, user_id, counters))
+
+            was_added += len(new_entities)
+            pending = pending[len(batch):]
+
+        return was_added
+
+    def delete(self, internship_url: str, user_id: str = DEFAULT_USER):
         """
         Removes an entry from the "BookmarkedInternships" kind given
         a specific url.
 
         :param internship_url (str): The url of the bookmarked internship posting to be updated.
+        :param user_id (str, optional): The user owning the bookmark (default: the default user).
 
-        :return: True
+        :return: True if an entity was actually removed. False, otherwise.
         """ 
         #Create a key for the entity using the internship_url as the identifier
-        key = self.client.key('BookmarkedInternships', internship_url)
+        key = self.bookmark_key(internship_url, user_id)
 
-        #Remove the entity from the datastore.
-        self.client.delete(key)
-        return True
+        #Remove the entity from the datastore, bumping the change counter and the stats in the same transaction.
+        with self.client.transaction(begin_later=True):
+            entities, version, counters = self.lookup_with_version([key], user_id)
+            if entities:
+                self.client.delete(key)
+                self.client.put_multi([self.bumped_version(version, user_id)] + self.bumped_stats(stats_changes(removed=entities), user_id, counters))
+
+        return bool(entities)
 
-    def update(self, internship_url: str, attribute: str, value):
+    def update(self, internship_url: str, attribute: str, value, user_id: str = DEFAULT_USER):
         """
         Updates a specific attribute of an entry from the "bookmarked_internships" kind based
         on the provided internship url.
@@ -112,21 +547,122 @@ class model(Model):
         :param internship_url (str): The url of the bookmarked internship posting to be updated.
         :param attribute (str): The name of the attribute(column) in the table to be updated.
         :param value (str): The new value 
+        :param user_id (str, optional): The user owning the bookmark (default: the default user).
 
         :return: True if a row was actually changed. False, otherwise.
         """
 
+        #Only the 'date_applied' and 'application_status' attributes can be updated.
+        if attribute not in UPDATABLE:
+            return False
+
+        return self.update_fields(internship_url, {attribute: value}, user_id)
+
+    def update_fields(self, internship_url: str, fields: dict, user_id: str = DEFAULT_USER):
+        """
+        Updates several attributes of an entry from the "BookmarkedInternships" kind. The read and
+        the write run in one transaction so concurrent updates cannot overwrite each other.
+
+        :param internship_url (str): The url of the bookmarked internship posting to be updated.
+        :param fields (dict): Maps 'date_applied' and/or 'application_status' to their new value.
+        :param user_id (str, optional): The user owning the bookmark (default: the default user).
+
+        :return: True if a row was actually changed. False, otherwise.
+        :raises ValueError: If one of the attributes cannot be updated.
+        """
+        if not fields or not set(fields) <= set(UPDATABLE):
+            raise ValueError("Only 'date_applied' and 'application_status' can be updated.")
+
         was_updated = False
 
         #Create a key for the entity using the internship_url as the identifier
-        key = self.client.key('BookmarkedInternships', internship_url)
+        key = self.bookmark_key(internship_url, user_id)
+
+        with self.client.transaction(begin_later=True):
+            #Retrieve the entity from Datastore
+            entities, version, counters = self.lookup_with_version([key], user_id)
 
-        #Retrieve the entity from Datastore
-        entity = self.client.get(key)
+            if entities:
+                entity = entities[0]
+                old = dict(entity)
+                entity.update(fields)       #Update the specified properties with the provided values
 
-        if entity != None:
-            entity[attribute] = value   #Update the specified property with the provided value
-            self.client.put(entity)    #Save the updated entity back to Datastore
-            was_updated = True
+                #Save the updated entity back to Datastore on commit, moving it between the stats counters.
+                self.client.put_multi([entity, self.bumped_version(version, user_id)]
+                                      + self.bumped_stats(stats_changes([old], [entity]), user_id, counters))
+                was_updated = True
 
         return was_updated
+
+    def update_many(self, internship_urls: list, fields: dict, user_id: str = DEFAULT_USER):
+        """
+        Sets the same attributes on several entries of the "BookmarkedInternships" kind. Every batch
+        of up to 500 entries is read with get_multi and written back with put_multi in one
+        transaction, together with the stats counters the entries move between.
+
+        :param internship_urls (list): The urls of the bookmarked internship postings to be updated.
+        :param fields (dict): Maps 'date_applied' and/or 'application_status' to their new value.
+        :param user_id (str, optional): The user owning the bookmarks (default: the default user).
+
+        :return: The number of rows actually changed.
+        :raises ValueError: If one of the attributes cannot be updated.
+        """
+        if not fields or not set(fields) <= set(UPDATABLE):
+            raise ValueError("Only 'date_applied' and 'application_status' can be updated.")
+
+        was_updated = 0
+
+        pending = list(dict.fromkeys(internship_urls))
+        while pending:
+            #One slot of every commit is taken by the change counter, others by the stats counters.
+            batch = pending[:BATCH_LIMIT - 1]
+            with self.client.transaction(begin_later=True):
+                entities, version, counters = self.lookup_with_version([self.bookmark_key(url, user_id) for url in batch], user_id)
+                old = [dict(entity) for entity in entities]
+                for entity in entities:
+                    entity.update(fields)
+
+                #Bookmarks whose stats counters would not fit in the commit are left for the next batch.
+                fit = fitting([stats_counters(before) + stats_counters(after) for before, after in zip(old, entities)])
+                left = {entity.key.name for entity in entities[fit:]}
+                old, entities = old[:fit], entities[:fit]
+                if entities:
+                    self.client.put_multi(entities + [self.bumped_version(version, user_id)]
+                                          + self.bumped_stats(stats_changes(old, entities), user_id, counters))
+
+            was_updated += len(entities)
+            pending = [url for url in batch if url in left] + pending[len(batch):]
+
+        return was_updated
+
+    def delete_many(self, internship_urls: list, user_id: str = DEFAULT_USER):
+        """
+        Removes several entries from the "BookmarkedInternships" kind. Every batch of up to 500 urls is
+        looked up and deleted in one transaction that also bumps the change counter and the stats.
+
+        :param internship_urls (list): The urls of the bookmarked internship postings to be removed.
+        :param user_id (str, optional): The user owning the bookmarks (default: the default user).
+
+        :return: The number of entities removed.
+        """
+        was_deleted = 0
+
+        pending = list(dict.fromkeys(internship_urls))
+        while pending:
+            #One slot of every commit is taken by the change counter, others by the stats counters.
+            batch = pending[:BATCH_LIMIT - 1]
+            with self.client.transaction(begin_later=True):
+                entities, version, counters = self.lookup_with_version([self.bookmark_key(url, user_id) for url in batch], user_id)
+
+                #Bookmarks whose stats counters would not fit in the commit are left for the next batch.
+                fit = fitting([stats_counters(entity) for entity in entities])
+                left = {entity.key.name for entity in entities[fit:]}
+                entities = entities[:fit]
+                if entities:
+                    self.client.delete_multi([entity.key for entity in entities])
+                    self.client.put_multi([self.bumped_version(version, user_id)] + self.bumped_stats(stats_changes(removed=entities), user_id, counters))
+
+            was_deleted += len(entities)
+            pending = [url for url in batch if url in left] + pending[len(batch):]
+
+        return was_deleted
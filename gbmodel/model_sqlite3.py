@@ -1,126 +1,581 @@
-from datetime import date
-from .Model import Model
+from contextlib import contextmanager
+from .Model import Model, Bookmark, DEFAULT_USER, CONFLICT_MODES, STATS_DIMENSIONS
+import base64
+import hashlib
+import json
+import queue
+import re
 import sqlite3
 DB_FILE = 'bookmarked_internships.db'    # file for our Database
+POOL_SIZE = 8                            # idle connections kept open; matches the gunicorn thread count
+
+#Pragmas applied to every new connection. WAL lets readers run concurrently with a writer.
+PRAGMAS = (
+    "pragma journal_mode = wal",
+    "pragma synchronous = normal",     #Safe with WAL; only the last transactions can be lost on power failure.
+    "pragma mmap_size = 268435456",    #Reads go through a 256MB memory map instead of read() calls.
+    "pragma cache_size = -16000",      #16MB page cache per connection.
+    "pragma temp_store = memory",
+)
+
+#The current Unix time with sub-second precision, in SQL.
+NOW = "((julianday('now') - 2440587.5) * 86400.0)"
+
+def week_of(value: str):
+    """
+    :return: The SQL expression for the date of the Monday of the week of a date, NULL if the value is not a date.
+    """
+    return f"date({value}, '-6 days', 'weekday 1')"
+
+def count_stats(row: str, change: int):
+    """
+    Builds the trigger statements adding change to the counts of bookmark_stats that a row
+    ('new' or 'old') is counted in: its application status, and the week of its date applied.
+    """
+    upsert = "on conflict (user_id, dimension, value) do update set count = count + excluded.count"
+    return (f"insert into bookmark_stats (user_id, dimension, value, count) "
+            f"values ({row}.user_id, 'application_status', coalesce({row}.application_status, ''), {change}) {upsert}; "
+            f"insert into bookmark_stats (user_id, dimension, value, count) "
+            f"select {row}.user_id, 'date_applied', {week_of(row + '.date_applied')}, {change} where {week_of(row + '.date_applied')} is not null {upsert}; ")
+
+def fts_values(row: str):
+    """
+    :return: The SQL values of a row's entry in the full-text index: its rowid and its user's words of the searchable columns.
+    """
+    return f"{row}.rowid, " + ", ".join(f"user_words({row}.user_id, {row}.{column})" for column in ("internship_title", "organization", "location"))
+
+#Schema migrations, applied in order. PRAGMA user_version records how many have been applied.
+MIGRATIONS = [
+    #1: The original table.
+    [
+        "create table if not exists bookmarked_internships (internship_title text, organization text, date_posted text, location text, internship_url text, date_applied text, application_status text)",
+    ],
+    #2: Indexes for lookups by url, status and posting date. Duplicate urls left by the old
+    #   check-then-insert race are dropped first, keeping the earliest bookmark.
+    [
+        "delete from bookmarked_internships where rowid not in (select min(rowid) from bookmarked_internships group by internship_url)",
+        "create unique index bookmarked_internships_url on bookmarked_internships (internship_url)",
+        "create index bookmarked_internships_status on bookmarked_internships (application_status)",
+        "create index bookmarked_internships_date_posted on bookmarked_internships (date_posted)",
+    ],
+    #3: Composite indexes backing keyset pagination of filtered pages. date_posted is made non-null
+    #   so (date_posted, rowid) keys compare cleanly; the status-only index is covered by the new one.
+    [
+        "update bookmarked_internships set date_posted = '' where date_posted is null",
+        "drop index bookmarked_internships_status",
+        "create index bookmarked_internships_status_date_posted on bookmarked_internships (application_status, date_posted)",
+        "create index bookmarked_internships_organization_date_posted on bookmarked_internships (organization, date_posted)",
+    ],
+    #4: Full-text index over title, organization and location, kept in sync with the table by triggers.
+    [
+        "create virtual table bookmarked_internships_fts using fts5 (internship_title, organization, location, "
+        "content='bookmarked_internships', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')",
+        "create trigger bookmarked_internships_fts_insert after insert on bookmarked_internships begin "
+        "insert into bookmarked_internships_fts (rowid, internship_title, organization, location) values (new.rowid, new.internship_title, new.organization, new.location); end",
+        "create trigger bookmarked_internships_fts_delete after delete on bookmarked_internships begin "
+        "insert into bookmarked_internships_fts (bookmarked_internships_fts, rowid, internship_title, organization, location) values ('delete', old.rowid, old.internship_title, old.organization, old.location); end",
+        "create trigger bookmarked_internships_fts_update after update of internship_title, organization, location on bookmarked_internships begin "
+        "insert into bookmarked_internships_fts (bookmarked_internships_fts, rowid, internship_title, organization, location) values ('delete', old.rowid, old.internship_title, old.organization, old.location); "
+        "insert into bookmarked_internships_fts (rowid, internship_title, organization, location) values (new.rowid, new.internship_title, new.organization, new.location); end",
+        "insert into bookmarked_internships_fts (bookmarked_internships_fts) values ('rebuild')",
+    ],
+    #5: A change counter per table, bumped by triggers on every write.
+    [
+        "create table table_versions (name text primary key, version integer not null, modified real not null)",
+        f"insert into table_versions (name, version, modified) values ('bookmarked_internships', 0, {NOW})",
+    ] + [
+        f"create trigger bookmarked_internships_version_{event} after {event} on bookmarked_internships begin "
+        f"update table_versions set version = version + 1, modified = {NOW} where name = 'bookmarked_internships'; end"
+        for event in ("insert", "update", "delete")
+    ],
+    #6: Per-user bookmark lists. Every index leads with user_id so a user's queries only read that
+    #   user's rows; existing bookmarks belong to the default user. The full-text index stays shared
+    #   and search keeps the matches of the user's rows. The change counter is kept per user.
+    [
+        "alter table bookmarked_internships add column user_id text not null default ''",
+        "drop index bookmarked_internships_url",
+        "drop index bookmarked_internships_date_posted",
+        "drop index bookmarked_internships_status_date_posted",
+        "drop index bookmarked_internships_organization_date_posted",
+        "create unique index bookmarked_internships_user_url on bookmarked_internships (user_id, internship_url)",
+        "create index bookmarked_internships_user_date_posted on bookmarked_internships (user_id, date_posted)",
+        "create index bookmarked_internships_user_status_date_posted on bookmarked_internships (user_id, application_status, date_posted)",
+        "create index bookmarked_internships_user_organization_date_posted on bookmarked_internships (user_id, organization, date_posted)",
+        "update table_versions set name = 'bookmarked_internships/' where name = 'bookmarked_internships'",
+    ] + [
+        f"drop trigger bookmarked_internships_version_{event}"
+        for event in ("insert", "update", "delete")
+    ] + [
+        f"create trigger bookmarked_internships_version_{event} after {event} on bookmarked_internships begin "
+        f"insert into table_versions (name, version, modified) values ('bookmarked_internships/' || {row}.user_id, 1, {NOW}) "
+        f"on conflict (name) do update set version = version + 1, modified = excluded.modified; end"
+        for event, row in (("insert", "new"), ("update", "new"), ("delete", "old"))
+    ],
+    #7: Per-user counts of bookmarks by application status and by week applied, kept up to date by
+    #   triggers so stats() reads a few rows per user however many bookmarks there are.
+    [
+        "create table bookmark_stats (user_id text not null, dimension text not null, value text not null, "
+        "count integer not null, primary key (user_id, dimension, value)) without rowid",
+        "insert into bookmark_stats (user_id, dimension, value, count) select user_id, 'application_status', "
+        "coalesce(application_status, ''), count(*) from bookmarked_internships group by 1, 3",
+        f"insert into bookmark_stats (user_id, dimension, value, count) select user_id, 'date_applied', "
+        f"{week_of('date_applied')}, count(*) from bookmarked_internships where {week_of('date_applied')} is not null group by 1, 3",
+        f"create trigger bookmark_stats_insert after insert on bookmarked_internships begin {count_stats('new', 1)}end",
+        f"create trigger bookmark_stats_delete after delete on bookmarked_internships begin {count_stats('old', -1)}end",
+        f"create trigger bookmark_stats_update after update of date_applied, application_status on bookmarked_internships "
+        f"begin {count_stats('old', -1)}{count_stats('new', 1)}end",
+    ],
+    #8: The full-text index is scoped per user: every word is stored behind a prefix derived from the
+    #   user id (see user_words), so a search only reads the user's own entries of the index, and
+    #   bm25 weighs words by how common they are in the user's bookmarks. The index keeps no copy
+    #   of the text; the triggers call user_words, which every connection of the model registers.
+    [
+        "drop trigger bookmarked_internships_fts_insert",
+        "drop trigger bookmarked_internships_fts_delete",
+        "drop trigger bookmarked_internships_fts_update",
+        "drop table bookmarked_internships_fts",
+        "create virtual table bookmarked_internships_fts using fts5 (internship_title, organization, location, "
+        "content='', tokenize='unicode61 remove_diacritics 2')",
+        f"create trigger bookmarked_internships_fts_insert after insert on bookmarked_internships begin "
+        f"insert into bookmarked_internships_fts (rowid, internship_title, organization, location) values ({fts_values('new')}); end",
+        f"create trigger bookmarked_internships_fts_delete after delete on bookmarked_internships begin "
+        f"insert into bookmarked_internships_fts (bookmarked_internships_fts, rowid, internship_title, organization, location) values ('delete', {fts_values('old')}); end",
+        f"create trigger bookmarked_internships_fts_update after update of user_id, internship_title, organization, location on bookmarked_internships begin "
+        f"insert into bookmarked_internships_fts (bookmarked_internships_fts, rowid, internship_title, organization, location) values ('delete', {fts_values('old')}); "
+        f"insert into bookmarked_internships_fts (rowid, internship_title, organization, location) values ({fts_values('new')}); end",
+        f"insert into bookmarked_internships_fts (rowid, internship_title, organization, location) select {fts_values('bookmarked_internships')} from bookmarked_internships",
+    ],
+]
+
+#Attributes select_page can filter on, and the attribute it sorts by.
+FILTERABLE = ("application_status", "organization")
+SORTABLE = ("date_posted", "-date_posted")
+COLUMNS = "internship_title, organization, date_posted, location, internship_url, date_applied, application_status"
+
+#Full-text search of a user's bookmarks, best matches first. Title matches weigh more than
+#organization matches, which weigh more than location matches.
+SEARCH = ("select b.internship_title, b.organization, b.date_posted, b.location, b.internship_url, b.date_applied, b.application_status "
+          "from bookmarked_internships_fts f join bookmarked_internships b on b.rowid = f.rowid "
+          "where bookmarked_internships_fts match ? and b.user_id = ? order by bm25(bookmarked_internships_fts, 10.0, 5.0, 1.0) limit ?")
+
+#Words as the unicode61 tokenizer of the full-text index splits them: runs of letters and digits.
+WORD = re.compile(r"[^\W_]+")
+
+def word_prefix(user_id: str):
+    """
+    :return: The prefix put in front of every word of a user in the full-text index. It is made of
+             letters and digits and has a fixed length, so a prefixed word is one token of one user.
+    """
+    return "u" + hashlib.sha1(user_id.encode()).hexdigest()[:12]
+
+def user_words(user_id: str, text: str):
+    """
+    Prefixes every word of a text with the user's word prefix. Registered on every connection
+    for the triggers keeping the full-text index up to date.
+    """
+    prefix = word_prefix(user_id)
+    return " ".join(prefix + word for word in WORD.findall(text or ""))
+
+def to_fts_query(query: str, user_id: str = DEFAULT_USER):
+    """
+    Turns free text typed by a user into an FTS5 query over the user's own words: every word is
+    quoted so FTS5 syntax characters are taken literally, and the last word matches as a prefix.
+
+    :return: The FTS5 query string, or None if the text contains no searchable words.
+    """
+    words = user_words(user_id, query).split()
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+def bookmark_row(cursor, row):
+    """
+    Row factory building a Bookmark from a row of the columns of COLUMNS, as each row is fetched.
+    """
+    return Bookmark._make(row)
+
+def keyed_bookmark_row(cursor, row):
+    """
+    Row factory for rows of rowid followed by the columns of COLUMNS.
+
+    :return: A tuple (rowid, Bookmark).
+    """
+    return row[0], Bookmark._make(row[1:])
+
+def decode_cursor(cursor: str):
+    """
+    Decodes a cursor returned by select_page.
+
+    :return: The [date_posted, rowid] key of the last row of the previous page.
+    :raises ValueError: If the cursor is not one select_page could have returned.
+    """
+    key = json.loads(base64.urlsafe_b64decode(cursor))
+    if not (isinstance(key, list) and len(key) == 2 and isinstance(key[0], str) and type(key[1]) is int):
+        raise ValueError("Invalid cursor.")
+    return key
+
+#Statements are kept as constants so every pooled connection reuses its cached prepared statement.
+SELECT_ALL = f"SELECT {COLUMNS} FROM bookmarked_internships WHERE user_id = ?"
+INSERT = ("insert into bookmarked_internships (user_id, internship_title, organization, date_posted, location, internship_url, date_applied, application_status) "
+          "VALUES (:user_id, :internship_title, :organization, :date_posted, :location, :internship_url, :date_applied, :application_status) "
+          "ON CONFLICT (user_id, internship_url) DO NOTHING")
+#Imports may overwrite an existing bookmark of the same url instead of skipping the entry.
+INSERT_OR_REPLACE = INSERT.replace("DO NOTHING", "DO UPDATE SET " + ", ".join(
+    f"{column} = excluded.{column}" for column in COLUMNS.split(", ") if column != "internship_url"))
+DELETE = "delete from bookmarked_internships where user_id=? and internship_url=?"
+VERSION = "select version, modified from table_versions where name = 'bookmarked_internships/' || ?"
+#Counts emptied by deletes and updates are kept, and skipped here.
+STATS = "select dimension, value, count from bookmark_stats where user_id = ? and count > 0"
+
+#Attributes that can be changed after an internship has been bookmarked.
+UPDATABLE = ("date_applied", "application_status")
+
+def to_params(new_entry: dict, user_id: str = DEFAULT_USER):
+    """
+    Extracts the column values of a new entry.
+
+    :return: A dictionary of named parameters for the INSERT statement.
+    """
+    return {
+        'user_id':user_id,
+        'internship_title':new_entry['internship_title'],
+        'organization':new_entry['organization'],
+        'date_posted':new_entry['date_posted'] or '',
+        'location':new_entry['location'],
+        'internship_url':new_entry['internship_url'],
+        'date_applied':new_entry['date_applied'],
+        'application_status':new_entry['application_status']
+    }
+
+def update_statement(fields: dict):
+    """
+    Builds the UPDATE statement setting the given attributes. The attribute names are checked
+    against UPDATABLE, so only known column names ever reach the SQL text.
+
+    :raises ValueError: If one of the attributes cannot be updated.
+    """
+    if not fields or not set(fields) <= set(UPDATABLE):
+        raise ValueError("Only 'date_applied' and 'application_status' can be updated.")
+
+    #Sorted so the same set of attributes always reuses the same cached prepared statement.
+    assignments = ", ".join(f"{attribute} = :{attribute}" for attribute in sorted(fields))
+    return f"UPDATE bookmarked_internships SET {assignments} WHERE user_id = :user_id AND internship_url = :internship_url"
 
 class model(Model):
-    def __init__(self):
-        #Checks if the database exists
-        connection = sqlite3.connect(DB_FILE)
-        cursor = connection.cursor()
+    def __init__(self, db_file: str = DB_FILE, pool_size: int = POOL_SIZE):
+        self.db_file = db_file
+        self.pool = queue.LifoQueue(maxsize=pool_size)
 
+        self.migrate()
+
+    def migrate(self):
+        """
+        Brings the database schema up to date by applying the migrations that have not been applied yet.
+        The whole upgrade runs in one write transaction so concurrent workers cannot apply a migration twice.
+        """
+        with self.transaction() as cursor:
+            cursor.execute("begin immediate")
+            version = cursor.execute("pragma user_version").fetchone()[0]
+
+            for number, statements in enumerate(MIGRATIONS[version:], version + 1):
+                for statement in statements:
+                    cursor.execute(statement)
+                cursor.execute(f"pragma user_version = {number}")
+
+    def _open(self):
+        """
+        Opens a new connection to the database with the tuned pragmas applied.
+        Connections are handed between threads by the pool but only ever used by one thread at a time.
+        """
+        connection = sqlite3.connect(self.db_file, timeout=10, check_same_thread=False, cached_statements=64)
+        for pragma in PRAGMAS:
+            connection.execute(pragma)
+
+        #Used by the triggers maintaining the full-text index.
+        connection.create_function('user_words', 2, user_words, deterministic=True)
+        return connection
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows a connection from the pool for the duration of the with block, opening a new
+        one if none is idle. The connection goes back to the pool afterwards, or is closed
+        if the pool is already full.
+        """
         try:
-            cursor.execute("select count(rowid) from bookmarked_internships")
-        except sqlite3.OperationalError:
-            cursor.execute("create table bookmarked_internships (internship_title text, organization text, date_posted text, location text, internship_url text, date_applied text, application_status text)")
+            connection = self.pool.get_nowait()
+        except queue.Empty:
+            connection = self._open()
 
-        cursor.close()
+        try:
+            yield connection
+        finally:
+            #Never hands a connection with a half-finished transaction to the next caller.
+            if connection.in_transaction:
+                connection.rollback()
+            try:
+                self.pool.put_nowait(connection)
+            except queue.Full:
+                connection.close()
 
-    def select(self):
+    @contextmanager
+    def transaction(self):
         """
-        Gets all rows from the "bookmarked_internships" table
+        Runs the with block in a single transaction on a pooled connection.
+        Commits if the block succeeds and rolls back if it raises.
 
-        Each row in the "BookmarkedInternships" table contains: 
+        :yield: A cursor on the connection.
+        """
+        with self.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                yield cursor
+                connection.commit()
+            finally:
+                cursor.close()
+
+    def close(self):
+        """
+        Closes every idle connection in the pool.
+        """
+        while True:
+            try:
+                self.pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def select(self, user_id: str = DEFAULT_USER):
+        """
+        Gets all rows of a user from the "bookmarked_internships" table
+
+        Each row in the "BookmarkedInternships" table contains:
         - internship_title     (The title of the internship)
-        - organization         (The organization offering the internship)        
+        - organization         (The organization offering the internship)
         - date_posted          (The date the internship was posted)
         - location             (The location of the organization)
-        - internship_url       (The url to the internship posting) 
-        - date_applied         (The date the user applied for the internship position) 
-        - application_status   (The current status of their application ('Not Yet Applied', 'Accepted', 'Pending', or 'Rejected')) 
+        - internship_url       (The url to the internship posting)
+        - date_applied         (The date the user applied for the internship position)
+        - application_status   (The current status of their application ('Not Yet Applied', 'Accepted', 'Pending', or 'Rejected'))
+
+        :param user_id (str, optional): The user whose bookmarks to get (default: the default user).
+
+        :return: List of Bookmark records.
+        """
+        with self.connection() as connection:
+            cursor = connection.cursor()
+            cursor.row_factory = bookmark_row
+            return cursor.execute(SELECT_ALL, (user_id,)).fetchall()
+
+    def select_page(self, filters: dict = None, sort: str = "-date_posted", cursor: str = None, limit: int = 25, user_id: str = DEFAULT_USER):
+        """
+        Gets one page of a user's rows from the "bookmarked_internships" table. Pages are walked with
+        (date_posted, rowid) keys, so each page is a range scan of one of the (user_id, ..., date_posted) indexes.
+
+        :param filters (dict, optional): Maps 'application_status' and/or 'organization' to the value the rows must have.
+        :param sort (str, optional): 'date_posted' for oldest first or '-date_posted' for newest first (default).
+        :param cursor (str, optional): The cursor returned with the previous page; None for the first page.
+        :param limit (int, optional): The maximum number of rows in the page.
+        :param user_id (str, optional): The user whose bookmarks to get (default: the default user).
 
-        :return: List of dictionaries, where each dictionary represents a row in the datastore.        
+        :return: A tuple (rows, next_cursor). next_cursor is None on the last page.
+        :raises ValueError: If a filter or the sort order is not supported, or the cursor is invalid.
         """
-        connection = sqlite3.connect(DB_FILE)
-        cursor = connection.cursor()
-        cursor.execute("SELECT * FROM bookmarked_internships")
-        return cursor.fetchall()
+        filters = filters or {}
+        if sort not in SORTABLE or not set(filters) <= set(FILTERABLE):
+            raise ValueError("Unsupported filter or sort order.")
 
-    def insert(self, new_entry: dict):
+        descending = sort.startswith("-")
+        clauses = ["user_id = ?"]
+        params = [user_id]
+
+        for attribute, value in filters.items():
+            clauses.append(f"{attribute} is ?")
+            params.append(value)
+
+        #Resumes right after the last row of the previous page.
+        if cursor:
+            clauses.append("(date_posted, rowid) < (?, ?)" if descending else "(date_posted, rowid) > (?, ?)")
+            params.extend(decode_cursor(cursor))
+
+        direction = "desc" if descending else "asc"
+        where = "where " + " and ".join(clauses)
+
+        #Fetches one extra row to find out whether there is a next page.
+        with self.connection() as connection:
+            sql_cursor = connection.cursor()
+            sql_cursor.row_factory = keyed_bookmark_row
+            rows = sql_cursor.execute(f"select rowid, {COLUMNS} from bookmarked_internships {where} "
+                                      f"order by date_posted {direction}, rowid {direction} limit ?", (*params, limit + 1)).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            rowid, last = rows[-1]
+            next_cursor = base64.urlsafe_b64encode(json.dumps([last.date_posted, rowid]).encode()).decode()
+
+        return [bookmark for _, bookmark in rows], next_cursor
+
+    def search(self, query: str, limit: int = 25, user_id: str = DEFAULT_USER):
+        """
+        Searches a user's bookmarked internships by title, organization and location using the full-text
+        index. The query only matches the user's own words of the index, so the cost of a search depends
+        on the size of the user's list and not on how many bookmarks other users have.
+
+        :param query (str): The words to search for. Every word must match; the last word may be a prefix.
+        :param limit (int, optional): The maximum number of rows to return.
+        :param user_id (str, optional): The user whose bookmarks to search (default: the default user).
+
+        :return: List of rows in the same format as select(), best matches first.
+        """
+        fts_query = to_fts_query(query, user_id)
+        if fts_query is None:
+            return []
+
+        with self.connection() as connection:
+            cursor = connection.cursor()
+            cursor.row_factory = bookmark_row
+            return cursor.execute(SEARCH, (fts_query, user_id, limit)).fetchall()
+
+    def get_version(self, user_id: str = DEFAULT_USER):
+        """
+        Gets the change counter of a user's bookmarks in the "bookmarked_internships" table, maintained by triggers.
+
+        :param user_id (str, optional): The user whose change counter to get (default: the default user).
+
+        :return: A tuple (version, modified) where modified is a Unix timestamp of the last change.
+        """
+        with self.connection() as connection:
+            return connection.execute(VERSION, (user_id,)).fetchone() or (0, 0.0)
+
+    def stats(self, user_id: str = DEFAULT_USER):
+        """
+        Reads a user's bookmark counts from bookmark_stats, which triggers keep up to date on every
+        insert, update and delete.
+
+        :param user_id (str, optional): The user whose bookmarks to count (default: the default user).
+
+        :return: A dictionary mapping each of STATS_DIMENSIONS to a dictionary of counts (see Model.stats).
+        """
+        stats = {dimension: {} for dimension in STATS_DIMENSIONS}
+        with self.connection() as connection:
+            for dimension, value, count in connection.execute(STATS, (user_id,)):
+                stats[dimension][value] = count
+        return stats
+
+    def insert(self, new_entry: dict, user_id: str = DEFAULT_USER):
         """
         Inserts an entry into the "bookmarked_internships" table.
         :new_entry (dict): A dictionary object containing information about the internship posting to be added.
+        :user_id (str, optional): The user bookmarking the posting (default: the default user).
 
-        :return: True if an entry was added to the database. False if there already exists a row in the database with the same internship url as the entry to be added.
+        :return: True if an entry was added to the database. False if the user already has a row in the database with the same internship url as the entry to be added.
         :raises: Database errors on connection and insertion
         """
-        #Tracks whether the insertion was successful.
-        was_inserted = False
-        
-        params = {
-            'internship_title':new_entry['internship_title'], 
-            'organization':new_entry['organization'], 
-            'date_posted':new_entry['date_posted'], 
-            'location':new_entry['location'], 
-            'internship_url':new_entry['internship_url'], 
-            'date_applied':new_entry['date_applied'], 
-            'application_status':new_entry['application_status']
-        }
-
-        connection = sqlite3.connect(DB_FILE)
-        cursor = connection.cursor()
-
-        #Checks if a row with the same internship url already exists in the database before attempting to insert a new row.
-        cursor.execute("select exists(select 1 from bookmarked_internships where internship_url = ?)", (new_entry['internship_url'],))
-        if cursor.fetchone()[0] == 0:
-            was_inserted = True
-                    
-            cursor.execute("insert into bookmarked_internships (internship_title, organization, date_posted, location, internship_url, date_applied, application_status) "
-                       "VALUES (:internship_title, :organization, :date_posted, :location, :internship_url, :date_applied, :application_status)", params)
-
-        connection.commit()   #Commits the transaction to save changes.
-        cursor.close()        #Closes the connection to the database.
-        return was_inserted
-
-    def delete(self, internship_url: str):
+        #The unique index on (user_id, internship_url) turns a duplicate bookmark into a no-op, so the
+        #existence check and the insert happen atomically in a single statement.
+        with self.transaction() as cursor:
+            cursor.execute(INSERT, to_params(new_entry, user_id))
+            return cursor.rowcount == 1
+
+    def insert_many(self, new_entries: list, user_id: str = DEFAULT_USER, on_conflict: str = "skip"):
+        """
+        Inserts several entries into the "bookmarked_internships" table in a single transaction.
+        Entries whose internship url is already bookmarked by the user are skipped, or overwrite
+        the existing row with on_conflict='replace'.
+
+        :param new_entries (iterable): Dictionary objects in the same format as for insert().
+        :param user_id (str, optional): The user bookmarking the postings (default: the default user).
+        :param on_conflict (str, optional): 'skip' (default) or 'replace'.
+
+        :return: The number of entries actually added or replaced.
+        :raises ValueError: If on_conflict is not one of CONFLICT_MODES.
+        """
+        if on_conflict not in CONFLICT_MODES:
+            raise ValueError("on_conflict must be 'skip' or 'replace'.")
+
+        statement = INSERT if on_conflict == "skip" else INSERT_OR_REPLACE
+        with self.transaction() as cursor:
+            cursor.executemany(statement, (to_params(entry, user_id) for entry in new_entries))
+            return cursor.rowcount
+
+    def delete(self, internship_url: str, user_id: str = DEFAULT_USER):
         """
         Deletes an entry from the "bookmarked_internships" table based on the provided internship url.
-        
+
         :param internship_url (str): The url of the bookmarked internship posting to be removed.
+        :param user_id (str, optional): The user owning the bookmark (default: the default user).
 
         :return: True if a row was actually removed. False, otherwise.
         """
-        connection = sqlite3.connect(DB_FILE)
-        cursor = connection.cursor()
-        cursor.execute("delete from bookmarked_internships where internship_url=?", (internship_url,))
+        with self.transaction() as cursor:
+            cursor.execute(DELETE, (user_id, internship_url))
 
-        #Returns False if no rows were removed.
-        if cursor.rowcount == 0:
-            return False
-        
-        connection.commit()   #Commits the transaction to save changes.
-        cursor.close()        #Closes the connection to the database.
+            #Returns False if no rows were removed.
+            return cursor.rowcount != 0
 
-        return True
-    
-    def update(self, internship_url: str, attribute: str, value):
+    def update(self, internship_url: str, attribute: str, value, user_id: str = DEFAULT_USER):
         """
         Updates a specific attribute of an entry from the "bookmarked_internships" table based
         on the provided internship url.
 
         :param internship_url (str): The url of the bookmarked internship posting to be updated.
         :param attribute (str): The name of the attribute(column) in the table to be updated.
-        :param value (str): The new value 
+        :param value (str): The new value
+        :param user_id (str, optional): The user owning the bookmark (default: the default user).
 
         :return: True if a row was actually changed. False, otherwise.
         """
-        connection = sqlite3.connect(DB_FILE)
-        cursor = connection.cursor()
+        #Only the 'date_applied' and 'application_status' attributes can be updated.
+        if attribute not in UPDATABLE:
+            return False
 
-        #Updates the 'date_applied' attribute.
-        if attribute == "date_applied":
-            cursor.execute("UPDATE bookmarked_internships SET date_applied = ? WHERE internship_url = ?", (value, internship_url))
+        return self.update_fields(internship_url, {attribute: value}, user_id)
 
-        #Updates the 'application_status' attribute.
-        elif attribute == "application_status":
-            cursor.execute("UPDATE bookmarked_internships SET application_status = ? WHERE internship_url = ?", (value, internship_url))
+    def update_fields(self, internship_url: str, fields: dict, user_id: str = DEFAULT_USER):
+        """
+        Updates several attributes of an entry from the "bookmarked_internships" table with a single statement.
 
-        #Returns False if no rows were changed.
-        if cursor.rowcount == 0:
-            return False
+        :param internship_url (str): The url of the bookmarked internship posting to be updated.
+        :param fields (dict): Maps 'date_applied' and/or 'application_status' to their new value.
+        :param user_id (str, optional): The user owning the bookmark (default: the default user).
 
-        #Otherwise, commit the change.
-        connection.commit()
-        cursor.close()
+        :return: True if a row was actually changed. False, otherwise.
+        :raises ValueError: If one of the attributes cannot be updated.
+        """
+        statement = update_statement(fields)
 
-        return True
\ No newline at end of file
+        with self.transaction() as cursor:
+            cursor.execute(statement, {**fields, 'internship_url': internship_url, 'user_id': user_id})
+
+            #Returns False if no rows were changed.
+            return cursor.rowcount != 0
+
+    def update_many(self, internship_urls: list, fields: dict, user_id: str = DEFAULT_USER):
+        """
+        Sets the same attributes on several entries of the "bookmarked_internships" table in a single transaction.
+
+        :param internship_urls (list): The urls of the bookmarked internship postings to be updated.
+        :param fields (dict): Maps 'date_applied' and/or 'application_status' to their new value.
+        :param user_id (str, optional): The user owning the bookmarks (default: the default user).
+
+        :return: The number of rows actually changed.
+        :raises ValueError: If one of the attributes cannot be updated.
+        """
+        statement = update_statement(fields)
+
+        with self.transaction() as cursor:
+            cursor.executemany(statement, ({**fields, 'internship_url': url, 'user_id': user_id} for url in internship_urls))
+            return cursor.rowcount
+
+    def delete_many(self, internship_urls: list, user_id: str = DEFAULT_USER):
+        """
+        Deletes several entries from the "bookmarked_internships" table in a single transaction.
+
+        :param internship_urls (list): The urls of the bookmarked internship postings to be removed.
+        :param user_id (str, optional): The user owning the bookmarks (default: the default user).
+
+        :return: The number of rows removed.
+        """
+        with self.transaction() as cursor:
+            cursor.executemany(DELETE, ((user_id, url) for url in internship_urls))
+            return cursor.rowcount
@@ -0,0 +1,37 @@
+"""
+gunicorn settings used by the Dockerfile:
+
+    gunicorn --config gunicorn.conf.py app:app
+
+The app and the configured gbmodel backend are imported once in the master before it forks
+(preload_app), so workers start without importing them again. Database connections and
+background threads do not survive a fork, so every worker opens its own in post_fork before it
+accepts requests.
+"""
+import os
+
+bind = f":{os.environ.get('PORT', '8080')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+preload_app = True
+
+def when_ready(server):
+    #Runs in the master once the app is loaded: compiles the templates and imports the backend
+    #module (e.g. google.cloud for Datastore) without building the model, so no connection is
+    #opened before the fork.
+    import gbmodel
+    from app import load_templates
+
+    load_templates()
+    gbmodel.load_backend()
+
+def post_fork(server, worker):
+    import gbmodel
+    from internapi import start_prefetch
+
+    try:
+        gbmodel.warm_up()
+    except Exception as e:
+        #A worker whose database is not reachable yet still starts; the first request retries.
+        server.log.warning("Could not warm up the %s backend: %s", gbmodel.model_backend, e)
+    start_prefetch()
@@ -0,0 +1,8 @@
+from .fetch import ATS_ENDPOINT, JB_ENDPOINT, fetch_internships, fetch_all, fetch_grouped, iter_fetch
+from .cache import get_cache
+from .client import get_client
+from .ratelimit import get_limiter
+from .prefetch import get_tracker, start_prefetch
+from .postings import get_index
+from .merge import merge_postings, sort_by_recency, unique_postings
+from .records import Posting
@@ -0,0 +1,205 @@
+from collections import OrderedDict
+import json
+import os
+import threading
+import time
+from .connections import ThreadConnections
+
+DEFAULT_TTL = 300                   #Seconds a fetched page stays fresh.
+DEFAULT_MAX_BYTES = 16 * 1024**2    #Upper bound on the serialized size of all cached pages.
+CACHE_DB_FILE = 'internship_cache.db'
+
+def make_key(endpoint: str, title_filter: str, organization_filter: str, location_filter: str, offset: int):
+    """
+    Builds the cache key of a single page of API results.
+
+    :return: A string uniquely identifying the (endpoint, filters, offset) tuple.
+    """
+    return json.dumps([endpoint, title_filter, organization_filter, location_filter, offset])
+
+class ResultCache():
+    """
+    Interface shared by the cache backends. Values are JSON-serializable page results;
+    every backend stores them serialized so callers always get a private copy back.
+    """
+    def __init__(self, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """
+        Looks up a cached value.
+
+        :param key (str): The key built by make_key.
+
+        :return: The cached value, or None if it is missing or expired.
+        """
+        pass
+
+    def set(self, key: str, value):
+        """
+        Stores a value, evicting the least recently used entries if the cache grows past max_bytes.
+
+        :param key (str): The key built by make_key.
+        :param value: A JSON-serializable value.
+        """
+        pass
+
+    def expires_in(self, key: str):
+        """
+        Looks up how long a cached value stays fresh, without counting a hit or a miss.
+
+        :param key (str): The key built by make_key.
+
+        :return: The number of seconds until the entry expires, or None if it is not cached.
+        """
+        return None
+
+    def stats(self):
+        """
+        :return: A dictionary with the hit/miss counters and the current size of the cache.
+        """
+        return {'hits': self.hits, 'misses': self.misses}
+
+class NullCache(ResultCache):
+    """Backend that never stores anything; used to turn caching off."""
+    def get(self, key: str):
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value):
+        pass
+
+class MemoryCache(ResultCache):
+    """In-process LRU cache shared by all threads of a worker."""
+    def __init__(self, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(ttl, max_bytes)
+        self.entries = OrderedDict()   #key -> (expires_at, serialized value)
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: str):
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+
+            #Marks the entry as the most recently used one.
+            self.entries.move_to_end(key)
+            self.hits += 1
+
+        return json.loads(entry[1])
+
+    def set(self, key: str, value):
+        data = json.dumps(value)
+
+        #Values that could never fit are not worth evicting everything else for.
+        if len(data) > self.max_bytes:
+            return
+
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+
+            self.entries[key] = (time.time() + self.ttl, data)
+            self.size += len(data)
+
+            #Evicts the least recently used entries until the cache fits in memory again.
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+
+    def expires_in(self, key: str):
+        entry = self.entries.get(key)
+        return None if entry is None else entry[0] - time.time()
+
+    def _remove(self, key: str):
+        self.size -= len(self.entries.pop(key)[1])
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries), 'bytes': self.size}
+
+class SQLiteCache(ResultCache):
+    """
+    On-disk cache shared by every thread and every worker process on the host.
+    Each thread keeps its own connection to the database file.
+    """
+    def __init__(self, db_file: str = CACHE_DB_FILE, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(ttl, max_bytes)
+        self.db_file = db_file
+        self.connections = ThreadConnections(db_file, timeout=5, isolation_level=None)
+
+        connection = self.connections.get()
+        connection.execute("create table if not exists cache_entries (key text primary key, value text not null, "
+                           "size integer not null, expires_at real not null, last_access real not null)")
+        connection.execute("create index if not exists cache_entries_last_access on cache_entries (last_access)")
+
+    def get(self, key: str):
+        connection = self.connections.get()
+        now = time.time()
+
+        row = connection.execute("select value from cache_entries where key = ? and expires_at >= ?", (key, now)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        #Refreshes the access time used for LRU eviction.
+        connection.execute("update cache_entries set last_access = ? where key = ?", (now, key))
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value):
+        data = json.dumps(value)
+        if len(data) > self.max_bytes:
+            return
+
+        now = time.time()
+        connection = self.connections.get()
+
+        with connection:
+            connection.execute("begin immediate")
+            connection.execute("insert or replace into cache_entries (key, value, size, expires_at, last_access) values (?, ?, ?, ?, ?)",
+                               (key, data, len(data), now + self.ttl, now))
+
+            #Drops expired entries first, then the least recently used ones until the cache fits.
+            connection.execute("delete from cache_entries where expires_at < ?", (now,))
+            size = connection.execute("select coalesce(sum(size), 0) from cache_entries").fetchone()[0]
+            if size > self.max_bytes:
+                rows = connection.execute("select key, size from cache_entries order by last_access").fetchall()
+                evicted = []
+                for old_key, old_size in rows:
+                    if size <= self.max_bytes:
+                        break
+                    evicted.append((old_key,))
+                    size -= old_size
+                connection.executemany("delete from cache_entries where key = ?", evicted)
+
+    def expires_in(self, key: str):
+        row = self.connections.get().execute("select expires_at from cache_entries where key = ?", (key,)).fetchone()
+        return None if row is None else row[0] - time.time()
+
+    def stats(self):
+        entries, size = self.connections.get().execute("select count(*), coalesce(sum(size), 0) from cache_entries").fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': size}
+
+cache_backend = os.environ.get('INTERNSHIP_CACHE_BACKEND', 'memory')
+
+if cache_backend == 'memory':
+    appcache = MemoryCache()
+
+elif cache_backend == 'sqlite':
+    appcache = SQLiteCache(os.environ.get('INTERNSHIP_CACHE_DB', CACHE_DB_FILE))
+
+elif cache_backend == 'none':
+    appcache = NullCache()
+
+else:
+    raise ValueError("No appropriate cache backend configured. ")
+
+def get_cache():
+    return appcache
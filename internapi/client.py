@@ -0,0 +1,201 @@
+from urllib.parse import urlsplit
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from .ratelimit import RateLimiter, get_limiter
+from .records import parse_postings
+from metrics import UPSTREAM_ERRORS, RATE_LIMIT_SECONDS
+
+DEFAULT_POOL_SIZE = 8           #Keep-alive connections kept open per upstream host.
+DEFAULT_TIMEOUT = (3.05, 10)    #(connect, read) timeout in seconds for a single request.
+MAX_RETRIES = 3                 #Retries after the first attempt on 429/5xx responses and network errors.
+BACKOFF_BASE = 0.5              #Seconds; the backoff ceiling doubles on every retry...
+BACKOFF_MAX = 8                 #...up to this many seconds.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+CLOSED = "closed"               #CircuitBreaker.allow() let a call through a closed circuit...
+TRIAL = "trial"                 #...or as the single trial call of a half-open one.
+
+def endpoint_name(endpoint: str):
+    """
+    :return: The last part of an endpoint URL's path (e.g. 'active-ats-7d'), used to label metrics.
+    """
+    return urlsplit(endpoint).path.rstrip("/").rsplit("/", 1)[-1]
+
+class CircuitBreaker():
+    """
+    Stops calling an upstream that keeps failing. After failure_threshold consecutive
+    failures the circuit opens and every call is refused until reset_timeout seconds
+    have passed; then a single trial call is let through (half-open) and its outcome
+    decides whether the circuit closes again or stays open.
+    """
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """
+        :return: CLOSED if a call may be made right now, TRIAL if it may be made as the trial call
+                 of a half-open circuit, or None if the circuit is open.
+        """
+        with self.lock:
+            if self.opened_at is None:
+                return CLOSED
+
+            #Lets a single trial call through once the circuit has cooled down.
+            if time.monotonic() - self.opened_at >= self.reset_timeout and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return TRIAL
+
+            return None
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self, trial: bool = False):
+        """
+        :param trial (bool, optional): Whether the failed call was the trial call, whose slot is freed.
+        """
+        with self.lock:
+            self.failures += 1
+            if trial:
+                self.trial_in_flight = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """
+        Ends a trial call that recorded no outcome, so the next call after it may try again
+        instead of the circuit staying open for good. Only the trial call may release its slot.
+        """
+        with self.lock:
+            self.trial_in_flight = False
+
+class InternshipClient():
+    """
+    Client for the 'Internship API'. A single instance is shared by the whole process so
+    TCP and TLS connections are pooled and kept alive between requests. Every attempt first
+    takes a token from the rate limiter, which keeps all workers within the API key's quota.
+    """
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, timeout = DEFAULT_TIMEOUT, max_retries: int = MAX_RETRIES,
+                 breaker: CircuitBreaker = None, limiter: RateLimiter = None):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self.limiter = limiter or get_limiter()
+
+        #Retries are handled in get_page so they can be jittered and counted by the circuit breaker.
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get_page(self, api_key: str, endpoint: str, params: dict, parse = parse_postings):
+        """
+        Sends a GET request for one page of results, retrying with jittered exponential
+        backoff on rate limiting, server errors and network errors. Gives up without calling
+        the API when the rate limiter has no token to spare in time.
+
+        :param api_key (str): The API key required for authentication.
+        :param endpoint (str): The API endpoint URL.
+        :param params (dict): The query parameters of the request.
+        :param parse (optional): Decodes the response body (default: parse_postings, giving a list of Posting records).
+
+        :return: The decoded body, or None if the request failed.
+        """
+        admitted = self.breaker.allow()
+        if not admitted:
+            print("Error fetching data: circuit open for", endpoint)
+            UPSTREAM_ERRORS.inc(endpoint=endpoint_name(endpoint), reason="circuit_open")
+            return None
+
+        #Every path of the trial call that records no outcome, including exceptions, frees the
+        #trial slot of the half-open circuit. Calls let through a closed circuit leave it alone, so
+        #a slow one finishing after the circuit opened cannot free the slot of another call's trial.
+        trial = admitted == TRIAL
+        try:
+            return self._get_page(api_key, endpoint, params, parse, trial)
+        finally:
+            if trial:
+                self.breaker.release()
+
+    def _get_page(self, api_key: str, endpoint: str, params: dict, parse, trial: bool):
+        """
+        The attempts of get_page, once the circuit breaker has let the call through.
+        """
+        headers = {
+            "x-rapidapi-key": api_key,
+            "x-rapidapi-host": urlsplit(endpoint).hostname
+        }
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+
+            #Waiting on our own quota is not a failure of the upstream, so no outcome is recorded;
+            #get_page still frees the trial slot when giving up here.
+            with RATE_LIMIT_SECONDS.time(endpoint=endpoint_name(endpoint)):
+                allowed = self.limiter.acquire()
+            if not allowed:
+                print("Error fetching data: rate limit reached for", endpoint)
+                UPSTREAM_ERRORS.inc(endpoint=endpoint_name(endpoint), reason="rate_limited")
+                return None
+
+            try:
+                response = self.session.get(endpoint, headers=headers, params=params, timeout=self.timeout)
+            except requests.RequestException as error:
+                print("Error fetching data:", error)
+                UPSTREAM_ERRORS.inc(endpoint=endpoint_name(endpoint), reason="network")
+            else:
+                self.limiter.observe(response.headers)
+                if response.status_code == 200:
+                    self.breaker.record_success()
+                    return parse(response.content)
+
+                print("Error fetching data:", response.status_code, response.text[:200])
+                UPSTREAM_ERRORS.inc(endpoint=endpoint_name(endpoint), reason=str(response.status_code))
+
+                #Client errors such as a bad API key will not go away by retrying. The upstream
+                #did answer, so they do not count towards opening the circuit.
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return None
+
+                retry_after = response.headers.get("Retry-After")
+
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt, retry_after)
+
+                #Holds back every other worker as well when the API asked for a specific delay.
+                if retry_after is not None:
+                    self.limiter.pause(delay)
+                time.sleep(delay)
+
+        self.breaker.record_failure(trial)
+        return None
+
+    def _backoff(self, attempt: int, retry_after: str = None):
+        """
+        :return: The number of seconds to wait before the next attempt ("full jitter" backoff,
+                 unless the server asked for a specific delay).
+        """
+        if retry_after is not None and retry_after.isdigit():
+            return min(int(retry_after), BACKOFF_MAX)
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def close(self):
+        self.session.close()
+
+appclient = InternshipClient(pool_size=int(os.environ.get('INTERNSHIP_API_POOL_SIZE', DEFAULT_POOL_SIZE)))
+
+def get_client():
+    return appclient
@@ -0,0 +1,29 @@
+import sqlite3
+import threading
+
+class ThreadConnections():
+    """
+    Hands every thread its own connection to a SQLite database, opened on first use. SQLite
+    connections cannot be shared between threads, and reusing one per thread saves reopening
+    the file on every query. The database runs in WAL mode, so readers never wait for the writer.
+    """
+    def __init__(self, db_file: str, **options):
+        """
+        :param db_file (str): The path of the database file.
+        :param options (optional): Keyword arguments for sqlite3.connect, such as timeout or isolation_level.
+        """
+        self.db_file = db_file
+        self.options = options
+        self.local = threading.local()
+
+    def get(self):
+        """
+        :return: The connection of the calling thread.
+        """
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_file, **self.options)
+            connection.execute("pragma journal_mode=wal")
+            connection.execute("pragma synchronous=normal")
+            self.local.connection = connection
+        return connection
@@ -0,0 +1,221 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import math
+import os
+import threading
+import time
+from .cache import get_cache, make_key
+from .client import get_client, endpoint_name
+from .records import load_postings
+from metrics import CACHE_LOOKUPS, UPSTREAM_SECONDS, COALESCED_REQUESTS
+
+#The upstream can be pointed elsewhere, e.g. at the local stub in benchmarks/stub_api.py.
+API_BASE_URL = os.environ.get('INTERNSHIP_API_BASE_URL', "https://internships-api.p.rapidapi.com").rstrip("/")
+
+ATS_ENDPOINT = API_BASE_URL + "/active-ats-7d"
+JB_ENDPOINT = API_BASE_URL + "/active-jb-7d"
+
+BATCH_SIZE = 10                         #The default number of results returned by the API per page.
+MAX_WORKERS = get_client().pool_size    #Upper bound on upstream requests in flight; one per pooled connection.
+FETCH_TIMEOUT = 30                      #Overall time budget in seconds for one call to fetch_all.
+
+#Shared pool so concurrency stays bounded no matter how many gunicorn threads are serving /display.
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="internapi")
+
+class SingleFlight():
+    """
+    Coalesces identical calls that overlap in time: the first caller runs the call and every
+    caller arriving while it is still running waits for it and shares its result, so a burst
+    of identical searches costs one upstream request instead of one each.
+    """
+    def __init__(self):
+        self.calls = {}     #key -> [event set once the call finished, its result]
+        self.lock = threading.Lock()
+
+    def do(self, key: str, function):
+        """
+        Runs function() unless a call with the same key is already in flight.
+
+        :return: A tuple (result, shared); shared is True if the result came from another caller's call.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = [threading.Event(), None]
+
+        if not leader:
+            call[0].wait()
+            return call[1], True
+
+        try:
+            call[1] = function()
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call[0].set()
+        return call[1], False
+
+_flights = SingleFlight()
+
+def fetch_page(api_key: str, endpoint: str, offset: int, title_filter: str = None, organization_filter: str = None, location_filter: str = None, refresh: bool = False):
+    """
+    Retrieves a single page of internship postings from the 'Internship API'.
+    Pages are served from the result cache when the same request was made recently, and
+    identical requests made at the same time share a single upstream call.
+
+    :param api_key (str): The API key required for authentication.
+    :param endpoint (str): The API endpoint URL from which to fetch internship postings.
+    :param offset (int): The offset of the first posting of the page.
+    :param title_filter (str, optional): A keyword to filter internships by title (default: None).
+    :param organization_filter (str, optional): A keyword to filter by organization name (default: None).
+    :param location_filter (str, optional): A keyword to filter internships by location (default: None).
+    :param refresh (bool, optional): Skips the cache lookup and always calls the API, updating the cache (default: False).
+
+    :return: A list of Posting records, or None if the request failed.
+    """
+    cache = get_cache()
+    key = make_key(endpoint, title_filter, organization_filter, location_filter, offset)
+
+    if not refresh:
+        data = cache.get(key)
+        CACHE_LOOKUPS.inc(result="miss" if data is None else "hit")
+        if data is not None:
+            return load_postings(data)
+
+    params = {
+        "offset": offset,
+        "title_filter": title_filter,
+        "organization_filter": organization_filter,
+        "location_filter": location_filter
+    }
+
+    def request():
+        with UPSTREAM_SECONDS.time(endpoint=endpoint_name(endpoint)):
+            data = get_client().get_page(api_key, endpoint, params)
+
+        #Only successful responses are cached so failures are retried on the next request.
+        if data is not None:
+            cache.set(key, data)
+        return data
+
+    #Records are immutable, so callers sharing a call can share its postings too.
+    data, shared = _flights.do(key, request)
+    if shared:
+        COALESCED_REQUESTS.inc(endpoint=endpoint_name(endpoint))
+    return data
+
+def iter_fetch(api_key: str, endpoints: list, max_results: int, title_filter: str = None, organization_filter: str = None, location_filter: str = None):
+    """
+    Retrieves internship postings from several endpoints at once, yielding the results of each
+    endpoint as soon as all of its pages have arrived. Every page of every endpoint is requested
+    concurrently on a bounded thread pool, so the whole call costs roughly one upstream
+    round-trip instead of one per page.
+
+    Paging stops early for an endpoint as soon as one of its pages comes back empty or fails;
+    requests for later pages of that endpoint that have not started yet are cancelled.
+
+    :param api_key (str): The API key required for authentication.
+    :param endpoints (list): The API endpoint URLs from which to fetch internship postings.
+    :param max_results (int): The maximum number of internship postings to retrieve per endpoint.
+    :param title_filter (str, optional): A keyword to filter internships by title (default: None).
+    :param organization_filter (str, optional): A keyword to filter by organization name (default: None).
+    :param location_filter (str, optional): A keyword to filter internships by location (default: None).
+
+    :yield: (endpoint index, list of Posting records) tuples, in the order the endpoints finish.
+    """
+    pages_needed = math.ceil(max_results / BATCH_SIZE)
+    filters = (title_filter, organization_filter, location_filter)
+    deadline = time.monotonic() + FETCH_TIMEOUT
+
+    #Maps every pending future to its (endpoint index, page index).
+    pending = {}
+    for e, endpoint in enumerate(endpoints):
+        for p in range(pages_needed):
+            future = _executor.submit(fetch_page, api_key, endpoint, p * BATCH_SIZE, *filters)
+            pending[future] = (e, p)
+
+    #pages[e][p] holds the data of page p of endpoint e; last_page[e] is the last usable page index;
+    #outstanding[e] counts the pages of endpoint e that have not been resolved yet.
+    pages = [[None] * pages_needed for _ in endpoints]
+    last_page = [pages_needed - 1] * len(endpoints)
+    outstanding = [pages_needed] * len(endpoints)
+
+    def results_of(e):
+        results = []
+        for p in range(last_page[e] + 1):
+            #A page that timed out leaves a gap; nothing after it can be trusted to line up.
+            if pages[e][p] is None:
+                break
+            results.extend(pages[e][p])
+
+        #Keeps the requested number of internships (up to max_results) for each endpoint.
+        return results[:max_results]
+
+    not_done = set(pending)
+    while not_done:
+        done, not_done = wait(not_done, timeout=max(0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+
+        #Gives up on whatever is still outstanding once the time budget is spent.
+        if not done:
+            for future in not_done:
+                future.cancel()
+            break
+
+        for future in done:
+            e, p = pending[future]
+            data = future.result() if not future.cancelled() else None
+            outstanding[e] -= 1
+
+            #An empty or failed page marks the end of the results for this endpoint.
+            if not data:
+                last_page[e] = min(last_page[e], p - 1)
+                for other in not_done:
+                    if pending[other][0] == e and pending[other][1] > p:
+                        other.cancel()
+            else:
+                pages[e][p] = data
+
+            if outstanding[e] == 0:
+                yield e, results_of(e)
+
+    #Hands over whatever the endpoints that ran out of time managed to return.
+    for e in range(len(endpoints)):
+        if outstanding[e] > 0:
+            yield e, results_of(e)
+
+def fetch_grouped(api_key: str, endpoints: list, max_results: int, title_filter: str = None, organization_filter: str = None, location_filter: str = None):
+    """
+    Retrieves internship postings from several endpoints at once (see iter_fetch).
+
+    :return: One list of Posting records per endpoint, in the order the endpoints were given.
+    """
+    grouped = [[] for _ in endpoints]
+    for e, results in iter_fetch(api_key, endpoints, max_results, title_filter, organization_filter, location_filter):
+        grouped[e] = results
+    return grouped
+
+def fetch_all(api_key: str, endpoints: list, max_results: int, title_filter: str = None, organization_filter: str = None, location_filter: str = None):
+    """
+    Retrieves internship postings from several endpoints at once (see iter_fetch).
+
+    :return: A list of Posting records, grouped by endpoint in the order the endpoints were given.
+    """
+    return [internship for results in fetch_grouped(api_key, endpoints, max_results, title_filter, organization_filter, location_filter)
+            for internship in results]
+
+def fetch_internships(api_key: str, endpoint: str, max_results: int, title_filter: str = None, organization_filter: str = None, location_filter: str = None):
+    """
+    Retrieves the internship postings returned from the 'Internship API' in 
+    batches until the desired number of results is reached or no more results is 
+    available.
+
+    :param api_key(str): The API key required for authentication.
+    :param endpoint (str): The API endpoint URL from which to fetch internship postings.
+    :param max_results (int): The maximum number of internship postings to retrieved.
+    :param title_filter (str, optional): A keyword to filter internships by title (default: None).
+    :param organization_filter (str, optional): A keyword to filter by organization name (default: None).
+    :param location_filter (str, optional): A keyword to filter internships by location (default: None).
+
+    :return: A list of Posting records
+    """
+    return fetch_all(api_key, [endpoint], max_results, title_filter, organization_filter, location_filter)
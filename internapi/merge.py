@@ -0,0 +1,104 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import hashlib
+import heapq
+import re
+from .records import Posting
+
+#Query parameters that only track where a visitor came from and never change the posting itself.
+TRACKING_PARAMS = {'gh_src', 'ref', 'source', 'src', 'lever-source', 'lever-origin'}
+TRACKING_PREFIX = 'utm_'    #Every utm_ parameter is a tracking one.
+
+def is_tracking(name: str):
+    """
+    :return: Whether the query parameter called name is a tracking one. Parameters that only
+             start like one, such as 'referenceNumber' or 'srcJobId', identify the posting and are kept.
+    """
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIX)
+
+def canonical_url(url: str):
+    """
+    Reduces a posting url to a canonical form: lowercase scheme and host, no fragment, no
+    tracking parameters, remaining parameters sorted and no trailing slash.
+
+    :return: The canonical url.
+    """
+    parts = urlsplit((url or "").strip())
+    query = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if not is_tracking(name))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), urlencode(query), ''))
+
+def content_hash(posting: Posting):
+    """
+    Hashes the normalized title, organization and locations of a posting, so the same job
+    published under different urls on the two endpoints is recognized as one posting.
+
+    :return: A hex digest.
+    """
+    locations = posting.locations_derived or []
+    if isinstance(locations, str):
+        locations = [locations]
+
+    parts = [posting.title or "", posting.organization or "", ";".join(sorted(map(str, locations)))]
+    text = "|".join(re.sub(r"\s+", " ", part.lower()).strip() for part in parts)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+def recency(posting: Posting):
+    return posting.date_posted or ""
+
+def sort_by_recency(postings: list):
+    """
+    :return: The postings sorted newest first, the order merge_postings expects of every stream.
+    """
+    return sorted(postings, key=recency, reverse=True)
+
+def normalize(posting: Posting):
+    """
+    Prepares a posting for display by removing the time part of its 'date_posted' field.
+
+    :return: The posting, or a copy of it with the date only.
+    """
+    if posting.date_posted and "T" in posting.date_posted:
+        return posting._replace(date_posted=posting.date_posted.split("T")[0])
+    return posting
+
+def unique_postings(postings, limit: int = None):
+    """
+    Drops every posting whose canonical url or content hash has already been seen, normalizing
+    the ones it keeps. Postings are consumed lazily, so duplicates are skipped as they are
+    reached instead of being collected first.
+
+    :param postings: An iterable of postings.
+    :param limit (int, optional): Stops after this many unique postings.
+
+    :yield: Unique, normalized postings.
+    """
+    seen_urls = set()
+    seen_hashes = set()
+    count = 0
+
+    for posting in postings:
+        url = canonical_url(posting.url)
+        digest = content_hash(posting)
+        if url in seen_urls or digest in seen_hashes:
+            continue
+
+        seen_urls.add(url)
+        seen_hashes.add(digest)
+        yield normalize(posting)
+
+        count += 1
+        if limit is not None and count >= limit:
+            return
+
+def merge_postings(streams: list, limit: int = None):
+    """
+    Merges several streams of postings into one stream of unique postings, newest first.
+    The k-way merge runs on a heap over the streams.
+
+    :param streams (list): Iterables of postings, each already sorted newest first.
+    :param limit (int, optional): Stops after this many unique postings.
+
+    :yield: Unique, normalized postings.
+    """
+    return unique_postings(heapq.merge(*streams, key=recency, reverse=True), limit)
@@ -0,0 +1,194 @@
+"""
+Local index of the postings returned by the 'Internship API'. Pages are streamed from both
+endpoints into a SQLite database, deduplicated by url, so filter queries can be answered
+locally in milliseconds instead of going upstream.
+
+Run an incremental sync (e.g. from cron) with:
+
+    python -m internapi.postings sync [--pages 50]
+"""
+from datetime import date, timedelta
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from .connections import ThreadConnections
+from .fetch import ATS_ENDPOINT, JB_ENDPOINT, BATCH_SIZE, fetch_page
+from .records import Posting
+
+POSTINGS_DB_FILE = 'internship_postings.db'
+MAX_AGE_DAYS = 7            #Postings older than this are expired, like the upstream '7d' endpoints.
+SYNC_PAGES = 50             #The most pages a sync reads from each endpoint.
+
+SCHEMA = [
+    "create table if not exists postings (url text primary key, title text, organization text, locations_derived text, "
+    "date_posted text not null default '', fetched_at real not null)",
+    #Filters are answered by the full-text index; only date_posted, which expire() and unfiltered searches range over, has a b-tree index.
+    "drop index if exists postings_title",
+    "drop index if exists postings_organization",
+    "drop index if exists postings_locations",
+    "create index if not exists postings_date_posted on postings (date_posted)",
+    "create virtual table if not exists postings_fts using fts5 (title, organization, locations_derived, "
+    "content='postings', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')",
+    "create trigger if not exists postings_fts_insert after insert on postings begin "
+    "insert into postings_fts (rowid, title, organization, locations_derived) values (new.rowid, new.title, new.organization, new.locations_derived); end",
+    "create trigger if not exists postings_fts_delete after delete on postings begin "
+    "insert into postings_fts (postings_fts, rowid, title, organization, locations_derived) values ('delete', old.rowid, old.title, old.organization, old.locations_derived); end",
+    "create trigger if not exists postings_fts_update after update of title, organization, locations_derived on postings begin "
+    "insert into postings_fts (postings_fts, rowid, title, organization, locations_derived) values ('delete', old.rowid, old.title, old.organization, old.locations_derived); "
+    "insert into postings_fts (rowid, title, organization, locations_derived) values (new.rowid, new.title, new.organization, new.locations_derived); end",
+]
+
+UPSERT = ("insert into postings (url, title, organization, locations_derived, date_posted, fetched_at) "
+          "values (:url, :title, :organization, :locations_derived, :date_posted, :fetched_at) "
+          "on conflict (url) do update set title = excluded.title, organization = excluded.organization, "
+          "locations_derived = excluded.locations_derived, date_posted = excluded.date_posted, fetched_at = excluded.fetched_at")
+
+def to_fts_query(column: str, text: str):
+    """
+    Turns a filter keyword typed by a user into an FTS5 query restricted to one column.
+    Every word must match; the last word matches as a prefix.
+
+    :return: The FTS5 query string, or None if the text contains no searchable words.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return None
+    return " AND ".join(f'{column} : "{word}"' for word in words) + "*"
+
+class PostingsIndex():
+    def __init__(self, db_file: str = POSTINGS_DB_FILE):
+        self.db_file = db_file
+        self.connections = ThreadConnections(db_file, timeout=10)
+
+        connection = self.connections.get()
+        with connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+
+    def ingest(self, postings: list):
+        """
+        Adds postings returned by the API to the index, replacing older copies of the same url.
+
+        :param postings (list): Posting records as returned by the API.
+
+        :return: The number of postings that were not in the index yet.
+        """
+        now = time.time()
+        rows = [{
+            'url': posting.url,
+            'title': posting.title,
+            'organization': posting.organization,
+            'locations_derived': json.dumps(posting.locations_derived),
+            'date_posted': posting.date_posted or '',
+            'fetched_at': now
+        } for posting in postings if posting.url]
+
+        if not rows:
+            return 0
+
+        connection = self.connections.get()
+        with connection:
+            known = connection.execute(f"select count(*) from postings where url in ({','.join('?' * len(rows))})",
+                                       [row['url'] for row in rows]).fetchone()[0]
+            connection.executemany(UPSERT, rows)
+
+        return len({row['url'] for row in rows}) - known
+
+    def sync(self, api_key: str, endpoints: list = None, max_pages: int = SYNC_PAGES):
+        """
+        Streams unfiltered pages from each endpoint into the index. Results come back newest first,
+        so the sync of an endpoint stops at the first page that holds no new posting.
+
+        :param api_key (str): The API key required for authentication.
+        :param endpoints (list, optional): The endpoints to read (default: both).
+        :param max_pages (int, optional): The most pages to read from each endpoint.
+
+        :return: The number of new postings added.
+        """
+        added = 0
+        for endpoint in endpoints or [ATS_ENDPOINT, JB_ENDPOINT]:
+            for page in range(max_pages):
+                data = fetch_page(api_key, endpoint, page * BATCH_SIZE, refresh=True)
+                if not data:
+                    break
+
+                new = self.ingest(data)
+                added += new
+                if new == 0 or len(data) < BATCH_SIZE:
+                    break
+
+        self.expire()
+        return added
+
+    def expire(self, max_age_days: int = MAX_AGE_DAYS):
+        """
+        Removes postings older than max_age_days.
+
+        :return: The number of postings removed.
+        """
+        cutoff = (date.today() - timedelta(days=max_age_days)).isoformat()
+        connection = self.connections.get()
+        with connection:
+            return connection.execute("delete from postings where date_posted < ?", (cutoff,)).rowcount
+
+    def search(self, title_filter: str = None, organization_filter: str = None, location_filter: str = None, limit: int = 20):
+        """
+        Finds the indexed postings matching the same filters the API accepts, newest first.
+
+        :param title_filter (str, optional): Keywords the title must contain.
+        :param organization_filter (str, optional): Keywords the organization name must contain.
+        :param location_filter (str, optional): Keywords the location must contain.
+        :param limit (int, optional): The maximum number of postings to return.
+
+        :return: A list of Posting records.
+        """
+        terms = [to_fts_query(column, text) for column, text in
+                 (('title', title_filter), ('organization', organization_filter), ('locations_derived', location_filter))]
+        terms = [term for term in terms if term]
+
+        if terms:
+            sql = ("select p.url, p.title, p.organization, p.locations_derived, p.date_posted from postings_fts f "
+                   "join postings p on p.rowid = f.rowid where postings_fts match ? order by p.date_posted desc limit ?")
+            params = (" AND ".join(terms), limit)
+        else:
+            sql = "select url, title, organization, locations_derived, date_posted from postings order by date_posted desc limit ?"
+            params = (limit,)
+
+        rows = self.connections.get().execute(sql, params).fetchall()
+        return [Posting(url, title, organization, json.loads(locations), date_posted) for url, title, organization, locations, date_posted in rows]
+
+    def count(self):
+        return self.connections.get().execute("select count(*) from postings").fetchone()[0]
+
+appindex = None
+index_lock = threading.Lock()
+
+def get_index():
+    """
+    :return: The postings index of this process, opening it on first use.
+    """
+    global appindex
+    if appindex is None:
+        with index_lock:
+            if appindex is None:
+                appindex = PostingsIndex(os.environ.get('INTERNSHIP_POSTINGS_DB', POSTINGS_DB_FILE))
+    return appindex
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintains the local index of internship postings.")
+    parser.add_argument('command', choices=['sync', 'expire'])
+    parser.add_argument('--pages', type=int, default=SYNC_PAGES, help="The most pages to read from each endpoint.")
+    args = parser.parse_args()
+
+    index = get_index()
+    if args.command == 'sync':
+        print("Added", index.sync(os.environ.get('INTERNSHIP_API_KEY'), max_pages=args.pages), "new postings.")
+    else:
+        print("Removed", index.expire(), "expired postings.")
+    print(index.count(), "postings indexed.")
+
+if __name__ == '__main__':
+    main()
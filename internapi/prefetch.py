@@ -0,0 +1,139 @@
+from collections import Counter
+import os
+import threading
+from .cache import get_cache, make_key
+from .fetch import ATS_ENDPOINT, JB_ENDPOINT, BATCH_SIZE, fetch_page
+
+PREFETCH_INTERVAL = 60      #Seconds between two refresh cycles.
+PREFETCH_TOP_K = 5          #The number of most frequent searches kept warm.
+PREFETCH_BUDGET = 20        #The most upstream requests a single refresh cycle may make.
+PREFETCH_RESULTS = 10       #Results per endpoint to keep warm; matches what Display.get shows.
+DECAY = 0.5                 #Search counts are multiplied by this after every cycle so old favourites fade out.
+TRACKER_SIZE = 1000         #The most filter sets counted at once.
+
+class SearchTracker():
+    """
+    Counts how often each (title, organization, location) filter set is searched for. At most
+    max_size filter sets are counted, whether or not the prefetch worker decays the counts: when a
+    new filter set arrives at a full tracker, the least searched half of the filter sets is forgotten.
+    """
+    def __init__(self, max_size: int = TRACKER_SIZE):
+        self.counts = Counter()
+        self.max_size = max_size
+        self.lock = threading.Lock()
+
+    def record(self, title_filter: str, organization_filter: str, location_filter: str):
+        filters = (title_filter, organization_filter, location_filter)
+        with self.lock:
+            if filters not in self.counts and len(self.counts) >= self.max_size:
+                self.counts = Counter(dict(self.counts.most_common(self.max_size // 2)))
+            self.counts[filters] += 1
+
+    def top(self, k: int):
+        """
+        :return: The k most frequently searched filter sets, most frequent first.
+        """
+        with self.lock:
+            return [filters for filters, _ in self.counts.most_common(k)]
+
+    def decay(self, factor: float = DECAY):
+        """
+        Scales every count down, forgetting filter sets that are no longer searched for.
+        """
+        with self.lock:
+            for filters in list(self.counts):
+                self.counts[filters] *= factor
+                if self.counts[filters] < 0.1:
+                    del self.counts[filters]
+
+class PrefetchWorker(threading.Thread):
+    """
+    Background thread that keeps the result cache warm for the most popular searches. Every
+    interval it re-fetches the pages of the top-K filter sets whose cache entries would expire
+    before the next cycle, spending at most budget upstream requests per cycle.
+    """
+    def __init__(self, tracker: SearchTracker, api_key: str, endpoints: list = None, interval: float = PREFETCH_INTERVAL,
+                 top_k: int = PREFETCH_TOP_K, budget: int = PREFETCH_BUDGET, max_results: int = PREFETCH_RESULTS):
+        super().__init__(name="internapi-prefetch", daemon=True)
+        self.tracker = tracker
+        self.api_key = api_key
+        self.endpoints = endpoints or [ATS_ENDPOINT, JB_ENDPOINT]
+        self.interval = interval
+        self.top_k = top_k
+        self.budget = budget
+        self.max_results = max_results
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as error:
+                print("Error prefetching searches:", error)
+            self.tracker.decay()
+
+    def stop(self):
+        self.stopped.set()
+
+    def refresh(self):
+        """
+        Runs one refresh cycle.
+
+        :return: The number of upstream requests made.
+        """
+        cache = get_cache()
+        offsets = range(0, self.max_results, BATCH_SIZE)
+        requests_made = 0
+
+        #Most popular searches first, so the budget goes where it saves the most latency.
+        for filters in self.tracker.top(self.top_k):
+            for endpoint in self.endpoints:
+                for offset in offsets:
+                    expires_in = cache.expires_in(make_key(endpoint, *filters, offset))
+
+                    #Leaves entries alone that will still be fresh at the next cycle.
+                    if expires_in is not None and expires_in > self.interval:
+                        continue
+
+                    if requests_made >= self.budget:
+                        return requests_made
+
+                    requests_made += 1
+                    data = fetch_page(self.api_key, endpoint, offset, *filters, refresh=True)
+
+                    #Later pages of an exhausted search would come back empty as well.
+                    if not data or len(data) < BATCH_SIZE:
+                        break
+
+        return requests_made
+
+apptracker = SearchTracker()
+appworker = None
+worker_lock = threading.Lock()
+
+def get_tracker():
+    return apptracker
+
+def start_prefetch():
+    """
+    Starts the prefetch worker of this process if INTERNSHIP_PREFETCH is enabled. Safe to call
+    more than once; must run after gunicorn forks its workers since threads do not survive a fork.
+    """
+    global appworker
+
+    if os.environ.get('INTERNSHIP_PREFETCH', '0') != '1':
+        return None
+
+    #Called by every request; skips the lock once the worker is running.
+    if appworker is not None:
+        return appworker
+
+    with worker_lock:
+        if appworker is None:
+            appworker = PrefetchWorker(apptracker, os.environ.get('INTERNSHIP_API_KEY'),
+                                       interval=float(os.environ.get('INTERNSHIP_PREFETCH_INTERVAL', PREFETCH_INTERVAL)),
+                                       top_k=int(os.environ.get('INTERNSHIP_PREFETCH_TOP_K', PREFETCH_TOP_K)),
+                                       budget=int(os.environ.get('INTERNSHIP_PREFETCH_BUDGET', PREFETCH_BUDGET)))
+            appworker.start()
+
+    return appworker
@@ -0,0 +1,194 @@
+import os
+import sqlite3
+import threading
+import time
+from .connections import ThreadConnections
+
+DEFAULT_RATE = 5                    #Upstream requests per second, on average.
+DEFAULT_BURST = 10                  #Requests that may be made back to back after a quiet period.
+DEFAULT_MAX_WAIT = 5                #Seconds a request waits for its turn before giving up.
+DEFAULT_QUOTA_RESET = 60            #Seconds to pause for when the quota is used up and the API does not say until when.
+RATE_LIMIT_DB_FILE = 'internship_ratelimit.db'
+
+#Response headers RapidAPI uses to report the request quota of the API key.
+QUOTA_REMAINING_HEADER = 'X-RateLimit-Requests-Remaining'
+QUOTA_RESET_HEADER = 'X-RateLimit-Requests-Reset'
+
+def parse_quota(headers):
+    """
+    Reads the remaining request quota of the API key from the RapidAPI response headers.
+
+    :param headers: The response headers.
+
+    :return: A tuple (remaining requests, seconds until the quota resets), or None if the
+             response does not report the quota.
+    """
+    try:
+        remaining = int(headers[QUOTA_REMAINING_HEADER])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    try:
+        reset = float(headers[QUOTA_RESET_HEADER])
+    except (KeyError, TypeError, ValueError):
+        reset = DEFAULT_QUOTA_RESET
+    return remaining, reset
+
+class RateLimiter():
+    """
+    Token bucket that every upstream request has to take a token from. The bucket holds up to
+    burst tokens and refills at rate tokens per second. The API can also pause the bucket, when
+    it reports that the quota is used up or asks to retry later.
+
+    Backends only differ in where the bucket's (tokens, updated_at, paused_until) state lives;
+    they apply every change to it atomically through _update.
+    """
+    def __init__(self, rate: float = DEFAULT_RATE, burst: float = DEFAULT_BURST, max_wait: float = DEFAULT_MAX_WAIT):
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+
+    def acquire(self, timeout: float = None):
+        """
+        Takes a token, waiting for the bucket to refill if it is empty.
+
+        :param timeout (float, optional): The most seconds to wait (default: max_wait).
+
+        :return: True if a token was taken. False if none would be available in time.
+        """
+        deadline = time.monotonic() + (self.max_wait if timeout is None else timeout)
+        while True:
+            wait = self._update(self._take)
+            if wait <= 0:
+                return True
+
+            #Gives up right away rather than sleeping past the deadline.
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def observe(self, headers):
+        """
+        Adjusts the bucket to the quota reported in the headers of an upstream response: the
+        bucket never holds more tokens than the quota has requests left, and pauses until the
+        quota resets once it is used up.
+        """
+        quota = parse_quota(headers)
+        if quota is None:
+            return
+
+        remaining, reset = quota
+
+        def limit(state, now):
+            tokens, updated_at, paused_until = state
+            if remaining <= 0:
+                paused_until = max(paused_until, now + reset)
+            return (min(tokens, max(remaining, 0)), updated_at, paused_until), None
+
+        self._update(limit)
+
+    def pause(self, seconds: float):
+        """
+        Stops handing out tokens for the given number of seconds, e.g. after a 429 response.
+        """
+        def pause(state, now):
+            tokens, updated_at, paused_until = state
+            return (0, updated_at, max(paused_until, now + seconds)), None
+
+        self._update(pause)
+
+    def _take(self, state, now):
+        """
+        :return: The new state and 0 if a token was taken, or the unchanged state and the
+                 number of seconds until one will be available.
+        """
+        tokens, updated_at, paused_until = state
+        if paused_until > now:
+            return state, paused_until - now
+
+        #The bucket does not refill while it is paused.
+        tokens = min(self.burst, tokens + max(now - max(updated_at, paused_until), 0) * self.rate)
+        if tokens >= 1:
+            return (tokens - 1, now, paused_until), 0
+        return (tokens, now, paused_until), (1 - tokens) / self.rate
+
+    def _update(self, change):
+        """
+        Applies change(state, now) -> (new state, result) to the bucket atomically.
+
+        :return: The result of change.
+        """
+        pass
+
+class NullLimiter(RateLimiter):
+    """Backend that never limits anything; used to turn rate limiting off."""
+    def acquire(self, timeout: float = None):
+        return True
+
+    def observe(self, headers):
+        pass
+
+    def pause(self, seconds: float):
+        pass
+
+class MemoryLimiter(RateLimiter):
+    """Bucket shared by all threads of a worker."""
+    def __init__(self, rate: float = DEFAULT_RATE, burst: float = DEFAULT_BURST, max_wait: float = DEFAULT_MAX_WAIT):
+        super().__init__(rate, burst, max_wait)
+        self.state = (burst, time.time(), 0)
+        self.lock = threading.Lock()
+
+    def _update(self, change):
+        with self.lock:
+            self.state, result = change(self.state, time.time())
+        return result
+
+class SQLiteLimiter(RateLimiter):
+    """
+    Bucket shared by every thread and every worker process on the host, so all of them together
+    stay within the API key's limits. Each thread keeps its own connection to the database file.
+    """
+    def __init__(self, db_file: str = RATE_LIMIT_DB_FILE, rate: float = DEFAULT_RATE, burst: float = DEFAULT_BURST,
+                 max_wait: float = DEFAULT_MAX_WAIT, name: str = 'internship-api'):
+        super().__init__(rate, burst, max_wait)
+        self.db_file = db_file
+        self.name = name
+        self.connections = ThreadConnections(db_file, timeout=5, isolation_level=None)
+
+        #A connection of its own, so none is inherited by the workers gunicorn forks.
+        connection = sqlite3.connect(db_file, timeout=5, isolation_level=None)
+        connection.execute("create table if not exists rate_limits (name text primary key, tokens real not null, "
+                           "updated_at real not null, paused_until real not null)")
+        connection.close()
+
+    def _update(self, change):
+        connection = self.connections.get()
+        with connection:
+            #Takes the write lock up front so no other process changes the bucket in between.
+            connection.execute("begin immediate")
+            now = time.time()
+            row = connection.execute("select tokens, updated_at, paused_until from rate_limits where name = ?", (self.name,)).fetchone()
+            state, result = change(row or (self.burst, now, 0), now)
+            connection.execute("insert or replace into rate_limits (name, tokens, updated_at, paused_until) values (?, ?, ?, ?)",
+                               (self.name, *state))
+        return result
+
+limiter_backend = os.environ.get('INTERNSHIP_RATE_LIMIT_BACKEND', 'sqlite')
+rate = float(os.environ.get('INTERNSHIP_RATE_LIMIT', DEFAULT_RATE))
+burst = float(os.environ.get('INTERNSHIP_RATE_LIMIT_BURST', DEFAULT_BURST))
+max_wait = float(os.environ.get('INTERNSHIP_RATE_LIMIT_WAIT', DEFAULT_MAX_WAIT))
+
+if limiter_backend == 'sqlite':
+    applimiter = SQLiteLimiter(os.environ.get('INTERNSHIP_RATE_LIMIT_DB', RATE_LIMIT_DB_FILE), rate, burst, max_wait)
+
+elif limiter_backend == 'memory':
+    applimiter = MemoryLimiter(rate, burst, max_wait)
+
+elif limiter_backend == 'none':
+    applimiter = NullLimiter()
+
+else:
+    raise ValueError("No appropriate rate limiter backend configured. ")
+
+def get_limiter():
+    return applimiter
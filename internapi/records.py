@@ -0,0 +1,50 @@
+from typing import NamedTuple
+import json
+
+class Posting(NamedTuple):
+    """
+    An internship posting returned by the 'Internship API', holding only the fields the app uses.
+    Upstream results carry dozens of other fields (descriptions, raw locations, ...) that are
+    dropped while the response is parsed.
+    """
+    url: str
+    title: str
+    organization: str
+    locations_derived: list
+    date_posted: str
+
+def from_json(data: dict):
+    """
+    :return: The Posting built from the fields of a decoded JSON object; missing fields are None.
+    """
+    return Posting(data.get('url'), data.get('title'), data.get('organization'), data.get('locations_derived'), data.get('date_posted'))
+
+def project(data: dict):
+    """
+    JSON object hook turning every object that looks like a posting into a Posting as soon as it
+    is decoded, so its other fields are released before the rest of the response is parsed.
+    Nested objects of dropped fields are left as they are and freed with their posting.
+    """
+    if 'url' in data and 'title' in data:
+        return from_json(data)
+    return data
+
+def parse_postings(content):
+    """
+    Decodes a page of API results, keeping only the fields of Posting.
+
+    :param content (bytes or str): The JSON body of the response.
+
+    :return: A list of Posting records.
+    :raises ValueError: If the body is not valid JSON.
+    """
+    return json.loads(content, object_hook=project)
+
+def load_postings(data: list):
+    """
+    Rebuilds the postings of a cached page. Postings are cached as JSON arrays in field order;
+    objects cached before the records were introduced are read too.
+
+    :return: A list of Posting records.
+    """
+    return [from_json(item) if isinstance(item, dict) else Posting._make(item) for item in data]
@@ -0,0 +1,206 @@
+"""
+Latency histograms and counters for the application, exposed at /metrics in the Prometheus
+text format. They cover the upstream page requests, the result cache, every Model method
+call, template rendering and whole requests, so a slow page can be traced to its cause.
+
+Setting INTERNSHIP_PROFILING=1 also lets a single request be profiled: send it with the header
+'X-Profile: 1' and a cProfile dump of the request is written to INTERNSHIP_PROFILE_DIR
+(default: profiles/). The file name is returned in the 'X-Profile-File' response header.
+"""
+from contextlib import contextmanager
+from flask import g, request, Response, before_render_template, template_rendered
+from flask.views import MethodView
+import cProfile
+import os
+import threading
+import time
+
+#Upper bounds in seconds of the latency buckets, from 1ms to 10s.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROFILE_DIR = 'profiles'
+
+def format_labels(names: tuple, values: tuple, extra: str = ""):
+    """
+    :return: The label set in the Prometheus text format, e.g. '{method="select",le="0.1"}'.
+    """
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Metric():
+    """
+    Base class of the metrics. Every metric registers itself so render() can export it.
+    """
+    def __init__(self, name: str, description: str, labels: tuple = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.lock = threading.Lock()
+        registry.append(self)
+
+    def key(self, labels: dict):
+        return tuple(labels.get(name, "") for name in self.labels)
+
+class Counter(Metric):
+    """A value that only goes up, kept per label set."""
+    kind = 'counter'
+
+    def __init__(self, name: str, description: str, labels: tuple = ()):
+        super().__init__(name, description, labels)
+        self.values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def collect(self):
+        with self.lock:
+            values = dict(self.values)
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{format_labels(self.labels, key)} {value}"
+
+class Histogram(Metric):
+    """Counts observations into cumulative latency buckets, kept per label set."""
+    kind = 'histogram'
+
+    def __init__(self, name: str, description: str, labels: tuple = (), buckets: tuple = BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = buckets
+        self.series = {}    #label values -> [count per bucket..., count of +Inf, sum]
+
+    def observe(self, value: float, **labels):
+        key = self.key(labels)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+
+            #Only the first bucket the value fits in is counted here; collect() accumulates them.
+            index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observes how long the with block takes, whether or not it raises.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def collect(self):
+        with self.lock:
+            series = {key: list(values) for key, values in self.series.items()}
+        for key, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{format_labels(self.labels, key, le)} {cumulative}"
+            yield f"{self.name}_sum{format_labels(self.labels, key)} {values[-1]}"
+            yield f"{self.name}_count{format_labels(self.labels, key)} {cumulative}"
+
+registry = []
+
+UPSTREAM_SECONDS = Histogram('internship_upstream_request_seconds', "Time spent on one page request to the Internship API, retries included.", ('endpoint',))
+UPSTREAM_ERRORS = Counter('internship_upstream_errors_total', "Failed attempts to fetch a page from the Internship API.", ('endpoint', 'reason'))
+RATE_LIMIT_SECONDS = Histogram('internship_rate_limit_wait_seconds', "Time one upstream request attempt waited for the rate limiter.", ('endpoint',))
+COALESCED_REQUESTS = Counter('internship_coalesced_requests_total', "Page requests that shared the upstream call of an identical request already in flight.", ('endpoint',))
+CACHE_LOOKUPS = Counter('internship_cache_lookups_total', "Result cache lookups for pages of API results.", ('result',))
+MODEL_SECONDS = Histogram('bookmark_model_call_seconds', "Time spent in one call of a bookmark Model method.", ('method',))
+RENDER_SECONDS = Histogram('template_render_seconds', "Time spent rendering one template; streamed templates include waiting for their data.", ('template',))
+REQUEST_SECONDS = Histogram('http_request_seconds', "Time spent handling one request, up to the first byte of the response.", ('endpoint', 'method', 'status'))
+
+def render():
+    """
+    :return: Every registered metric in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in registry:
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+class Instrumented():
+    """
+    Wraps an object so every call of the given methods is timed into a histogram, labelled
+    with the method name. Any other attribute is passed through untouched.
+    """
+    def __init__(self, target, histogram: Histogram, methods: set):
+        self._target = target
+        self._histogram = histogram
+        self._methods = methods
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._target, name)
+        if name not in self._methods:
+            return attribute
+
+        def timed(*args, **kwargs):
+            with self._histogram.time(method=name):
+                return attribute(*args, **kwargs)
+        return timed
+
+def init_app(app):
+    """
+    Times every request and template render of a Flask application, and enables the
+    per-request profiler when INTERNSHIP_PROFILING=1.
+    """
+    profiling = os.environ.get('INTERNSHIP_PROFILING', '0') == '1'
+    profile_dir = os.environ.get('INTERNSHIP_PROFILE_DIR', PROFILE_DIR)
+
+    @app.before_request
+    def start_request():
+        g.request_started = time.perf_counter()
+        if profiling and request.headers.get('X-Profile') == '1':
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def finish_request(response):
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(profile_dir, exist_ok=True)
+            path = os.path.join(profile_dir, f"{time.time():.6f}-{request.endpoint or 'unknown'}.prof")
+            profiler.dump_stats(path)
+            response.headers['X-Profile-File'] = path
+
+        if 'request_started' in g:
+            REQUEST_SECONDS.observe(time.perf_counter() - g.request_started,
+                                    endpoint=request.endpoint or 'unknown', method=request.method, status=response.status_code)
+        return response
+
+    @app.teardown_request
+    def stop_profiler(error=None):
+        #Requests that raised never reach after_request.
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+
+    def render_started(sender, template, context, **kwargs):
+        g.setdefault('renders_started', {})[template.name] = time.perf_counter()
+
+    def render_finished(sender, template, context, **kwargs):
+        started = g.get('renders_started', {}).pop(template.name, None)
+        if started is not None:
+            RENDER_SECONDS.observe(time.perf_counter() - started, template=template.name)
+
+    before_render_template.connect(render_started, app, weak=False)
+    template_rendered.connect(render_finished, app, weak=False)
+
+class Metrics(MethodView):
+    def get(self):
+        """
+        Exports every metric in the Prometheus text format.
+        """
+        return Response(render(), mimetype='text/plain; version=0.0.4')
@@ -1,65 +1,96 @@
-from flask import redirect, request, url_for, render_template, session, flash
+from flask import redirect, request, url_for, render_template, stream_template, session, flash, Response
 from flask.views import MethodView
-import requests
+from concurrent.futures import ThreadPoolExecutor
 import gbmodel
 import os
+import sqlite3
+import threading
+import uuid
+from internapi import ATS_ENDPOINT, JB_ENDPOINT, fetch_grouped, iter_fetch, get_tracker, get_index, merge_postings, sort_by_recency, unique_postings
 
-def fetch_internships(api_key: str, endpoint:str , max_results: int, title_filter: str = None, organization_filter: str = None, location_filter: str = None):
+MANAGE_PAGE_SIZE = 25   #The number of bookmarks shown per page of the manage page.
+LOCAL_RESULTS = 20      #The number of postings shown when searching the local postings index.
+INGEST_BACKLOG = 8      #The most result lists waiting to be written to the postings index.
+
+#Writes to the postings index happen on one background thread, so a locked index never holds up a page.
+_ingest_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest")
+_ingest_slots = threading.BoundedSemaphore(INGEST_BACKLOG)
+
+def current_user():
     """
-    Retrieves the internship postings returned from the 'Internship API' in 
-    batches until the desired number of results is reached or no more results is 
-    available.
-
-    :param api_key(str): The API key required for authentication.
-    :param endpoint (str): The API endpoint URL from which to fetch internship postings.
-    :param max_results (int): The maximum number of internship postings to retrieved.
-    :param title_filter (str, optional): A keyword to filter internships by title (default: None).
-    :param organization_filter (str, optional): A keyword to filter by organization name (default: None).
-    :param location_filter (str, optional): A keyword to filter internships by location (default: None).
-
-    :return: A list of dictionary objects
+    Gets the id of the visitor's own bookmark list. A random id is handed out on the first visit
+    and kept in the signed session cookie, so every browser gets its own list.
+
+    :return: The user id.
     """
+    if 'user_id' not in session:
+        session['user_id'] = uuid.uuid4().hex
+        session.permanent = True
+    return session['user_id']
 
-    headers = {
-        "x-rapidapi-key": api_key,
-        "x-rapidapi-host": "internships-api.p.rapidapi.com"
-    }
+def changed_fields(form):
+    """
+    Collects the 'date_applied' and 'application_status' values a user filled in on the manage page.
 
-    #List object to hold the fetched internship entries.
-    internships = []
-    offset = 0         #The starting ppint for the batch of internships to fetch.
-    batch_size = 10    #The default number of requests returned by the API per page.
+    :param form: The submitted form.
+
+    :return: A dictionary mapping the attributes to update to their new value.
+    """
+    fields = {}
+    if form.get('date_applied', "") != "":
+        fields['date_applied'] = form['date_applied']
+    if form.get('new_status', "") != "":
+        fields['application_status'] = form['new_status']
+    return fields
+
+def ingest_postings(results: list):
+    try:
+        get_index().ingest(results)
+    except sqlite3.Error as error:
+        print("Error indexing postings:", error)
+    finally:
+        _ingest_slots.release()
+
+def index_postings(results: list):
+    """
+    Queues postings fetched for a page to be added to the local postings index in the background.
+    The index only speeds up later local searches, so the page never waits for the write: a failure
+    to write it is logged, and results arriving while the backlog is full are dropped.
 
-    #Processes all results returned from the API.
-    while len(internships) < max_results:
-        params = {
-            "offset": offset,
-            "title_filter": title_filter,
-            "organization_filter": organization_filter,
-            "location_filter": location_filter
-        }
+    :param results (list): Posting records as returned by the API.
 
-        #Sends a GET request to the API with the specified headers and parameters
-        response = requests.get(endpoint, headers=headers, params=params)
+    :return: The Future of the write, or None if the results were dropped.
+    """
+    if not _ingest_slots.acquire(blocking=False):
+        print("Postings index backlog full, skipping", len(results), "postings")
+        return None
+    return _ingest_executor.submit(ingest_postings, results)
 
-        #Checks if the response was successful (status code 200)
-        if response.status_code != 200:
-            print("Error fetching data:", response.json())  # Print error if the request fails
-            break
+def search_postings(filters: tuple, source: str = 'live'):
+    """
+    Finds the internship postings matching the search filters, either live from both API endpoints
+    or from the local postings index. Live results are also added to the local index.
 
-        #Converts response data into a JSON object.
-        data = response.json()
+    :param filters (tuple): The title, organization and location filters.
+    :param source (str, optional): 'live' (default) or 'local'.
 
-        #Breaks out of the loop if there are no more results.
-        if not data:
-            break  
+    :return: A list of unique, normalized postings, newest first.
+    """
+    #Answers the search from the postings already ingested locally, without calling the API.
+    if source == 'local':
+        streams = [get_index().search(*filters, limit=LOCAL_RESULTS)]
 
-        #Appends the list of internship entries to the running list.
-        internships.extend(data)
-        offset += batch_size
+    #Fetch internships from both API endpoints concurrently, and adds them to the local index
+    #so later local searches can find them.
+    else:
+        api_key = os.environ.get('INTERNSHIP_API_KEY')
+        streams = [sort_by_recency(results) for results in fetch_grouped(api_key, [ATS_ENDPOINT, JB_ENDPOINT], 10, *filters)]
+        for results in streams:
+            index_postings(results)
 
-    #Return the requested number of internships (up to max_results)
-    return internships[:max_results]
+    #Merges the results newest first, dropping postings listed on both endpoints and removing
+    #the time part in the 'date_posted' field.
+    return list(merge_postings(streams))
 
 class Index(MethodView):
     def get(self):
@@ -79,6 +110,9 @@ class Search(MethodView):
         session['organization_filter'] = request.form['organization_filter']
         session['location_filter'] = request.form['location_filter']
 
+        #Counts the search so the prefetch worker can keep the popular ones warm.
+        get_tracker().record(session['title_filter'], session['organization_filter'], session['location_filter'])
+
         #Redirect the user to the 'display' page after the filters have been set
         return redirect(url_for('display'))
  
@@ -86,24 +120,40 @@ class Display(MethodView):
     def get(self):
         """
         Handles GET requests for displaying the internship postings returned by the API.
+        With '?source=local' the postings are looked up in the local postings index instead, and
+        with '?stream=1' the page is streamed to the browser while the API results arrive.
         Renders the 'display.html' template, passing the internship entries.
         """
-        endpoint1 = "https://internships-api.p.rapidapi.com/active-ats-7d"
-        endpoint2 = "https://internships-api.p.rapidapi.com/active-jb-7d"
-        internships = []
+        filters = (session.get('title_filter'), session.get('organization_filter'), session.get('location_filter'))
+        source = request.args.get('source', os.environ.get('INTERNSHIP_SEARCH_SOURCE', 'live'))
+        stream = request.args.get('stream', os.environ.get('INTERNSHIP_STREAM_DISPLAY', '0')) == '1'
 
-        #Fetch internships from the API with the filters stored in the session.
-        api_key = os.environ.get('INTERNSHIP_API_KEY')
-        
-        internships.extend(fetch_internships(api_key, endpoint1, 10, session.get('title_filter'), session.get('organization_filter'), session.get('location_filter')))
-        internships.extend(fetch_internships(api_key, endpoint2, 10, session.get('title_filter'), session.get('organization_filter'), session.get('location_filter')))
+        #Sends the page shell right away and each endpoint's postings as soon as they arrive.
+        if stream and source != 'local':
+            return Response(stream_template('display.html', entries=self.arrivals(filters), source=source))
 
-        #Processes the fetched internships to remove the time part in the 'date_posted' field.
-        for entry in internships:
-            entry['date_posted'] = entry['date_posted'].split("T")[0]
+        #Fetch internships with the filters stored in the session.
+        internships = search_postings(filters, source)
 
         #Renders the 'display.html' template and passes the list of internships to it         
-        return render_template('display.html', entries=internships)
+        return render_template('display.html', entries=internships, source=source)
+
+    def arrivals(self, filters: tuple):
+        """
+        Streams the postings of both API endpoints in the order the endpoints answer, newest first
+        within each endpoint, skipping postings already streamed from the other endpoint.
+
+        :param filters (tuple): The title, organization and location filters.
+
+        :yield: Unique, normalized postings.
+        """
+        def postings():
+            api_key = os.environ.get('INTERNSHIP_API_KEY')
+            for _, results in iter_fetch(api_key, [ATS_ENDPOINT, JB_ENDPOINT], 10, *filters):
+                index_postings(results)
+                yield from sort_by_recency(results)
+
+        return unique_postings(postings())
     
     def post(self):
         """
@@ -126,7 +176,7 @@ class Display(MethodView):
                 "application_status": None
             }
 
-            result = model.insert(new_entry)
+            result = model.insert(new_entry, current_user())
 
         #Sends a flash message to the front-end if the entry to be added has the same internship endpoint as an existing entry in
         #database.
@@ -160,7 +210,7 @@ class ManualAdd(MethodView):
                 "application_status": None
 
             }
-            result = model.insert(new_entry)
+            result = model.insert(new_entry, current_user())
 
         #Sends a flash message to the front-end if the entry to be added has the same internship endpoint as an existing entry in
         #database.
@@ -177,13 +227,29 @@ class Manage(MethodView):
         Renders the 'manage.html' template and passes the internship entries to it.
         """
         model = gbmodel.get_model()
-
-        #Converts the data into a list of dictionaries.
-        entries = [dict(internship_title=row[0], organization=row[1], date_posted=row[2], location=row[3], 
-                            internship_url=row[4], date_applied=row[5], application_status=row[6]) for row in model.select()]
-
-        #Renders the 'manage.html' template and passes the internship entries to it.
-        return render_template('manage.html',entries=entries)
+        user_id = current_user()
+
+        #Reads the search text, filter, sort order and page cursor from the query string.
+        query = request.args.get('q', "").strip()
+        status = request.args.get('status', "")
+        sort = request.args.get('sort', "-date_posted")
+        cursor = request.args.get('cursor') or None
+        filters = {'application_status': status} if status else {}
+
+        #Shows the best search matches when the user searched for something.
+        if query:
+            rows, next_cursor = model.search(query, MANAGE_PAGE_SIZE, user_id), None
+
+        #Otherwise fetches a single page of bookmarks; falls back to the first page if the cursor or sort order is invalid.
+        else:
+            try:
+                rows, next_cursor = model.select_page(filters, sort, cursor, MANAGE_PAGE_SIZE, user_id)
+            except ValueError:
+                sort = "-date_posted"
+                rows, next_cursor = model.select_page(filters, sort, None, MANAGE_PAGE_SIZE, user_id)
+
+        #Renders the 'manage.html' template and passes the Bookmark records to it.
+        return render_template('manage.html', entries=rows, user_id=user_id, query=query, status=status, sort=sort, cursor=cursor, next_cursor=next_cursor)
 
     def post(self):
         """
@@ -191,20 +257,43 @@ class Manage(MethodView):
         Redirect to the manage page when completed.
         """
         model = gbmodel.get_model()
+        user_id = current_user()
  
         #Checking if the selected operation is 'delete' and internship_url is not an empty string before 
         #attempting to remove the specified entry from the database.
         if request.form['operation'] == "delete" and request.form['internship_url'] != "":
-            model.delete(request.form['internship_url'])
+            model.delete(request.form['internship_url'], user_id)
 
         #Checking if the selected operation is 'update' and internship_url is not an empty string before
-        #attempting to update the 'date_applied' and/or 'application_status' fields.
+        #attempting to update the 'date_applied' and/or 'application_status' fields in a single write.
         elif request.form['operation'] == "update" and request.form['internship_url'] != "":
-            if request.form['date_applied'] != "":
-                model.update(request.form['internship_url'], "date_applied", request.form['date_applied'])
+            fields = changed_fields(request.form)
+            if fields:
+                model.update_fields(request.form['internship_url'], fields, user_id)
 
-            if request.form['new_status'] != "":
-                model.update(request.form['internship_url'], "application_status", request.form['new_status'])
+        #Bulk operations apply to every bookmark ticked on the page.
+        elif request.form['operation'] == "bulk_delete":
+            model.delete_many(request.form.getlist('selected'), user_id)
+
+        elif request.form['operation'] == "bulk_update":
+            fields = changed_fields(request.form)
+            if fields:
+                model.update_many(request.form.getlist('selected'), fields, user_id)
 
         return redirect(url_for('manage'))
 
+class Stats(MethodView):
+    def get(self):
+        """
+        Handles GET requests to the stats page.
+        Renders the 'stats.html' template with the visitor's bookmarks counted by application status
+        and by the week they applied. The counts are kept up to date by the model on every write,
+        so the page does not read the bookmarks themselves.
+        """
+        stats = gbmodel.get_model().stats(current_user())
+
+        #Most common statuses first; the most recent weeks first.
+        statuses = sorted(stats['application_status'].items(), key=lambda item: (-item[1], item[0]))
+        weeks = sorted(stats['date_applied'].items(), reverse=True)
+
+        return render_template('stats.html', statuses=statuses, weeks=weeks, total=sum(count for _, count in statuses))
@@ -0,0 +1,52 @@
+"""
+Tests of the JSON API, against a fresh SQLite database.
+"""
+import os
+
+import pytest
+
+os.environ.setdefault('SECRET_KEY', 'test')
+
+import app
+import gbmodel
+from gbmodel.model_sqlite3 import model
+
+BOOKMARK = {
+    'internship_title': "Software Engineering Intern",
+    'organization': "Example",
+    'date_posted': "2025-01-01",
+    'location': "Portland, OR",
+    'internship_url': "https://example.com/jobs/1",
+}
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(gbmodel, 'appmodel', model(str(tmp_path / "bookmarks.db")))
+    return app.app.test_client()
+
+@pytest.mark.parametrize("limit, expected", [(0, 1), (-1, 1), (2, 2), (1000, 3)])
+def test_bookmarks_limit_is_clamped(client, limit, expected):
+    for i in range(3):
+        client.post('/api/v1/bookmarks', json=dict(BOOKMARK, internship_url=f"https://example.com/jobs/{i}"))
+    response = client.get(f'/api/v1/bookmarks?limit={limit}')
+    assert response.status_code == 200
+    assert len(response.get_json()['bookmarks']) == expected
+    assert len(client.get(f'/api/v1/bookmarks?limit={limit}&q=engineering').get_json()['bookmarks']) == expected
+
+@pytest.mark.parametrize("field, value", [('date_posted', {"year": 2025}), ('organization', ["Example"]), ('date_applied', 3), ('application_status', True)])
+def test_post_rejects_values_that_are_not_text(client, field, value):
+    response = client.post('/api/v1/bookmarks', json=dict(BOOKMARK, **{field: value}))
+    assert response.status_code == 400
+    assert client.get('/api/v1/bookmarks').get_json()['bookmarks'] == []
+
+@pytest.mark.parametrize("value", [["x"], {"status": "x"}, 1])
+def test_patch_rejects_values_that_are_not_text(client, value):
+    client.post('/api/v1/bookmarks', json=BOOKMARK)
+    response = client.patch(f"/api/v1/bookmark?url={BOOKMARK['internship_url']}", json={'application_status': value})
+    assert response.status_code == 400
+
+def test_patch_accepts_text_and_null(client):
+    client.post('/api/v1/bookmarks', json=BOOKMARK)
+    response = client.patch(f"/api/v1/bookmark?url={BOOKMARK['internship_url']}", json={'application_status': "Pending", 'date_applied': None})
+    assert response.status_code == 200
+    assert client.get('/api/v1/bookmarks').get_json()['bookmarks'][0]['application_status'] == "Pending"
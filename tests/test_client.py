@@ -0,0 +1,96 @@
+"""
+Tests of the circuit breaker bookkeeping of InternshipClient.get_page: a half-open circuit lets
+a single trial call through, and every way that call can end must free the slot again.
+"""
+import pytest
+
+from internapi.client import TRIAL, CircuitBreaker, InternshipClient
+from internapi.ratelimit import NullLimiter
+
+ENDPOINT = "https://internships-api.example.com/active-ats-7d"
+
+class FakeResponse():
+    def __init__(self, status_code: int, content: bytes = b"[]"):
+        self.status_code = status_code
+        self.content = content
+        self.text = content.decode()
+        self.headers = {}
+
+class FakeSession():
+    """
+    Stands in for requests.Session, answering every GET with the same response.
+    """
+    def __init__(self, response: FakeResponse):
+        self.response = response
+        self.calls = 0
+
+    def get(self, endpoint, headers=None, params=None, timeout=None):
+        self.calls += 1
+        return self.response
+
+def half_open_client(response: FakeResponse, limiter = None):
+    """
+    :return: A client whose circuit is open and ready to let a trial call through, answered with response.
+    """
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    client = InternshipClient(max_retries=0, breaker=breaker, limiter=limiter or NullLimiter())
+    client.session = FakeSession(response)
+    return client
+
+def test_success_closes_the_circuit():
+    client = half_open_client(FakeResponse(200))
+    assert client.get_page("key", ENDPOINT, {}, parse=lambda content: content) == b"[]"
+    assert client.breaker.opened_at is None
+    assert not client.breaker.trial_in_flight
+
+def test_client_error_frees_the_trial():
+    client = half_open_client(FakeResponse(401, b"bad key"))
+    assert client.get_page("key", ENDPOINT, {}) is None
+    assert not client.breaker.trial_in_flight
+    assert client.breaker.allow()
+
+def test_parse_error_frees_the_trial():
+    def parse(content):
+        raise ValueError("not JSON")
+
+    client = half_open_client(FakeResponse(200, b"<html>"))
+    with pytest.raises(ValueError):
+        client.get_page("key", ENDPOINT, {}, parse=parse)
+    assert not client.breaker.trial_in_flight
+    assert client.breaker.allow()
+
+def test_server_error_keeps_the_circuit_open():
+    client = half_open_client(FakeResponse(503))
+    assert client.get_page("key", ENDPOINT, {}) is None
+    assert client.breaker.opened_at is not None
+    assert not client.breaker.trial_in_flight
+
+def test_rate_limited_call_frees_the_trial():
+    class ExhaustedLimiter(NullLimiter):
+        def acquire(self, timeout: float = None):
+            return False
+
+    client = half_open_client(FakeResponse(200), ExhaustedLimiter())
+    assert client.get_page("key", ENDPOINT, {}) is None
+    assert client.session.calls == 0
+    assert not client.breaker.trial_in_flight
+    assert client.breaker.allow()
+
+def test_closed_circuit_call_keeps_a_concurrent_trial():
+    class SlowFailingSession(FakeSession):
+        """
+        Opens the circuit and starts a trial while the call admitted before is still in flight.
+        """
+        def get(self, endpoint, headers=None, params=None, timeout=None):
+            breaker.record_failure()
+            assert breaker.allow() == TRIAL
+            return super().get(endpoint, headers, params, timeout)
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    client = InternshipClient(max_retries=0, breaker=breaker, limiter=NullLimiter())
+    client.session = SlowFailingSession(FakeResponse(503))
+    assert client.get_page("key", ENDPOINT, {}) is None
+    #The late failure of the closed-circuit call leaves the trial slot taken.
+    assert breaker.trial_in_flight
+    assert not breaker.allow()
@@ -0,0 +1,47 @@
+"""
+Tests of the coalescing of identical upstream calls made at the same time.
+"""
+import threading
+import time
+
+from internapi.fetch import SingleFlight
+
+def test_concurrent_identical_calls_make_one_upstream_call():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def upstream():
+        calls.append(1)
+        release.wait(5)
+        return ["posting"]
+
+    results = []
+    def search():
+        results.append(flights.do("same search", upstream))
+
+    threads = [threading.Thread(target=search) for _ in range(8)]
+    threads[0].start()
+    while "same search" not in flights.calls:
+        time.sleep(0.001)
+    for thread in threads[1:]:
+        thread.start()
+    #Gives the other callers time to join the call in flight.
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert all(result == ["posting"] for result, _ in results)
+    assert flights.calls == {}
+
+def test_calls_after_the_first_finished_run_again():
+    flights = SingleFlight()
+    assert flights.do("key", lambda: 1) == (1, False)
+    assert flights.do("key", lambda: 2) == (2, False)
+
+def test_different_keys_are_not_coalesced():
+    flights = SingleFlight()
+    assert flights.do("a", lambda: flights.do("b", lambda: "b")) == (("b", False), False)
@@ -0,0 +1,53 @@
+"""
+Tests of the deduplication of postings merged from the two Internship API endpoints.
+"""
+from internapi.merge import canonical_url, content_hash, merge_postings, unique_postings
+from internapi.records import Posting
+
+def test_canonical_url_drops_tracking_parameters():
+    url = "HTTPS://Jobs.Example.com/posting/42/?utm_source=x&utm_campaign=y&gh_src=a&ref=b&source=c&src=d&lever-source=e&lever-origin=f#apply"
+    assert canonical_url(url) == "https://jobs.example.com/posting/42"
+
+def test_canonical_url_keeps_parameters_that_only_look_like_tracking():
+    url = "https://jobs.example.com/posting?srcJobId=7&referenceNumber=3&refId=9&sourceId=1"
+    assert canonical_url(url) == "https://jobs.example.com/posting?refId=9&referenceNumber=3&sourceId=1&srcJobId=7"
+
+def test_content_hash_ignores_case_spacing_and_location_order():
+    first = Posting("https://a.example.com/1", "Data  Science Intern", "Acme", ["Seattle, WA", "Remote"], "2025-06-01")
+    second = Posting("https://b.example.com/2", "data science intern ", "ACME", ["Remote", "Seattle, WA"], "2025-06-02")
+    assert content_hash(first) == content_hash(second)
+    assert content_hash(first) != content_hash(first._replace(organization="Initech"))
+
+def test_content_hash_accepts_a_single_location_string():
+    posting = Posting("https://a.example.com/1", "Intern", "Acme", "Remote", None)
+    assert content_hash(posting) == content_hash(posting._replace(locations_derived=["Remote"]))
+
+def test_unique_postings_drops_duplicates_and_normalizes_dates():
+    postings = [
+        Posting("https://a.example.com/1?utm_source=x", "Intern", "Acme", ["Remote"], "2025-06-03T10:00:00"),
+        Posting("https://a.example.com/1/", "Another title", "Other", ["Remote"], "2025-06-02"),
+        Posting("https://b.example.com/9", "intern", "acme", ["Remote"], "2025-06-01"),
+        Posting("https://c.example.com/5", "Analyst", "Acme", ["Remote"], "2025-06-01"),
+    ]
+    unique = list(unique_postings(postings))
+    assert [posting.url for posting in unique] == ["https://a.example.com/1?utm_source=x", "https://c.example.com/5"]
+    assert unique[0].date_posted == "2025-06-03"
+
+def test_unique_postings_stops_at_the_limit():
+    postings = (Posting(f"https://a.example.com/{i}", f"Intern {i}", "Acme", [], None) for i in range(100))
+    assert len(list(unique_postings(postings, limit=5))) == 5
+
+def test_merge_postings_dedupes_across_endpoints_newest_first():
+    #The same job is published under different urls on the two endpoints.
+    hourly = [
+        Posting("https://jobs.lever.co/acme/1?lever-source=x", "ML Intern", "Acme", ["Remote"], "2025-06-05T08:00:00"),
+        Posting("https://jobs.lever.co/acme/2", "Data Intern", "Acme", ["Austin, TX"], "2025-06-02"),
+    ]
+    weekly = [
+        Posting("https://boards.greenhouse.io/initech/7", "QA Intern", "Initech", ["Remote"], "2025-06-04"),
+        Posting("https://acme.example.com/careers/ml", "ml intern", "ACME", ["Remote"], "2025-06-03"),
+        Posting("https://jobs.lever.co/acme/2/", "Data Intern (copy)", "Acme", ["Remote"], "2025-06-01"),
+    ]
+    merged = list(merge_postings([hourly, weekly]))
+    assert [posting.title for posting in merged] == ["ML Intern", "QA Intern", "Data Intern"]
+    assert [posting.date_posted for posting in merged] == ["2025-06-05", "2025-06-04", "2025-06-02"]
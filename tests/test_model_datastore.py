@@ -0,0 +1,124 @@
+"""
+Tests of the Datastore backend against the in-memory FakeClient, including the round-trips
+(rpc_count) each operation costs the real service.
+"""
+import threading
+
+import pytest
+from google.api_core.exceptions import Aborted
+
+from benchmarks.common import make_entry
+from gbmodel.datastore_fake import FakeClient
+from gbmodel.model_datastore import model
+
+def filled(size: int, batch_size: int = None):
+    """
+    :return: A tuple (client, model) holding size bookmarks of the default user.
+    """
+    client = FakeClient(batch_size=batch_size)
+    db = model(client)
+    db.insert_many(make_entry(i) for i in range(size))
+    return client, db
+
+def walk(db, limit: int):
+    """
+    :return: The pages of select_page from the first to the last, as lists of urls.
+    """
+    pages, cursor = [], None
+    while True:
+        rows, cursor = db.select_page(cursor=cursor, limit=limit)
+        pages.append([row.internship_url for row in rows])
+        if cursor is None:
+            return pages
+
+@pytest.mark.parametrize("batch_size", [None, 3])
+def test_select_page_fills_pages_from_short_batches(batch_size):
+    client, db = filled(20, batch_size)
+    pages = walk(db, 7)
+    assert [len(page) for page in pages] == [7, 7, 6]
+    assert len({url for page in pages for url in page}) == 20
+
+@pytest.mark.parametrize("cursor", ["abc", "bm90IGEgY3Vyc29y", "!!!"])
+def test_select_page_rejects_invalid_cursors(cursor):
+    client, db = filled(5)
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        db.select_page(cursor=cursor)
+
+def test_select_page_costs_one_round_trip_per_batch():
+    client, db = filled(20, batch_size=3)
+    before = client.rpc_count
+    rows, cursor = db.select_page(limit=7)
+    assert len(rows) == 7 and cursor is not None
+    assert client.rpc_count - before == 3
+
+@pytest.mark.parametrize("batch_size", [None, 3])
+def test_iter_select_reads_past_short_batches(batch_size):
+    client, db = filled(20, batch_size)
+    assert len(list(db.iter_select(page_size=8))) == 20
+
+def rpcs(client, operation):
+    """
+    :return: A tuple (round-trips made by operation, its result).
+    """
+    before = client.rpc_count
+    result = operation()
+    return client.rpc_count - before, result
+
+def test_insert_costs_a_lookup_and_a_commit():
+    client, db = filled(0)
+    assert rpcs(client, lambda: db.insert(make_entry(1))) == (2, True)
+    assert rpcs(client, lambda: db.insert(make_entry(1))) == (2, False)
+
+def test_update_fields_reads_the_counters_it_moves_between():
+    client, db = filled(1)
+    url = make_entry(0)['internship_url']
+    assert rpcs(client, lambda: db.update_fields(url, {'application_status': 'Pending'})) == (3, True)
+    assert rpcs(client, lambda: db.update_fields("https://example.com/missing", {'application_status': 'Pending'})) == (2, False)
+
+def test_batch_methods_cost_a_few_round_trips_per_commit():
+    #Every commit holds up to 498 bookmarks, the change counter and one stats counter.
+    client, db = filled(0)
+    urls = [make_entry(i)['internship_url'] for i in range(1200)]
+    assert rpcs(client, lambda: db.insert_many(make_entry(i) for i in range(1200))) == (6, 1200)
+    assert rpcs(client, lambda: db.update_many(urls, {'application_status': 'Pending'})) == (9, 1200)
+    assert rpcs(client, lambda: db.delete_many(urls)) == (9, 1200)
+    assert db.stats() == {'application_status': {}, 'date_applied': {}}
+
+@pytest.mark.parametrize("batch_size, expected", [(None, 1), (3, 7)])
+def test_select_streams_in_batches(batch_size, expected):
+    client, db = filled(20, batch_size)
+    assert rpcs(client, lambda: len(db.select())) == (expected, 20)
+
+def test_conflicting_commit_is_aborted():
+    client, db = filled(1)
+    url = make_entry(0)['internship_url']
+    lookup = db.lookup_with_version
+
+    #Another request updates the bookmark between this update's lookup and its commit.
+    def lookup_then_race(*args, **kwargs):
+        found = lookup(*args, **kwargs)
+        if not raced:
+            raced.append(True)
+            racer = threading.Thread(target=db.update_fields, args=(url, {'application_status': 'Accepted'}))
+            racer.start()
+            racer.join()
+        return found
+
+    raced = []
+    db.lookup_with_version = lookup_then_race
+    with pytest.raises(Aborted):
+        db.update_fields(url, {'application_status': 'Rejected'})
+
+    #Only the write that committed first is kept, in the bookmark and in the stats alike.
+    assert db.select()[0].application_status == 'Accepted'
+    assert db.stats()['application_status'] == {'Accepted': 1}
+
+def test_other_users_do_not_conflict():
+    client = FakeClient()
+    db = model(client)
+    with client.transaction(begin_later=True):
+        db.lookup_with_version([db.bookmark_key("https://example.com/jobs/1", 'alice')], 'alice')
+        racer = threading.Thread(target=db.insert, args=(make_entry(1), 'bob'))
+        racer.start()
+        racer.join()
+    assert len(db.select('bob')) == 1
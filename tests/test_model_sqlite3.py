@@ -0,0 +1,64 @@
+"""
+Tests of the SQLite backend, each against a fresh database file.
+"""
+import base64
+import json
+
+import pytest
+
+from benchmarks.common import make_entry
+from gbmodel.model_sqlite3 import model
+
+@pytest.fixture
+def db(tmp_path):
+    db = model(str(tmp_path / "bookmarks.db"))
+    db.insert_many(make_entry(i) for i in range(20))
+    return db
+
+def encode(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def test_select_page_walks_every_row(db):
+    urls, cursor = [], None
+    while True:
+        rows, cursor = db.select_page(cursor=cursor, limit=7)
+        urls += [row.internship_url for row in rows]
+        if cursor is None:
+            break
+    assert len(urls) == len(set(urls)) == 20
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    encode([1]),
+    encode(["2025-01-01"]),
+    encode(["2025-01-01", 3, 4]),
+    encode([1, 3]),
+    encode(["2025-01-01", "3"]),
+    encode(["2025-01-01", True]),
+    encode({"date_posted": "2025-01-01", "rowid": 3}),
+])
+def test_select_page_rejects_invalid_cursors(db, cursor):
+    with pytest.raises(ValueError):
+        db.select_page(cursor=cursor)
+
+def urls(rows):
+    return sorted(row.internship_url for row in rows)
+
+def entry_urls(*numbers):
+    return sorted(make_entry(i)['internship_url'] for i in numbers)
+
+def test_search_only_matches_the_users_own_bookmarks(db):
+    #Every tenth bookmark is a "Software Engineering" and every tenth a "Mechanical Engineering" internship.
+    db.insert(make_entry(100), 'alice')
+    assert urls(db.search("software engineering intern", user_id='alice')) == entry_urls(100)
+    assert db.search("engineering", user_id='bob') == []
+    assert urls(db.search("engineering")) == entry_urls(0, 5, 10, 15)
+
+def test_search_index_follows_writes(db):
+    url = make_entry(0)['internship_url']
+    db.delete(url)
+    assert url not in urls(db.search("engineering"))
+    db.insert_many([make_entry(5, internship_title="Hardware Intern")], on_conflict='replace')
+    assert urls(db.search("mechan")) == entry_urls(15)
+    assert urls(db.search("hardware")) == entry_urls(5, 9, 19)
@@ -0,0 +1,49 @@
+"""
+Tests of the helpers behind the web pages.
+"""
+import sqlite3
+import threading
+
+import operations
+from internapi.records import Posting
+
+POSTINGS = [Posting("https://example.com/jobs/1", "Software Engineering Intern", "Example", ["Portland, OR"], "2025-01-01")]
+
+def test_index_postings_survives_a_failing_index(monkeypatch, capsys):
+    class BrokenIndex():
+        def ingest(self, postings):
+            raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(operations, 'get_index', BrokenIndex)
+    operations.index_postings(POSTINGS).result()
+    assert "database is locked" in capsys.readouterr().out
+
+def test_index_postings_adds_to_the_index(monkeypatch):
+    added = []
+
+    class Index():
+        def ingest(self, postings):
+            added.extend(postings)
+
+    monkeypatch.setattr(operations, 'get_index', Index)
+    operations.index_postings(POSTINGS).result()
+    assert added == POSTINGS
+
+def test_index_postings_does_not_wait_for_a_locked_index(monkeypatch, capsys):
+    unlocked = threading.Event()
+
+    class LockedIndex():
+        def ingest(self, postings):
+            unlocked.wait(5)
+
+    monkeypatch.setattr(operations, 'get_index', LockedIndex)
+    writes = [operations.index_postings(POSTINGS) for _ in range(operations.INGEST_BACKLOG + 1)]
+    assert all(write is not None and not write.done() for write in writes[:-1])
+    #Once the backlog is full further results are dropped instead of queued.
+    assert writes[-1] is None
+    assert "backlog full" in capsys.readouterr().out
+
+    unlocked.set()
+    for write in writes[:-1]:
+        write.result(5)
+    operations.index_postings(POSTINGS).result(5)
@@ -0,0 +1,21 @@
+"""
+Tests of the search tracker feeding the prefetch worker.
+"""
+from internapi.prefetch import SearchTracker
+
+def test_tracker_stays_within_its_size_without_the_worker():
+    tracker = SearchTracker(max_size=50)
+    #A popular search keeps coming back among a stream of one-off ones.
+    for i in range(10000):
+        tracker.record(f"title {i}", "", "")
+        if i % 10 == 0:
+            tracker.record("Data Science", "", "")
+    assert len(tracker.counts) <= 50
+    assert tracker.top(1) == [("Data Science", "", "")]
+
+def test_tracker_ranks_by_count():
+    tracker = SearchTracker()
+    for title, times in (("a", 1), ("b", 3), ("c", 2)):
+        for _ in range(times):
+            tracker.record(title, "", "")
+    assert tracker.top(2) == [("b", "", ""), ("c", "", "")]
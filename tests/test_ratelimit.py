@@ -0,0 +1,77 @@
+"""
+Tests of the token bucket every upstream request takes a token from, on both the in-process
+and the SQLite backend.
+"""
+from internapi.ratelimit import (QUOTA_REMAINING_HEADER, QUOTA_RESET_HEADER, DEFAULT_QUOTA_RESET,
+                                 MemoryLimiter, SQLiteLimiter, parse_quota)
+
+def test_take_spends_the_burst_then_waits_for_a_refill():
+    limiter = MemoryLimiter(rate=2, burst=3)
+    state = (3, 100.0, 0)
+    for _ in range(3):
+        state, wait = limiter._take(state, 100.0)
+        assert wait == 0
+
+    state, wait = limiter._take(state, 100.0)
+    assert wait == 0.5
+    state, wait = limiter._take(state, 100.5)
+    assert wait == 0
+
+def test_take_refills_no_further_than_the_burst():
+    limiter = MemoryLimiter(rate=2, burst=3)
+    state, wait = limiter._take((0, 100.0, 0), 200.0)
+    assert wait == 0
+    assert state == (2, 200.0, 0)
+
+def test_paused_bucket_refills_only_once_the_pause_is_over():
+    limiter = MemoryLimiter(rate=2, burst=3)
+    state = (0, 100.0, 105.0)
+    assert limiter._take(state, 101.0) == (state, 4.0)
+
+    state, wait = limiter._take(state, 106.0)
+    assert wait == 0
+    assert state == (1, 106.0, 105.0)
+
+def test_parse_quota():
+    assert parse_quota({}) is None
+    assert parse_quota({QUOTA_REMAINING_HEADER: "many"}) is None
+    assert parse_quota({QUOTA_REMAINING_HEADER: "7", QUOTA_RESET_HEADER: "30"}) == (7, 30.0)
+    assert parse_quota({QUOTA_REMAINING_HEADER: "7"}) == (7, DEFAULT_QUOTA_RESET)
+
+def test_used_up_quota_pauses_the_bucket():
+    limiter = MemoryLimiter(rate=100, burst=10)
+    limiter.observe({QUOTA_REMAINING_HEADER: "0", QUOTA_RESET_HEADER: "30"})
+    assert not limiter.acquire(timeout=0)
+    tokens, updated_at, paused_until = limiter.state
+    assert tokens == 0
+    assert paused_until - updated_at >= 29
+
+def test_remaining_quota_caps_the_tokens():
+    limiter = MemoryLimiter(rate=0.001, burst=10)
+    limiter.observe({QUOTA_REMAINING_HEADER: "2"})
+    assert limiter.acquire(timeout=0)
+    assert limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=0)
+
+def test_pause_empties_the_bucket():
+    limiter = MemoryLimiter(rate=100, burst=10)
+    limiter.pause(30)
+    assert not limiter.acquire(timeout=0)
+    assert limiter.state[0] == 0
+
+def test_sqlite_bucket_is_shared_by_every_limiter_on_the_file(tmp_path):
+    db_file = str(tmp_path / "ratelimit.db")
+    first = SQLiteLimiter(db_file, rate=0.001, burst=2)
+    second = SQLiteLimiter(db_file, rate=0.001, burst=2)
+    assert first.acquire(timeout=0)
+    assert second.acquire(timeout=0)
+    assert not first.acquire(timeout=0)
+
+def test_sqlite_pause_holds_back_the_other_limiters(tmp_path):
+    db_file = str(tmp_path / "ratelimit.db")
+    first = SQLiteLimiter(db_file, rate=100, burst=10)
+    second = SQLiteLimiter(db_file, rate=100, burst=10)
+    first.pause(30)
+    assert not second.acquire(timeout=0)
+    #Other buckets in the same file are not affected.
+    assert SQLiteLimiter(db_file, rate=100, burst=10, name='other').acquire(timeout=0)
@@ -0,0 +1,202 @@
+"""
+Bulk import and export of bookmarks as CSV or JSON Lines. Both directions stream: an upload is
+parsed one record at a time and written in batched transactions, and an export walks the
+bookmarks page by page with select_page cursors, so memory use does not grow with the number
+of bookmarks.
+"""
+from flask import flash, jsonify, redirect, request, url_for, Response
+from flask.views import MethodView
+from itertools import islice
+import csv
+import io
+import json
+import gbmodel
+from api import BOOKMARK_FIELDS, to_json, error
+from operations import current_user
+
+IMPORT_BATCH_SIZE = 1000    #Entries written per insert_many call, i.e. per transaction.
+EXPORT_PAGE_SIZE = 1000     #Bookmarks read per select_page call, and sent per chunk of the response.
+FORMATS = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+
+def to_entry(record):
+    """
+    Builds a new entry for the model from an imported record. Missing fields are left empty.
+
+    :param record: A dictionary read from a CSV row or a JSON line.
+
+    :return: The entry, or None if the record has no internship url.
+    """
+    if not isinstance(record, dict) or not isinstance(record.get('internship_url'), str) or not record['internship_url'].strip():
+        return None
+
+    entry = {}
+    for field in BOOKMARK_FIELDS:
+        value = record.get(field)
+        value = "" if value is None else str(value).strip()
+
+        #An empty date or status means the user has not applied yet, as for a new bookmark.
+        entry[field] = (value or None) if field in ('date_applied', 'application_status') else value
+    return entry
+
+def read_csv(stream):
+    """
+    :param stream: A text stream holding a header row with the field names, then one bookmark per row.
+
+    :yield: Every row as a dictionary.
+    """
+    yield from csv.DictReader(stream)
+
+def read_jsonl(stream):
+    """
+    :param stream: A text stream holding one JSON object per line; blank lines are ignored.
+
+    :yield: Every line as a dictionary, or None for a line that is not valid JSON.
+    """
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+def batches(items, size: int):
+    """
+    Groups an iterable into lists of at most size items without reading ahead any further.
+    """
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def import_records(model, records, user_id: str, on_conflict: str = "skip", batch_size: int = IMPORT_BATCH_SIZE):
+    """
+    Writes imported records to the model in batches, one transaction per batch.
+
+    :param model: The model to import into.
+    :param records: An iterable of dictionaries, consumed lazily.
+    :param user_id (str): The user whose bookmark list receives the records.
+    :param on_conflict (str, optional): 'skip' (default) keeps bookmarks whose url is already in the list; 'replace' overwrites them.
+    :param batch_size (int, optional): The number of entries written per transaction.
+
+    :return: A dictionary counting the records 'read', 'imported' (added or replaced), 'skipped' and 'invalid'.
+    """
+    counts = {'read': 0, 'imported': 0, 'skipped': 0, 'invalid': 0}
+
+    def entries():
+        for record in records:
+            counts['read'] += 1
+            entry = to_entry(record)
+            if entry is None:
+                counts['invalid'] += 1
+            else:
+                yield entry
+
+    for batch in batches(entries(), batch_size):
+        imported = model.insert_many(batch, user_id, on_conflict)
+        counts['imported'] += imported
+        counts['skipped'] += len(batch) - imported
+    return counts
+
+def export_pages(model, user_id: str, page_size: int = EXPORT_PAGE_SIZE):
+    """
+    Walks a user's bookmarks with select_page cursors, newest first.
+
+    :yield: One list of rows per page.
+    """
+    cursor = None
+    while True:
+        rows, cursor = model.select_page(cursor=cursor, limit=page_size, user_id=user_id)
+        yield rows
+        if cursor is None:
+            break
+
+def write_csv(pages):
+    """
+    :yield: The header row, then one chunk of CSV text per page of rows.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(BOOKMARK_FIELDS)
+    for rows in pages:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+def write_jsonl(pages):
+    """
+    :yield: One chunk of JSON lines per page of rows.
+    """
+    for rows in pages:
+        yield "".join(json.dumps(to_json(row)) + "\n" for row in rows)
+
+def upload_format(filename: str, mimetype: str):
+    """
+    :return: 'jsonl' for a .jsonl/.ndjson file or a JSON Lines body, 'csv' otherwise.
+    """
+    if (filename or "").lower().endswith(('.jsonl', '.ndjson')) or mimetype in ('application/x-ndjson', 'application/jsonl'):
+        return 'jsonl'
+    return 'csv'
+
+class Import(MethodView):
+    def post(self):
+        """
+        Imports bookmarks into the visitor's list, from a 'file' uploaded with the form on the
+        manage page or from the raw request body. The format is taken from the 'format' parameter
+        ('csv' or 'jsonl'), or else guessed from the file name or content type. The 'on_conflict'
+        parameter decides what happens to urls that are already bookmarked ('skip' or 'replace').
+
+        Form uploads are redirected to the manage page with a summary; other requests get the
+        counts as JSON.
+        """
+        upload = request.files.get('file')
+        on_conflict = request.values.get('on_conflict', "skip")
+        if on_conflict not in gbmodel.CONFLICT_MODES:
+            return error("on_conflict must be 'skip' or 'replace'.", 400)
+
+        if upload is not None:
+            stream, format = upload.stream, upload_format(upload.filename, upload.mimetype)
+        else:
+            stream, format = request.stream, upload_format(None, request.mimetype)
+        format = request.values.get('format') or format
+        if format not in FORMATS:
+            return error("format must be 'csv' or 'jsonl'.", 400)
+
+        #Decodes the upload as it is read; utf-8-sig also accepts the byte order mark spreadsheets write.
+        text = io.TextIOWrapper(stream if isinstance(stream, io.BufferedIOBase) else io.BufferedReader(stream), encoding='utf-8-sig', newline='')
+        records = read_csv(text) if format == 'csv' else read_jsonl(text)
+
+        try:
+            counts = import_records(gbmodel.get_model(), records, current_user(), on_conflict)
+        except (csv.Error, UnicodeDecodeError) as e:
+            return error(f"The upload could not be read: {e}", 400)
+        finally:
+            #Leaves closing the underlying stream to the framework.
+            text.detach()
+
+        if upload is None:
+            return jsonify(counts)
+
+        flash(f"Imported {counts['imported']} of {counts['read']} bookmarks "
+              f"({counts['skipped']} already bookmarked, {counts['invalid']} invalid).")
+        return redirect(url_for('manage'))
+
+class Export(MethodView):
+    def get(self):
+        """
+        Downloads the visitor's bookmarks as CSV (default) or JSON Lines ('format=jsonl'). The
+        response is streamed one page of bookmarks at a time.
+        """
+        format = request.args.get('format', 'csv')
+        if format not in FORMATS:
+            return error("format must be 'csv' or 'jsonl'.", 400)
+
+        #Reads the session before streaming starts; the generator runs after the request has returned.
+        pages = export_pages(gbmodel.get_model(), current_user())
+        chunks = write_csv(pages) if format == 'csv' else write_jsonl(pages)
+
+        response = Response(chunks, mimetype=FORMATS[format])
+        response.headers['Content-Disposition'] = f"attachment; filename=bookmarks.{format}"
+        response.cache_control.private = True
+        response.cache_control.no_store = True
+        return response